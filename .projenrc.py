@@ -4,11 +4,13 @@ from projen import github
 from projen.awscdk import AwsCdkPythonApp
 
 from src.bin.cicd_helper import github_cicd
-from src.bin.env_helper import cdk_action_task
+from src.bin.env_helper import cdk_action_task, cdk_fast_deploy_task
+from src.bin.stack_registry import STACK_REGISTRY
 
 # Define the python module name and set the python version
 python_module_name = "src"
 python_version = "3.11"
+cdk_version = "2.153.0"  # Find the latest CDK version here: https://pypi.org/project/aws-cdk-lib/
 
 # Define the AWS region for the CDK app and github workflows
 # Default to us-east-1 if AWS_REGION is not set in your environment variables
@@ -17,7 +19,7 @@ aws_region = os.getenv("AWS_REGION", "us-east-1")
 project = AwsCdkPythonApp(
     author_email="dobson.dunavant@savvas.com",
     author_name="Dobson Dunavant",
-    cdk_version="2.153.0",  # Find the latest CDK version here: https://pypi.org/project/aws-cdk-lib/
+    cdk_version=cdk_version,
     cdk_version_pinning=True,
     module_name=python_module_name,
     name="outlier-aws-infrastructure",
@@ -84,25 +86,45 @@ project.tasks.add_task(
 )
 
 # Define the target AWS accounts for the different environments
+# Each environment defines its fast-deploy task families once:
+# - hotswap_stacks: stacks that get a `<env>:hotswap:<Stack>` task
+# - watch_stack: the stack `<env>:watch` runs `cdk watch` against
+# - concurrency / asset_parallelism: used by `<env>:deploy:parallel`
 target_accounts = {
-    "nightly": "528757783796",
+    "nightly": {
+        "account": "528757783796",
+        "hotswap_stacks": ["DevApplicationStack"],
+        "watch_stack": "DevApplicationStack",
+        "concurrency": 3,
+        "asset_parallelism": True,
+    },
     "production": None,
 }
 
 gh = github.GitHub(project)
 # Loop through each environment in target_accounts
-for env, account in target_accounts.items():
-    if account:  # Check if account is not None
+for env, target in target_accounts.items():
+    if target:  # Check if target is not None
+        account = target["account"]
+        target_account = {
+            "CDK_DEFAULT_ACCOUNT": account,
+            "ENVIRONMENT": env,
+        }
+
         # Adds customized projen tasks for executing cdk actions for each environment
-        cdk_action_task(
+        cdk_action_task(project, target_account, stack_names=list(STACK_REGISTRY))
+
+        # Adds hotswap, watch and parallel deploy tasks for faster iteration
+        cdk_fast_deploy_task(
             project,
-            {
-                "CDK_DEFAULT_ACCOUNT": account,
-                "ENVIRONMENT": env,
-            },
+            target_account,
+            hotswap_stacks=target.get("hotswap_stacks"),
+            watch_stack=target.get("watch_stack"),
+            concurrency=target.get("concurrency", 1),
+            asset_parallelism=target.get("asset_parallelism", True),
         )
 
         # Adds GitHub action workflows for deploying the CDK stacks to the target AWS account
-        github_cicd(gh, account, env, python_version)  # Python 3.11
+        github_cicd(gh, account, env, python_version, cdk_version)
 
 project.synth()
@@ -1,10 +1,8 @@
 import os
 
 import aws_cdk as cdk
-from stacks.base_stack import BaseStack
-from stacks.dev_application_stack import DevApplicationStack
-from stacks.github_oidc_stack import GitHubOIDCStack
-from stacks.nightly_application_stack import NightlyApplicationStack
+from bin.stack_registry import instantiate_stacks, resolve_stack_names
+from bin.template_analyzer import print_template_report, warn_on_stack_size
 
 # Inherit environment variables from npm run commands (displayed in .projen/tasks.json)
 environment = os.environ.get("ENVIRONMENT", "nightly")
@@ -15,18 +13,17 @@ aws_environment = cdk.Environment(
 # Instantiate the CDK app
 app = cdk.App()
 
-# Add GitHub OpenID Connect support and create an IAM role for GitHub
-GitHubOIDCStack(app, f"GitHubOIDCStack-{environment}", env=aws_environment)
-
-# Create a base stack which contains all of our global, shared resources
-BaseStack(app, f"BaseStack-{environment}", env=aws_environment)
-
-NightlyApplicationStack(
-    app, f"NightlyApplicationStack-{environment}", env=aws_environment
+# Only instantiate the requested stacks (and their dependencies), e.g.
+# `cdk synth -c stacks=DevApplicationStack` or `STACKS=DevApplicationStack cdk synth`.
+# All stacks are instantiated when nothing is requested:
+# - GitHubOIDCStack: GitHub OpenID Connect support and an IAM role for GitHub
+# - BaseStack: all of our global, shared resources
+# - NightlyApplicationStack / DevApplicationStack: the application sub-environments
+requested_stacks = app.node.try_get_context("stacks") or os.environ.get("STACKS")
+instantiate_stacks(
+    app, environment, aws_environment, resolve_stack_names(requested_stacks)
 )
 
-DevApplicationStack(app, f"DevApplicationStack-{environment}", env=aws_environment)
-
 
 # Tag all resources in CloudFormation with the environment name
 cdk.Tags.of(app).add("Environment", environment)
@@ -37,5 +34,12 @@ cdk.Tags.of(app).add("aws-cdk-managed", "True")
 # Tag all resources in CloudFormation with the environment name
 cdk.Tags.of(app).add("Project", "outlier-aws-infrastructure")
 
+# Warn about stacks approaching the CloudFormation resource quota
+warn_on_stack_size(app)
+
 # Synthesize the CDK app
-app.synth()
+assembly = app.synth()
+
+# Report the size each construct contributes, e.g. `cdk synth -c templateReport=true`
+if app.node.try_get_context("templateReport"):
+    print_template_report(app, assembly)
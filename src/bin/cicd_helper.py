@@ -3,9 +3,15 @@ import os
 from projen import github
 
 
-def github_cicd(gh, account, env, python_version):
+def github_cicd(gh, account, env, python_version, cdk_version):
     # Add a GitHub workflow for deploying the CDK stacks to the AWS account
-    cdk_deployment_workflow = github.GithubWorkflow(gh, f"cdk-deploy-{env}")
+    # (concurrency is limited to one run per workflow, so deployments never overlap)
+    cdk_deployment_workflow = github.GithubWorkflow(
+        gh,
+        f"cdk-deploy-{env}",
+        limit_concurrency=True,
+        concurrency_options={"group": f"cdk-deploy-{env}", "cancel_in_progress": False},
+    )
     # Set up branch triggers based on environment
     trigger_branches = {"nightly": ["nightly"], "prod": ["main"]}
 
@@ -13,16 +19,38 @@ def github_cicd(gh, account, env, python_version):
         push={"branches": trigger_branches[env]} if env in trigger_branches else None,
         workflow_dispatch={},
     )
+
+    # Both jobs assume the deploy role: synth for the VPC lookups, deploy for CloudFormation
+    configure_aws_credentials_step = {
+        "name": "Configure AWS credentials",
+        "uses": "aws-actions/configure-aws-credentials@v4",
+        "with": {
+            "role-to-assume": f"arn:aws:iam::{account}:role/GitHubDeployRole",
+            "aws-region": os.getenv("CDK_DEFAULT_REGION"),
+            "role-session-duration": "7200",
+        },
+    }
+    # The CDK CLI is pinned, so the npm download cache only changes with the CDK version
+    cache_npm_step = {
+        "name": "Cache npm packages",
+        "uses": "actions/cache@v4",
+        "with": {
+            "path": "~/.npm",
+            "key": f"npm-${{{{ runner.os }}}}-aws-cdk-{cdk_version}",
+        },
+    }
+    permissions = {
+        "actions": github.workflows.JobPermission.WRITE,
+        "contents": github.workflows.JobPermission.READ,
+        "idToken": github.workflows.JobPermission.WRITE,
+    }
+
     cdk_deployment_workflow.add_jobs(
         {
-            "deploy": {
-                "name": f"Deploy CDK stacks to {env} AWS account",
+            "synth": {
+                "name": f"Synthesize CDK stacks for {env} AWS account",
                 "runsOn": ["ubuntu-latest"],
-                "permissions": {
-                    "actions": github.workflows.JobPermission.WRITE,
-                    "contents": github.workflows.JobPermission.READ,
-                    "idToken": github.workflows.JobPermission.WRITE,
-                },
+                "permissions": permissions,
                 "steps": [
                     {
                         "name": "Checkout repository",
@@ -30,20 +58,13 @@ def github_cicd(gh, account, env, python_version):
                     },
                     {
                         "name": "Setup python environment",
+                        "id": "setup-python",
                         "uses": "actions/setup-python@v5",
                         "with": {
                             "python-version": python_version,
                         },
                     },
-                    {
-                        "name": "Configure AWS credentials",
-                        "uses": "aws-actions/configure-aws-credentials@v4",
-                        "with": {
-                            "role-to-assume": f"arn:aws:iam::{account}:role/GitHubDeployRole",
-                            "aws-region": os.getenv("CDK_DEFAULT_REGION"),
-                            "role-session-duration": "7200",
-                        },
-                    },
+                    configure_aws_credentials_step,
                     {
                         "name": "Install and configure Poetry",
                         "uses": "snok/install-poetry@v1",
@@ -52,21 +73,64 @@ def github_cicd(gh, account, env, python_version):
                             "virtualenvs-in-project": "true",
                         },
                     },
+                    {
+                        "name": "Cache Poetry virtualenv",
+                        "id": "cache-venv",
+                        "uses": "actions/cache@v4",
+                        "with": {
+                            "path": ".venv",
+                            "key": "venv-${{ runner.os }}-python-${{ steps.setup-python.outputs.python-version }}-${{ hashFiles('poetry.lock') }}",
+                        },
+                    },
                     {
                         "name": "Install dependencies",
+                        "if": "steps.cache-venv.outputs.cache-hit != 'true'",
                         "run": "poetry install --no-root",
                     },
+                    cache_npm_step,
                     {
                         "name": "Install cdk & projen",
-                        "run": "npm install -g aws-cdk projen",
+                        "run": f"npm install -g aws-cdk@{cdk_version} projen",
                     },
                     {
                         "name": f"Run CDK synth for the {env.upper()} environment",
                         "run": f"projen {env}:synth",
                     },
+                    {
+                        "name": "Upload cloud assembly",
+                        "uses": "actions/upload-artifact@v4",
+                        "with": {
+                            "name": f"cdk-out-{env}",
+                            "path": "cdk.out",
+                            "retention-days": 1,
+                        },
+                    },
+                ],
+            },
+            # Deploys the cloud assembly built by the synth job, so the app is not synthesized again
+            "deploy": {
+                "name": f"Deploy CDK stacks to {env} AWS account",
+                "needs": ["synth"],
+                "runsOn": ["ubuntu-latest"],
+                "permissions": permissions,
+                "steps": [
+                    {
+                        "name": "Download cloud assembly",
+                        "uses": "actions/download-artifact@v4",
+                        "with": {
+                            "name": f"cdk-out-{env}",
+                            "path": "cdk.out",
+                        },
+                    },
+                    configure_aws_credentials_step,
+                    cache_npm_step,
+                    {
+                        "name": "Install cdk",
+                        "run": f"npm install -g aws-cdk@{cdk_version}",
+                    },
                     {
                         "name": f"Deploy CDK to the {env.upper()} environment on AWS account {account}",
-                        "run": f"projen {env}:deploy",
+                        "run": f'cdk deploy --app cdk.out --require-approval never "*Stack-{env}"',
                     },
                 ],
             },
@@ -1,9 +1,13 @@
-from typing import Dict
+from typing import Dict, List, Optional
 
 from projen.awscdk import AwsCdkPythonApp
 
 
-def cdk_action_task(project: AwsCdkPythonApp, target_account: Dict[str, str]):
+def cdk_action_task(
+    project: AwsCdkPythonApp,
+    target_account: Dict[str, str],
+    stack_names: Optional[List[str]] = None,
+):
     task_actions = ["synth", "diff", "deploy", "destroy"]
     stack_name_pattern = f"*Stack-{target_account['ENVIRONMENT']}"
 
@@ -25,3 +29,66 @@ def cdk_action_task(project: AwsCdkPythonApp, target_account: Dict[str, str]):
                 "exec": exec_command,
             },
         )
+
+    # Per-stack synth and diff tasks, which only instantiate the selected stack and its dependencies
+    for stack_name in stack_names or []:
+        stack_id = f"{stack_name}-{target_account['ENVIRONMENT']}"
+
+        for action in ["synth", "diff"]:
+            task_name = f"{target_account['ENVIRONMENT']}:{action}:{stack_name}"
+            task_description = f"{action.capitalize()} the {stack_name} on the {target_account['ENVIRONMENT'].upper()} account"
+
+            project.add_task(
+                task_name,
+                **{
+                    "description": task_description,
+                    "env": {**target_account, "STACKS": stack_name},
+                    "exec": f"cdk {action} {stack_id}",
+                },
+            )
+
+
+def cdk_fast_deploy_task(
+    project: AwsCdkPythonApp,
+    target_account: Dict[str, str],
+    hotswap_stacks: Optional[List[str]] = None,
+    watch_stack: Optional[str] = None,
+    concurrency: int = 1,
+    asset_parallelism: bool = True,
+):
+    environment = target_account["ENVIRONMENT"]
+    stack_name_pattern = f"*Stack-{environment}"
+
+    # Hotswap deploys, which update Lambda/ECS/CodeBuild/etc. resources directly through their service APIs
+    # and fall back to a full CloudFormation deployment for changes that can't be hotswapped
+    for stack_name in hotswap_stacks or []:
+        project.add_task(
+            f"{environment}:hotswap:{stack_name}",
+            **{
+                "description": f"Hotswap deploy the {stack_name} on the {environment.upper()} account",
+                "env": {**target_account, "STACKS": stack_name},
+                "exec": f"cdk deploy --hotswap-fallback --exclusively --require-approval never {stack_name}-{environment}",
+            },
+        )
+
+    # Watch the source tree (see "watch" in cdk.json) and hotswap deploy on every change
+    if watch_stack:
+        project.add_task(
+            f"{environment}:watch",
+            **{
+                "description": f"Watch and hotswap deploy the {watch_stack} on the {environment.upper()} account",
+                "env": {**target_account, "STACKS": watch_stack},
+                "exec": f"cdk watch --hotswap-fallback --exclusively {watch_stack}-{environment}",
+            },
+        )
+
+    # Deploy independent stacks in parallel, CDK still waits for a stack's dependencies to finish first
+    asset_parallelism_flag = "--asset-parallelism" if asset_parallelism else "--no-asset-parallelism"
+    project.add_task(
+        f"{environment}:deploy:parallel",
+        **{
+            "description": f"Deploy the stacks on the {environment.upper()} account, {concurrency} at a time",
+            "env": target_account,
+            "exec": f"cdk deploy --require-approval never --concurrency {concurrency} {asset_parallelism_flag} {stack_name_pattern}",
+        },
+    )
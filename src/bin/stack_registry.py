@@ -0,0 +1,72 @@
+import importlib
+from typing import Dict, List, Optional
+
+import aws_cdk as cdk
+
+# Every stack in the app, in instantiation order. Stack modules are only imported
+# when the stack is selected, so unrelated lookups and construct trees are skipped.
+# Only list a dependency where a stack consumes another stack's resources (a cross-stack
+# reference) - every dependency is also instantiated, synthesized and deployed with it.
+STACK_REGISTRY = {
+    "GitHubOIDCStack": {
+        "module": "stacks.github_oidc_stack",
+        "dependencies": [],
+    },
+    "BaseStack": {
+        "module": "stacks.base_stack",
+        "dependencies": [],
+    },
+    "NightlyApplicationStack": {
+        "module": "stacks.nightly_application_stack",
+        "dependencies": [],
+    },
+    "DevApplicationStack": {
+        "module": "stacks.dev_application_stack",
+        "dependencies": [],
+    },
+}
+
+
+def resolve_stack_names(requested: Optional[str]) -> List[str]:
+    """Expand a comma-separated stack selection with its dependencies, in registry order"""
+    if not requested:
+        return list(STACK_REGISTRY)
+
+    selected = set()
+    pending = []
+    for name in requested.split(","):
+        # Accept both "DevApplicationStack" and the full "DevApplicationStack-<env>" stack id
+        name = name.strip().split("-")[0]
+        if name not in STACK_REGISTRY:
+            raise ValueError(
+                f"Unknown stack '{name}', expected one of {list(STACK_REGISTRY)}"
+            )
+        pending.append(name)
+
+    while pending:
+        name = pending.pop()
+        if name not in selected:
+            selected.add(name)
+            pending.extend(STACK_REGISTRY[name]["dependencies"])
+
+    return [name for name in STACK_REGISTRY if name in selected]
+
+
+def instantiate_stacks(
+    app: cdk.App,
+    environment: str,
+    aws_environment: cdk.Environment,
+    stack_names: List[str],
+) -> Dict[str, cdk.Stack]:
+    """Instantiate the given stacks as `<name>-<environment>` and wire their dependencies"""
+    stacks = {}
+    for name in stack_names:
+        module = importlib.import_module(STACK_REGISTRY[name]["module"])
+        stacks[name] = getattr(module, name)(
+            app, f"{name}-{environment}", env=aws_environment
+        )
+        for dependency in STACK_REGISTRY[name]["dependencies"]:
+            if dependency in stacks:
+                stacks[name].add_dependency(stacks[dependency])
+
+    return stacks
@@ -0,0 +1,97 @@
+import json
+import os
+import sys
+from typing import Dict
+
+import aws_cdk as cdk
+from aws_cdk import cx_api
+from constructs import Construct
+
+# Context key (`cdk synth -c resourceWarningThreshold=300`) for the number of resources
+# a stack may hold before synth warns that it is approaching the CloudFormation quota
+THRESHOLD_CONTEXT_KEY = "resourceWarningThreshold"
+DEFAULT_RESOURCE_THRESHOLD = 400
+
+# CloudFormation quotas per template
+MAX_RESOURCES = 500
+MAX_TEMPLATE_BYTES = 1_000_000
+
+
+def _own_resources(scope: Construct):
+    """CfnResources under scope that render into scope's stack (not into a nested stack)"""
+    stack_path = cdk.Stack.of(scope).node.path
+    return [
+        child
+        for child in scope.node.find_all()
+        if isinstance(child, cdk.CfnResource)
+        and cdk.Stack.of(child).node.path == stack_path
+    ]
+
+
+def nested_scope(stack: cdk.Stack, id: str, nested: bool = False) -> Construct:
+    """Scope for a construct - the stack itself, or a nested stack when `nested` is set.
+    Moving a construct between the two replaces its resources, so this is never automatic"""
+    if not nested:
+        return stack
+    return cdk.NestedStack(stack, f"{id}NestedStack")
+
+
+def warn_on_stack_size(app: cdk.App) -> None:
+    """Warn about every stack that holds `threshold` resources or more, before it hits the quota"""
+    threshold = int(
+        app.node.try_get_context(THRESHOLD_CONTEXT_KEY) or DEFAULT_RESOURCE_THRESHOLD
+    )
+    for stack in app.node.find_all():
+        if not isinstance(stack, cdk.Stack):
+            continue
+
+        resource_count = len(_own_resources(stack))
+        if resource_count >= threshold:
+            cdk.Annotations.of(stack).add_warning(
+                f"{resource_count} resources (warning threshold {threshold}, quota {MAX_RESOURCES}) - "
+                "see `cdk synth -c templateReport=true` and move a construct into a nested stack"
+            )
+
+
+def construct_report(stack: cdk.Stack, template: dict) -> Dict[str, Dict[str, int]]:
+    """Resources and template bytes each top-level construct contributes to the stack's template"""
+    resources = template.get("Resources", {})
+    report = {}
+    for child in stack.node.children:
+        logical_ids = {
+            stack.resolve(stack.get_logical_id(resource))
+            for resource in _own_resources(child)
+        }
+        logical_ids &= set(resources)
+        if logical_ids:
+            report[child.node.id] = {
+                "resources": len(logical_ids),
+                "bytes": sum(len(json.dumps(resources[lid])) for lid in logical_ids),
+            }
+
+    return report
+
+
+def print_template_report(app: cdk.App, assembly: cx_api.CloudAssembly) -> None:
+    """Print the per-construct size of every synthesized stack (nested stacks included), largest first"""
+    for stack in app.node.find_all():
+        if not isinstance(stack, cdk.Stack):
+            continue
+
+        template_path = os.path.join(assembly.directory, stack.template_file)
+        with open(template_path) as template_file:
+            template = json.load(template_file)
+        report = construct_report(stack, template)
+
+        print(
+            f"{stack.node.path}: {len(template.get('Resources', {}))}/{MAX_RESOURCES} resources, "
+            f"{os.path.getsize(template_path)}/{MAX_TEMPLATE_BYTES} bytes",
+            file=sys.stderr,
+        )
+        for construct_id, size in sorted(
+            report.items(), key=lambda item: item[1]["bytes"], reverse=True
+        ):
+            print(
+                f"  {construct_id:<40} {size['resources']:>4} resources {size['bytes']:>8} bytes",
+                file=sys.stderr,
+            )
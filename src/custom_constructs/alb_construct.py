@@ -1,7 +1,11 @@
 # src/custom_constructs/alb_construct_new.py
+from typing import Any, Dict, Optional
+
 import aws_cdk as cdk
 from constructs import Construct
 from aws_cdk import (
+    aws_cloudfront as cloudfront,
+    aws_cloudfront_origins as origins,
     aws_elasticloadbalancingv2 as elbv2,
     aws_ec2 as ec2,
     aws_route53 as route53,
@@ -9,7 +13,37 @@ from aws_cdk import (
     aws_certificatemanager as acm,
     Duration,
 )
-from .base_construct import BaseConstruct
+from .base_construct import (
+    CERTIFICATE_ARN,
+    HOSTED_ZONE_ID,
+    HOSTED_ZONE_NAME,
+    BaseConstruct,
+)
+
+# Supported target group routing algorithms and ALB desync mitigation modes
+LOAD_BALANCING_ALGORITHMS = {
+    "round_robin": elbv2.TargetGroupLoadBalancingAlgorithmType.ROUND_ROBIN,
+    "least_outstanding_requests": elbv2.TargetGroupLoadBalancingAlgorithmType.LEAST_OUTSTANDING_REQUESTS,
+}
+DESYNC_MITIGATION_MODES = {
+    "monitor": elbv2.DesyncMitigationMode.MONITOR,
+    "defensive": elbv2.DesyncMitigationMode.DEFENSIVE,
+    "strictest": elbv2.DesyncMitigationMode.STRICTEST,
+}
+
+# Tuning profile applied to the ALB and to both target groups - None keeps the ELB default
+DEFAULT_TUNING_PROFILE = {
+    "load_balancing_algorithm": None,  # round_robin
+    "slow_start": None,  # disabled
+    "deregistration_delay": None,  # 300 seconds
+    "health_check_interval": Duration.seconds(30),
+    "health_check_timeout": Duration.seconds(5),
+    "healthy_threshold_count": None,  # 5
+    "unhealthy_threshold_count": None,  # 2
+    "idle_timeout": None,  # 60 seconds
+    "http2_enabled": None,  # enabled
+    "desync_mitigation_mode": None,  # defensive
+}
 
 
 class AlbConstruct(BaseConstruct):
@@ -21,6 +55,10 @@ class AlbConstruct(BaseConstruct):
         security_group: ec2.ISecurityGroup,
         load_balancer_name: str,
         subdomain: str,
+        enable_cloudfront: bool = False,
+        dns_target: str = "alb",
+        cache_behaviors: Optional[Dict[str, cloudfront.CachePolicyProps]] = None,
+        tuning_profile: Optional[Dict[str, Any]] = None,
         **kwargs
     ) -> None:
         super().__init__(scope, id, **kwargs)
@@ -28,8 +66,19 @@ class AlbConstruct(BaseConstruct):
         # Store parameters
         self.load_balancer_name = load_balancer_name
         self.subdomain = subdomain
+        self.enable_cloudfront = enable_cloudfront
+        self.dns_target = dns_target
+        self.tuning_profile = self.resolve_tuning_profile(tuning_profile or {})
+
+        if self.dns_target not in ("alb", "cloudfront"):
+            raise ValueError(
+                f"Unsupported dns_target '{self.dns_target}', expected 'alb' or 'cloudfront'"
+            )
+        if self.dns_target == "cloudfront" and not self.enable_cloudfront:
+            raise ValueError("dns_target='cloudfront' requires enable_cloudfront=True")
 
         # Load Balancer - identical to original
+        desync_mitigation_mode = self.tuning_profile["desync_mitigation_mode"]
         self._alb = elbv2.ApplicationLoadBalancer(
             self,
             "ALB",
@@ -37,62 +86,36 @@ class AlbConstruct(BaseConstruct):
             internet_facing=True,
             security_group=security_group,
             load_balancer_name=self.load_balancer_name,
+            idle_timeout=self.tuning_profile["idle_timeout"],
+            http2_enabled=self.tuning_profile["http2_enabled"],
+            desync_mitigation_mode=(
+                DESYNC_MITIGATION_MODES[desync_mitigation_mode]
+                if desync_mitigation_mode
+                else None
+            ),
         )
 
         # Import the hosted zone - using same zone ID as original
         hosted_zone = route53.HostedZone.from_hosted_zone_attributes(
             self,
             "ExistingHostedZone",
-            hosted_zone_id="Z05574991AFW5NGZ1X8DH",
-            zone_name="nightly.savvasoutlier.com",
-        )
-
-        # Create an A record pointing to the ALB - parameterized subdomain
-        route53.ARecord(
-            self,
-            "ApiDnsRecord",
-            zone=hosted_zone,
-            record_name=self.subdomain,
-            target=route53.RecordTarget.from_alias(
-                targets.LoadBalancerTarget(self._alb)
-            ),
+            hosted_zone_id=HOSTED_ZONE_ID,
+            zone_name=HOSTED_ZONE_NAME,
         )
 
         # Import the SSL certificate - same certificate as original
         certificate = acm.Certificate.from_certificate_arn(
             self,
             "Certificate",
-            "arn:aws:acm:us-east-1:528757783796:certificate/71eac7f3-f4f4-4a6c-a32b-d6dad41f94e8",
+            CERTIFICATE_ARN,
         )
 
-        # Target Groups - identical to original
-        self._blue_target_group = elbv2.ApplicationTargetGroup(
-            self,
-            "BlueTargetGroup",
-            vpc=vpc,
-            port=1337,
-            protocol=elbv2.ApplicationProtocol.HTTP,
-            target_type=elbv2.TargetType.IP,
-            health_check=elbv2.HealthCheck(
-                path="/health",
-                interval=Duration.seconds(30),
-                timeout=Duration.seconds(5),
-            ),
-        )
+        # Target Groups - blue and green share the tuning profile so CodeDeploy swaps behave the same
+        self._blue_target_group = self.create_target_group("BlueTargetGroup", vpc)
+        self._green_target_group = self.create_target_group("GreenTargetGroup", vpc)
 
-        self._green_target_group = elbv2.ApplicationTargetGroup(
-            self,
-            "GreenTargetGroup",
-            vpc=vpc,
-            port=1337,
-            protocol=elbv2.ApplicationProtocol.HTTP,
-            target_type=elbv2.TargetType.IP,
-            health_check=elbv2.HealthCheck(
-                path="/health",
-                interval=Duration.seconds(30),
-                timeout=Duration.seconds(5),
-            ),
-        )
+        # Listeners only open the security group to the world when the ALB is not behind CloudFront
+        open_listeners = self.dns_target != "cloudfront"
 
         # HTTPS Listener - identical to original
         self._https_listener = self._alb.add_listener(
@@ -102,6 +125,7 @@ class AlbConstruct(BaseConstruct):
             certificates=[certificate],
             ssl_policy=elbv2.SslPolicy.RECOMMENDED,
             default_target_groups=[self._blue_target_group],
+            open=open_listeners,
         )
 
         # HTTP Listener (redirects to HTTPS) - identical to original
@@ -111,12 +135,163 @@ class AlbConstruct(BaseConstruct):
             default_action=elbv2.ListenerAction.redirect(
                 port="443", protocol="HTTPS", permanent=True
             ),
+            open=open_listeners,
+        )
+
+        # CloudFront distribution in front of the ALB
+        if self.enable_cloudfront:
+            self.create_distribution(hosted_zone, certificate, cache_behaviors or {})
+
+        # Create an A record pointing to the ALB or the distribution - parameterized subdomain
+        if self.dns_target == "cloudfront":
+            record_target = targets.CloudFrontTarget(self._distribution)
+        else:
+            record_target = targets.LoadBalancerTarget(self._alb)
+
+        route53.ARecord(
+            self,
+            "ApiDnsRecord",
+            zone=hosted_zone,
+            record_name=self.subdomain,
+            target=route53.RecordTarget.from_alias(record_target),
+        )
+
+    @staticmethod
+    def resolve_tuning_profile(tuning_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge a tuning profile over the defaults and validate it"""
+        unknown_keys = set(tuning_profile) - set(DEFAULT_TUNING_PROFILE)
+        if unknown_keys:
+            raise ValueError(
+                f"Unsupported tuning profile keys {sorted(unknown_keys)}, expected {list(DEFAULT_TUNING_PROFILE)}"
+            )
+
+        profile = {**DEFAULT_TUNING_PROFILE, **tuning_profile}
+        algorithm = profile["load_balancing_algorithm"]
+        if algorithm is not None and algorithm not in LOAD_BALANCING_ALGORITHMS:
+            raise ValueError(
+                f"Unsupported load_balancing_algorithm '{algorithm}', expected one of {list(LOAD_BALANCING_ALGORITHMS)}"
+            )
+        # ELB rejects slow start on target groups routed by least outstanding requests
+        if algorithm == "least_outstanding_requests" and profile["slow_start"]:
+            raise ValueError("slow_start can't be combined with least_outstanding_requests")
+        mode = profile["desync_mitigation_mode"]
+        if mode is not None and mode not in DESYNC_MITIGATION_MODES:
+            raise ValueError(
+                f"Unsupported desync_mitigation_mode '{mode}', expected one of {list(DESYNC_MITIGATION_MODES)}"
+            )
+
+        return profile
+
+    def create_target_group(self, id: str, vpc: ec2.IVpc) -> elbv2.ApplicationTargetGroup:
+        """Create an IP target group for the ECS service with the tuning profile applied"""
+        profile = self.tuning_profile
+        algorithm = profile["load_balancing_algorithm"]
+        return elbv2.ApplicationTargetGroup(
+            self,
+            id,
+            vpc=vpc,
+            port=1337,
+            protocol=elbv2.ApplicationProtocol.HTTP,
+            target_type=elbv2.TargetType.IP,
+            load_balancing_algorithm_type=(
+                LOAD_BALANCING_ALGORITHMS[algorithm] if algorithm else None
+            ),
+            slow_start=profile["slow_start"],
+            deregistration_delay=profile["deregistration_delay"],
+            health_check=elbv2.HealthCheck(
+                path="/health",
+                interval=profile["health_check_interval"],
+                timeout=profile["health_check_timeout"],
+                healthy_threshold_count=profile["healthy_threshold_count"],
+                unhealthy_threshold_count=profile["unhealthy_threshold_count"],
+            ),
+        )
+
+    def create_distribution(
+        self,
+        hosted_zone: route53.IHostedZone,
+        certificate: acm.ICertificate,
+        cache_behaviors: Dict[str, cloudfront.CachePolicyProps],
+    ):
+        """Create a CloudFront distribution with per-path cache behaviors in front of the ALB"""
+        # Origin A record - CloudFront reaches the ALB by a name covered by the certificate
+        origin_record = route53.ARecord(
+            self,
+            "OriginDnsRecord",
+            zone=hosted_zone,
+            record_name=f"origin-{self.subdomain}",
+            target=route53.RecordTarget.from_alias(
+                targets.LoadBalancerTarget(self._alb)
+            ),
+        )
+
+        alb_origin = origins.HttpOrigin(
+            origin_record.domain_name,
+            protocol_policy=cloudfront.OriginProtocolPolicy.HTTPS_ONLY,
+        )
+
+        # Cached paths - the cache policy defines the cache key, and with no origin request policy only
+        # the key's headers, cookies and query strings reach the ALB, so a cached response can't vary
+        # on anything the key doesn't cover (the ALB sees the origin's Host name)
+        additional_behaviors = {}
+        for index, (path_pattern, cache_policy_props) in enumerate(
+            cache_behaviors.items()
+        ):
+            # Compression stays on unless the behavior explicitly opts out of both encodings
+            gzip = cache_policy_props.enable_accept_encoding_gzip is not False
+            brotli = cache_policy_props.enable_accept_encoding_brotli is not False
+            cache_policy = cloudfront.CachePolicy(
+                self,
+                f"CachePolicy{index}",
+                cache_policy_name=f"{self.load_balancer_name}-cache-{index}",
+                comment=f"Cache policy for {path_pattern}",
+                default_ttl=cache_policy_props.default_ttl,
+                min_ttl=cache_policy_props.min_ttl,
+                max_ttl=cache_policy_props.max_ttl,
+                header_behavior=cache_policy_props.header_behavior,
+                query_string_behavior=cache_policy_props.query_string_behavior,
+                cookie_behavior=cache_policy_props.cookie_behavior,
+                enable_accept_encoding_gzip=gzip,
+                enable_accept_encoding_brotli=brotli,
+            )
+            additional_behaviors[path_pattern] = cloudfront.BehaviorOptions(
+                origin=alb_origin,
+                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                allowed_methods=cloudfront.AllowedMethods.ALLOW_GET_HEAD_OPTIONS,
+                cached_methods=cloudfront.CachedMethods.CACHE_GET_HEAD_OPTIONS,
+                cache_policy=cache_policy,
+                compress=gzip or brotli,
+            )
+
+        self._distribution = cloudfront.Distribution(
+            self,
+            "Distribution",
+            comment=f"{self.load_balancer_name} API",
+            domain_names=[f"{self.subdomain}.{hosted_zone.zone_name}"],
+            certificate=certificate,
+            http_version=cloudfront.HttpVersion.HTTP2_AND_3,
+            price_class=cloudfront.PriceClass.PRICE_CLASS_100,
+            default_behavior=cloudfront.BehaviorOptions(
+                origin=alb_origin,
+                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                allowed_methods=cloudfront.AllowedMethods.ALLOW_ALL,
+                cache_policy=cloudfront.CachePolicy.CACHING_DISABLED,
+                origin_request_policy=cloudfront.OriginRequestPolicy.ALL_VIEWER,
+                compress=True,
+            ),
+            additional_behaviors=additional_behaviors,
         )
 
     @property
     def alb(self) -> elbv2.IApplicationLoadBalancer:
         return self._alb
 
+    @property
+    def distribution(self) -> cloudfront.IDistribution:
+        if hasattr(self, "_distribution"):
+            return self._distribution
+        raise AttributeError("No CloudFront distribution - was enable_cloudfront=True?")
+
     @property
     def blue_target_group(self) -> elbv2.IApplicationTargetGroup:
         return self._blue_target_group
@@ -0,0 +1,206 @@
+from typing import List, Optional
+
+import aws_cdk as cdk
+from constructs import Construct
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_rds as rds,
+    aws_redshiftserverless as redshiftserverless,
+    custom_resources as cr,
+)
+from .base_construct import BaseConstruct
+
+# Redshift Serverless capacity is set in RPUs, in steps of 8
+MIN_RPU = 8
+MAX_RPU = 1024
+
+# Redshift Serverless workgroups need subnets in at least three Availability Zones
+MIN_WORKGROUP_AZS = 3
+
+
+class AnalyticsConstruct(BaseConstruct):
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        vpc: ec2.IVpc,
+        db_cluster: rds.IDatabaseCluster,
+        base_capacity: int = 8,
+        max_capacity: int = 32,
+        database_name: str = "analytics",
+        data_filter: Optional[str] = None,
+        client_security_group_ids: Optional[List[str]] = None,
+    ):
+        super().__init__(scope, id)
+
+        # Store parameters
+        self.vpc = vpc
+        self.db_cluster = db_cluster
+
+        for name, capacity in (
+            ("base_capacity", base_capacity),
+            ("max_capacity", max_capacity),
+        ):
+            if capacity % 8 or not MIN_RPU <= capacity <= MAX_RPU:
+                raise ValueError(
+                    f"{name} must be a multiple of 8 between {MIN_RPU} and {MAX_RPU} RPUs, got {capacity}"
+                )
+        if base_capacity > max_capacity:
+            raise ValueError(
+                f"base_capacity ({base_capacity}) cannot exceed max_capacity ({max_capacity})"
+            )
+
+        workgroup_subnets = self.vpc.select_subnets(
+            subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+        )
+        availability_zones = set(workgroup_subnets.availability_zones)
+        if len(availability_zones) < MIN_WORKGROUP_AZS and not any(
+            cdk.Token.is_unresolved(az) for az in availability_zones
+        ):
+            raise ValueError(
+                f"Redshift Serverless needs private subnets in at least {MIN_WORKGROUP_AZS} "
+                f"Availability Zones, got {sorted(availability_zones)}"
+            )
+
+        namespace_name = f"outlier-{self.environment}-analytics"
+
+        # Workgroup Security Group
+        self._security_group = ec2.SecurityGroup(
+            self,
+            "WorkgroupSecurityGroup",
+            vpc=self.vpc,
+            security_group_name=f"outlier-redshift-{self.environment}-sg-cdk",
+            description=f"Security group for {self.environment} Redshift Serverless",
+            allow_all_outbound=True,
+        )
+
+        # Allow Redshift from the reporting clients
+        for client_security_group_id in client_security_group_ids or []:
+            self._security_group.add_ingress_rule(
+                peer=ec2.Peer.security_group_id(client_security_group_id),
+                connection=ec2.Port.tcp(5439),
+                description=f"Allow Redshift from {client_security_group_id}",
+            )
+
+        # Namespace - admin credentials are generated and kept in Secrets Manager by Redshift
+        self._namespace = redshiftserverless.CfnNamespace(
+            self,
+            "Namespace",
+            namespace_name=namespace_name,
+            db_name=database_name,
+            admin_username="admin",
+            manage_admin_password=True,
+            log_exports=["userlog", "connectionlog", "useractivitylog"],
+        )
+
+        # Workgroup - RPU limits bound what the reporting queries can cost
+        self._workgroup = redshiftserverless.CfnWorkgroup(
+            self,
+            "Workgroup",
+            workgroup_name=namespace_name,
+            namespace_name=self._namespace.namespace_name,
+            base_capacity=base_capacity,
+            max_capacity=max_capacity,
+            subnet_ids=workgroup_subnets.subnet_ids,
+            security_group_ids=[self._security_group.security_group_id],
+            publicly_accessible=False,
+            # Zero-ETL replicates PostgreSQL identifiers as-is, which requires case sensitivity
+            config_parameters=[
+                redshiftserverless.CfnWorkgroup.ConfigParameterProperty(
+                    parameter_key="enable_case_sensitive_identifier",
+                    parameter_value="true",
+                )
+            ],
+        )
+        self._workgroup.add_dependency(self._namespace)
+
+        # Namespace resource policy - lets the Aurora cluster integrate into the namespace
+        resource_policy = self.create_resource_policy()
+
+        # Zero-ETL integration from the Aurora cluster (see its logical replication parameter group)
+        self._integration = rds.CfnIntegration(
+            self,
+            "ZeroEtlIntegration",
+            integration_name=f"outlier-{self.environment}-zero-etl",
+            source_arn=self.db_cluster.cluster_arn,
+            target_arn=self._namespace.attr_namespace_namespace_arn,
+            data_filter=data_filter,
+            description=f"Zero-ETL from the {self.environment} Aurora cluster to Redshift Serverless",
+        )
+        self._integration.node.add_dependency(resource_policy)
+        self._integration.node.add_dependency(self._workgroup)
+
+    def create_resource_policy(self) -> cr.AwsCustomResource:
+        """Authorize the Aurora cluster as an inbound integration source of the namespace"""
+        # Set through the Redshift API - the policy references the namespace's own ARN
+        namespace_arn = self._namespace.attr_namespace_namespace_arn
+        policy = {
+            "Version": "2012-10-17",
+            "Statement": [
+                {
+                    "Effect": "Allow",
+                    "Principal": {"Service": "redshift.amazonaws.com"},
+                    "Action": "redshift:AuthorizeInboundIntegration",
+                    "Resource": namespace_arn,
+                    "Condition": {
+                        "StringEquals": {"aws:SourceArn": self.db_cluster.cluster_arn}
+                    },
+                },
+                {
+                    "Effect": "Allow",
+                    "Principal": {"AWS": f"arn:aws:iam::{self.account}:root"},
+                    "Action": "redshift:CreateInboundIntegration",
+                    "Resource": namespace_arn,
+                },
+            ],
+        }
+        physical_resource_id = cr.PhysicalResourceId.of(
+            f"outlier-{self.environment}-analytics-resource-policy"
+        )
+
+        put_resource_policy = cr.AwsSdkCall(
+            service="Redshift",
+            action="putResourcePolicy",
+            parameters={
+                "ResourceArn": namespace_arn,
+                "Policy": cdk.Stack.of(self).to_json_string(policy),
+            },
+            physical_resource_id=physical_resource_id,
+        )
+
+        return cr.AwsCustomResource(
+            self,
+            "NamespaceResourcePolicy",
+            on_create=put_resource_policy,
+            on_update=put_resource_policy,
+            on_delete=cr.AwsSdkCall(
+                service="Redshift",
+                action="deleteResourcePolicy",
+                parameters={"ResourceArn": namespace_arn},
+                physical_resource_id=physical_resource_id,
+            ),
+            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
+                resources=[namespace_arn]
+            ),
+            install_latest_aws_sdk=False,
+        )
+
+    @property
+    def namespace(self) -> redshiftserverless.CfnNamespace:
+        return self._namespace
+
+    @property
+    def workgroup(self) -> redshiftserverless.CfnWorkgroup:
+        return self._workgroup
+
+    @property
+    def integration(self) -> rds.CfnIntegration:
+        return self._integration
+
+    @property
+    def security_group(self) -> ec2.ISecurityGroup:
+        return self._security_group
+
+    @property
+    def endpoint_address(self) -> str:
+        return self._workgroup.attr_workgroup_endpoint_address
@@ -5,6 +5,11 @@ from typing import Optional
 import aws_cdk as cdk
 from constructs import Construct
 
+# Existing Route 53 zone and its ACM certificate, shared by the ALB and the Drupal files CDN
+HOSTED_ZONE_ID = "Z05574991AFW5NGZ1X8DH"
+HOSTED_ZONE_NAME = "nightly.savvasoutlier.com"
+CERTIFICATE_ARN = "arn:aws:acm:us-east-1:528757783796:certificate/71eac7f3-f4f4-4a6c-a32b-d6dad41f94e8"
+
 
 class BaseConstruct(Construct):
     def __init__(self, scope: Construct, id: str, **kwargs) -> None:
@@ -0,0 +1,129 @@
+# src/custom_constructs/cache_construct.py
+import aws_cdk as cdk
+from constructs import Construct
+from aws_cdk import (
+    aws_ec2 as ec2,
+    aws_elasticache as elasticache,
+)
+from .base_construct import BaseConstruct
+
+
+class CacheConstruct(BaseConstruct):
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        vpc: ec2.IVpc,
+        service_security_group: ec2.ISecurityGroup,
+        sub_environment: str = "",
+        serverless: bool = True,
+        engine: str = "valkey",
+        engine_version: str = "7.2",
+        max_data_storage_gb: int = 5,
+        max_ecpu_per_second: int = 5000,
+        node_type: str = "cache.t4g.micro",
+        num_cache_clusters: int = 1,
+        **kwargs,
+    ) -> None:
+        super().__init__(scope, id, **kwargs)
+
+        # Store parameters
+        self.serverless = serverless
+        cache_name = f"outlier-cache-{self.environment}{sub_environment}"
+
+        subnet_ids = vpc.select_subnets(
+            subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+        ).subnet_ids
+
+        # Cache Security Group - only reachable from the ECS service
+        self._security_group = ec2.SecurityGroup(
+            self,
+            "CacheSecurityGroup",
+            vpc=vpc,
+            security_group_name=f"{cache_name}-sg-cdk",
+            description=f"Security group for {self.environment}{sub_environment} cache",
+            allow_all_outbound=False,
+        )
+
+        # 6380 is the serverless read-from-replica port
+        self._security_group.add_ingress_rule(
+            peer=ec2.Peer.security_group_id(
+                service_security_group.security_group_id
+            ),
+            connection=ec2.Port.tcp_range(6379, 6380),
+            description=f"Allow {engine} from {self.environment}{sub_environment} ECS service",
+        )
+
+        if self.serverless:
+            # Serverless cache - scales within the configured storage and ECPU limits
+            self._cache = elasticache.CfnServerlessCache(
+                self,
+                "ServerlessCache",
+                serverless_cache_name=cache_name,
+                engine=engine,
+                major_engine_version=engine_version.split(".")[0],
+                cache_usage_limits=elasticache.CfnServerlessCache.CacheUsageLimitsProperty(
+                    data_storage=elasticache.CfnServerlessCache.DataStorageProperty(
+                        maximum=max_data_storage_gb, unit="GB"
+                    ),
+                    ecpu_per_second=elasticache.CfnServerlessCache.ECPUPerSecondProperty(
+                        maximum=max_ecpu_per_second
+                    ),
+                ),
+                security_group_ids=[self._security_group.security_group_id],
+                subnet_ids=subnet_ids,
+            )
+            self._endpoint_address = self._cache.attr_endpoint_address
+            self._endpoint_port = self._cache.attr_endpoint_port
+        else:
+            # Node-based cache - a primary plus (num_cache_clusters - 1) replicas
+            subnet_group = elasticache.CfnSubnetGroup(
+                self,
+                "CacheSubnetGroup",
+                cache_subnet_group_name=f"{cache_name}-subnets",
+                description=f"Subnets for {self.environment}{sub_environment} cache",
+                subnet_ids=subnet_ids,
+            )
+
+            self._cache = elasticache.CfnReplicationGroup(
+                self,
+                "ReplicationGroup",
+                replication_group_id=cache_name,
+                replication_group_description=f"Outlier {self.environment}{sub_environment} cache",
+                engine=engine,
+                engine_version=engine_version,
+                cache_node_type=node_type,
+                num_cache_clusters=num_cache_clusters,
+                automatic_failover_enabled=num_cache_clusters > 1,
+                multi_az_enabled=num_cache_clusters > 1,
+                at_rest_encryption_enabled=True,
+                transit_encryption_enabled=True,
+                cache_subnet_group_name=subnet_group.ref,
+                security_group_ids=[self._security_group.security_group_id],
+            )
+            self._endpoint_address = self._cache.attr_primary_end_point_address
+            self._endpoint_port = self._cache.attr_primary_end_point_port
+
+        self._cache.apply_removal_policy(cdk.RemovalPolicy.DESTROY)
+
+    @property
+    def security_group(self) -> ec2.ISecurityGroup:
+        return self._security_group
+
+    @property
+    def endpoint_address(self) -> str:
+        return self._endpoint_address
+
+    @property
+    def endpoint_port(self) -> str:
+        return self._endpoint_port
+
+    @property
+    def container_environment(self) -> dict:
+        """Environment variables the app container needs to reach the cache - pipeline releases
+        register the app repo's taskdef_*.json, which has to carry the same variables"""
+        return {
+            "CACHE_HOST": self.endpoint_address,
+            "CACHE_PORT": self.endpoint_port,
+            "CACHE_TLS": "true",
+        }
@@ -0,0 +1,207 @@
+from typing import List, Optional
+
+import aws_cdk as cdk
+from constructs import Construct
+from aws_cdk import (
+    aws_cloudwatch as cloudwatch,
+    aws_ecs as ecs,
+    aws_elasticloadbalancingv2 as elbv2,
+    aws_rds as rds,
+    aws_wafv2 as wafv2,
+    Duration,
+)
+from .base_construct import BaseConstruct
+
+# Every widget charts 1-minute datapoints over the same window, so the tiers line up
+DASHBOARD_PERIOD = Duration.minutes(1)
+WIDGET_WIDTH = 8
+WIDGET_HEIGHT = 6
+
+
+class DashboardConstruct(BaseConstruct):
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        alb: elbv2.ApplicationLoadBalancer,
+        target_groups: List[elbv2.ApplicationTargetGroup],
+        service: ecs.FargateService,
+        web_acl: wafv2.CfnWebACL,
+        db_cluster: Optional[rds.IDatabaseCluster] = None,
+        sub_environment: str = "",
+        start: str = "-PT3H",
+    ) -> None:
+        super().__init__(scope, id)
+
+        # Store parameters
+        self.alb = alb
+        self.target_groups = target_groups
+        self.service = service
+        self.web_acl = web_acl
+        self.db_cluster = db_cluster
+
+        dashboard_suffix = f"-{sub_environment}" if sub_environment else ""
+
+        # One dashboard per sub-environment, rows ordered from the edge (WAF/ALB) down to the database
+        self._dashboard = cloudwatch.Dashboard(
+            self,
+            "Dashboard",
+            dashboard_name=f"outlier-{self.environment}{dashboard_suffix}-performance",
+            start=start,
+            period_override=cloudwatch.PeriodOverride.INHERIT,
+        )
+        self._dashboard.add_widgets(*self.create_load_balancer_widgets())
+        self._dashboard.add_widgets(*self.create_service_widgets())
+        if self.db_cluster:
+            self._dashboard.add_widgets(*self.create_database_widgets())
+        self._dashboard.add_widgets(*self.create_waf_widgets())
+
+    def create_load_balancer_widgets(self) -> List[cloudwatch.IWidget]:
+        """Request rate (ALB and per target group), p50/p90/p99 latency and 5xx responses"""
+        target_group_requests = [
+            # Built from dimensions - the green target group has no listener between deployments
+            cloudwatch.Metric(
+                namespace="AWS/ApplicationELB",
+                metric_name="RequestCount",
+                dimensions_map={
+                    "LoadBalancer": self.alb.load_balancer_full_name,
+                    "TargetGroup": target_group.target_group_full_name,
+                },
+                statistic="Sum",
+                period=DASHBOARD_PERIOD,
+                label=f"{target_group.node.id} requests",
+            )
+            for target_group in self.target_groups
+        ]
+
+        return [
+            cloudwatch.GraphWidget(
+                title="Request rate",
+                left=[
+                    self.alb.metrics.request_count(
+                        period=DASHBOARD_PERIOD, label="ALB requests"
+                    ),
+                    *target_group_requests,
+                ],
+                width=WIDGET_WIDTH,
+                height=WIDGET_HEIGHT,
+            ),
+            cloudwatch.GraphWidget(
+                title="Target response time",
+                left=[
+                    self.alb.metrics.target_response_time(
+                        statistic=statistic, period=DASHBOARD_PERIOD, label=statistic
+                    )
+                    for statistic in ("p50", "p90", "p99")
+                ],
+                left_y_axis=cloudwatch.YAxisProps(label="Seconds", show_units=False),
+                width=WIDGET_WIDTH,
+                height=WIDGET_HEIGHT,
+            ),
+            cloudwatch.GraphWidget(
+                title="5xx responses",
+                left=[
+                    self.alb.metrics.http_code_elb(
+                        elbv2.HttpCodeElb.ELB_5XX_COUNT,
+                        period=DASHBOARD_PERIOD,
+                        label="ALB 5xx",
+                    ),
+                    self.alb.metrics.http_code_target(
+                        elbv2.HttpCodeTarget.TARGET_5XX_COUNT,
+                        period=DASHBOARD_PERIOD,
+                        label="Target 5xx",
+                    ),
+                ],
+                width=WIDGET_WIDTH,
+                height=WIDGET_HEIGHT,
+            ),
+        ]
+
+    def create_service_widgets(self) -> List[cloudwatch.IWidget]:
+        """Average and maximum task CPU and memory utilization of the ECS service"""
+        return [
+            cloudwatch.GraphWidget(
+                title=f"ECS task {name}",
+                left=[
+                    metric(statistic=statistic, period=DASHBOARD_PERIOD, label=statistic)
+                    for statistic in ("Average", "Maximum")
+                ],
+                left_y_axis=cloudwatch.YAxisProps(min=0, max=100),
+                width=WIDGET_WIDTH,
+                height=WIDGET_HEIGHT,
+            )
+            for name, metric in (
+                ("CPU", self.service.metric_cpu_utilization),
+                ("memory", self.service.metric_memory_utilization),
+            )
+        ]
+
+    def create_database_widgets(self) -> List[cloudwatch.IWidget]:
+        """Aurora Serverless v2 ACU utilization/capacity and database connections"""
+        return [
+            cloudwatch.GraphWidget(
+                title="Aurora ACU utilization",
+                left=[
+                    self.db_cluster.metric(
+                        "ACUUtilization",
+                        statistic="Maximum",
+                        period=DASHBOARD_PERIOD,
+                        label="ACU utilization (%)",
+                    )
+                ],
+                right=[
+                    self.db_cluster.metric(
+                        "ServerlessDatabaseCapacity",
+                        statistic="Average",
+                        period=DASHBOARD_PERIOD,
+                        label="ACUs",
+                    )
+                ],
+                left_y_axis=cloudwatch.YAxisProps(min=0, max=100),
+                width=WIDGET_WIDTH,
+                height=WIDGET_HEIGHT,
+            ),
+            cloudwatch.GraphWidget(
+                title="Aurora connections",
+                left=[
+                    self.db_cluster.metric_database_connections(
+                        statistic="Maximum", period=DASHBOARD_PERIOD, label="Connections"
+                    )
+                ],
+                width=WIDGET_WIDTH,
+                height=WIDGET_HEIGHT,
+            ),
+        ]
+
+    def create_waf_widgets(self) -> List[cloudwatch.IWidget]:
+        """Blocked and allowed requests across all rules of the web ACL"""
+        # CloudFront web ACL metrics have no Region dimension
+        waf_dimensions = {"WebACL": self.web_acl.name, "Rule": "ALL"}
+        if self.web_acl.scope == "REGIONAL":
+            waf_dimensions["Region"] = cdk.Stack.of(self).region
+        return [
+            cloudwatch.GraphWidget(
+                title="WAF requests",
+                left=[
+                    cloudwatch.Metric(
+                        namespace="AWS/WAFV2",
+                        metric_name=metric_name,
+                        dimensions_map=waf_dimensions,
+                        statistic="Sum",
+                        period=DASHBOARD_PERIOD,
+                        label=label,
+                    )
+                    for metric_name, label in (
+                        ("BlockedRequests", "Blocked"),
+                        ("CountedRequests", "Counted"),
+                        ("AllowedRequests", "Allowed"),
+                    )
+                ],
+                width=WIDGET_WIDTH,
+                height=WIDGET_HEIGHT,
+            ),
+        ]
+
+    @property
+    def dashboard(self) -> cloudwatch.Dashboard:
+        return self._dashboard
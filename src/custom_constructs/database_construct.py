@@ -1,9 +1,23 @@
+from typing import List, Optional
+
+from aws_cdk import aws_applicationautoscaling as appscaling
 from aws_cdk import aws_ec2 as ec2
 from aws_cdk import aws_rds as rds
+from aws_cdk import aws_secretsmanager as secretsmanager
+from aws_cdk import custom_resources as cr
 import aws_cdk as cdk
 from constructs import Construct
 from .base_construct import BaseConstruct
 
+# Predefined Aurora replica metrics the reader autoscaling policy can track
+READER_AUTOSCALING_METRICS = {
+    "cpu": appscaling.PredefinedMetric.RDS_READER_AVERAGE_CPU_UTILIZATION,
+    "connections": appscaling.PredefinedMetric.RDS_READER_AVERAGE_DATABASE_CONNECTIONS,
+}
+
+# Aurora supports up to 15 replicas per cluster
+MAX_AURORA_READERS = 15
+
 
 class DatabaseConstruct(BaseConstruct):
     def __init__(
@@ -12,9 +26,46 @@ class DatabaseConstruct(BaseConstruct):
         id: str,
         vpc: ec2.IVpc,
         security_group: ec2.ISecurityGroup,
+        enable_proxy: bool = False,
+        proxy_secret_name: Optional[str] = None,
+        proxy_client_security_group_ids: Optional[List[str]] = None,
+        proxy_max_connections_percent: int = 90,
+        proxy_max_idle_connections_percent: int = 50,
+        proxy_borrow_timeout: cdk.Duration = cdk.Duration.seconds(30),
+        reader_count: int = 1,
+        min_capacity: float = 0.5,
+        max_capacity: float = 4,
+        enable_performance_insights: bool = False,
+        performance_insights_retention: rds.PerformanceInsightRetention = rds.PerformanceInsightRetention.DEFAULT,
+        enable_reader_autoscaling: bool = False,
+        max_reader_count: int = 3,
+        reader_autoscaling_metric: str = "cpu",
+        reader_autoscaling_target: float = 60,
+        create_custom_reader_endpoint: bool = False,
     ):
         super().__init__(scope, id)
 
+        # Store parameters
+        self.vpc = vpc
+        self.security_group = security_group
+
+        if not 0 <= reader_count <= MAX_AURORA_READERS:
+            raise ValueError(
+                f"reader_count must be between 0 and {MAX_AURORA_READERS}, got {reader_count}"
+            )
+        if min_capacity > max_capacity:
+            raise ValueError(
+                f"min_capacity ({min_capacity}) cannot exceed max_capacity ({max_capacity})"
+            )
+
+        # Performance Insights settings shared by the writer and every reader
+        performance_insights = {
+            "enable_performance_insights": enable_performance_insights or None,
+            "performance_insight_retention": (
+                performance_insights_retention if enable_performance_insights else None
+            ),
+        }
+
         # Define PostgreSQL 16.4 version manually since it apparently isn't in CDK enums yet
         pg_engine_version = rds.AuroraPostgresEngineVersion.of("16.4", "16")
 
@@ -53,14 +104,19 @@ class DatabaseConstruct(BaseConstruct):
             engine=rds.DatabaseClusterEngine.aurora_postgres(version=pg_engine_version),
             snapshot_identifier="outlier-nightly-db-cluster-snapshot-03-11",
             cluster_identifier="outlier-nightly-db-cluster-cdk",
-            writer=rds.ClusterInstance.serverless_v2("writer", scale_with_writer=True),
+            writer=rds.ClusterInstance.serverless_v2(
+                "writer", scale_with_writer=True, **performance_insights
+            ),
             readers=[
                 rds.ClusterInstance.serverless_v2(
-                    "reader1", scale_with_writer=False  # Will scale based on read load
+                    f"reader{index}",
+                    scale_with_writer=False,  # Will scale based on read load
+                    **performance_insights,
                 )
+                for index in range(1, reader_count + 1)
             ],
-            serverless_v2_min_capacity=0.5,  # Min 0.5 ACU = ~1GB RAM
-            serverless_v2_max_capacity=4,  # Max 4 ACU = ~8GB RAM
+            serverless_v2_min_capacity=min_capacity,  # 0.5 ACU = ~1GB RAM
+            serverless_v2_max_capacity=max_capacity,  # 4 ACU = ~8GB RAM
             port=5432,
             instance_identifier_base="outlier-nightly-db-cdk",
             vpc=vpc,
@@ -76,6 +132,186 @@ class DatabaseConstruct(BaseConstruct):
             cloudwatch_logs_exports=["postgresql"],
         )
 
+        # Aurora replica autoscaling - adds readers beyond reader_count under read load
+        if enable_reader_autoscaling:
+            self.create_reader_autoscaling(
+                min_readers=reader_count,
+                max_readers=max_reader_count,
+                metric=reader_autoscaling_metric,
+                target_value=reader_autoscaling_target,
+            )
+
+        # Custom reader endpoint - only the readers autoscaling adds beyond reader_count
+        if create_custom_reader_endpoint:
+            self.create_custom_reader_endpoint()
+
+        # RDS Proxy - pools connections from the ECS tasks in front of the cluster
+        if enable_proxy:
+            self.create_proxy(
+                secret_name=proxy_secret_name,
+                client_security_group_ids=proxy_client_security_group_ids or [],
+                max_connections_percent=proxy_max_connections_percent,
+                max_idle_connections_percent=proxy_max_idle_connections_percent,
+                borrow_timeout=proxy_borrow_timeout,
+            )
+
+    def create_custom_reader_endpoint(self):
+        """Create a READER custom endpoint through the RDS API (CloudFormation has no resource for it)"""
+        endpoint_identifier = f"outlier-{self.environment}-db-readers-cdk"
+        physical_resource_id = cr.PhysicalResourceId.of(endpoint_identifier)
+
+        # Excluding the static readers (instance_identifiers starts with the writer) leaves the
+        # readers autoscaling adds - new instances join an endpoint with an exclusion list automatically
+        static_reader_identifiers = self.db_cluster.instance_identifiers[1:]
+        members = {"ExcludedMembers": static_reader_identifiers}
+
+        self._custom_reader_endpoint = cr.AwsCustomResource(
+            self,
+            "CustomReaderEndpoint",
+            on_create=cr.AwsSdkCall(
+                service="RDS",
+                action="createDBClusterEndpoint",
+                parameters={
+                    "DBClusterEndpointIdentifier": endpoint_identifier,
+                    "DBClusterIdentifier": self.db_cluster.cluster_identifier,
+                    "EndpointType": "READER",
+                    **members,
+                },
+                physical_resource_id=physical_resource_id,
+            ),
+            # Keeps the exclusion list in step with reader_count
+            on_update=cr.AwsSdkCall(
+                service="RDS",
+                action="modifyDBClusterEndpoint",
+                parameters={
+                    "DBClusterEndpointIdentifier": endpoint_identifier,
+                    "EndpointType": "READER",
+                    **members,
+                },
+                physical_resource_id=physical_resource_id,
+            ),
+            on_delete=cr.AwsSdkCall(
+                service="RDS",
+                action="deleteDBClusterEndpoint",
+                parameters={"DBClusterEndpointIdentifier": endpoint_identifier},
+                physical_resource_id=physical_resource_id,
+            ),
+            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
+                resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE
+            ),
+            install_latest_aws_sdk=False,
+        )
+
+    def create_reader_autoscaling(
+        self,
+        min_readers: int,
+        max_readers: int,
+        metric: str,
+        target_value: float,
+    ) -> appscaling.ScalableTarget:
+        """Scale the cluster's Aurora replica count on reader CPU or connections"""
+        if metric not in READER_AUTOSCALING_METRICS:
+            raise ValueError(
+                f"Unsupported reader_autoscaling_metric '{metric}', expected one of {list(READER_AUTOSCALING_METRICS)}"
+            )
+        if not min_readers <= max_readers <= MAX_AURORA_READERS:
+            raise ValueError(
+                f"max_reader_count must be between reader_count ({min_readers}) and {MAX_AURORA_READERS}, got {max_readers}"
+            )
+
+        self._reader_scalable_target = appscaling.ScalableTarget(
+            self,
+            "ReaderScalableTarget",
+            service_namespace=appscaling.ServiceNamespace.RDS,
+            scalable_dimension="rds:cluster:ReadReplicaCount",
+            resource_id=f"cluster:{self.db_cluster.cluster_identifier}",
+            min_capacity=min_readers,
+            max_capacity=max_readers,
+        )
+        self._reader_scalable_target.scale_to_track_metric(
+            "ReaderScaling",
+            predefined_metric=READER_AUTOSCALING_METRICS[metric],
+            target_value=target_value,
+            scale_in_cooldown=cdk.Duration.minutes(5),
+            scale_out_cooldown=cdk.Duration.minutes(5),
+        )
+
+        return self._reader_scalable_target
+
+    def create_proxy(
+        self,
+        secret_name: Optional[str],
+        client_security_group_ids: List[str],
+        max_connections_percent: int,
+        max_idle_connections_percent: int,
+        borrow_timeout: cdk.Duration,
+    ):
+        """Create an IAM-authenticated RDS Proxy with read-write and read-only endpoints"""
+        if not secret_name:
+            raise ValueError("proxy_secret_name is required when enable_proxy=True")
+
+        # Import the existing DB credentials secret - Secrets Manager is not managed here
+        proxy_secret = secretsmanager.Secret.from_secret_name_v2(
+            self, "ProxySecret", secret_name
+        )
+
+        # Proxy Security Group
+        proxy_name = f"outlier-rds-proxy-{self.environment}-sg-cdk"
+        self.proxy_sg = ec2.SecurityGroup(
+            self,
+            "ProxySecurityGroup",
+            vpc=self.vpc,
+            security_group_name=proxy_name,
+            description=f"Security group for {self.environment} RDS Proxy",
+            allow_all_outbound=True,
+        )
+
+        # Allow PostgreSQL from the ECS services to the proxy
+        for client_security_group_id in client_security_group_ids:
+            self.proxy_sg.add_ingress_rule(
+                peer=ec2.Peer.security_group_id(client_security_group_id),
+                connection=ec2.Port.tcp(5432),
+                description=f"Allow PostgreSQL from {client_security_group_id}",
+            )
+
+        # Allow PostgreSQL from the proxy to the cluster
+        self.security_group.add_ingress_rule(
+            peer=ec2.Peer.security_group_id(self.proxy_sg.security_group_id),
+            connection=ec2.Port.tcp(5432),
+            description=f"Allow PostgreSQL from {self.environment} RDS Proxy",
+        )
+
+        self._proxy = rds.DatabaseProxy(
+            self,
+            "DBProxy",
+            proxy_target=rds.ProxyTarget.from_cluster(self.db_cluster),
+            secrets=[proxy_secret],
+            vpc=self.vpc,
+            vpc_subnets=ec2.SubnetSelection(
+                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+            ),
+            security_groups=[self.proxy_sg],
+            db_proxy_name=f"outlier-{self.environment}-db-proxy-cdk",
+            iam_auth=True,
+            require_tls=True,
+            max_connections_percent=max_connections_percent,
+            max_idle_connections_percent=max_idle_connections_percent,
+            borrow_timeout=borrow_timeout,
+        )
+
+        # Read-only endpoint - routes to the cluster's reader instances
+        self._proxy_reader_endpoint = rds.CfnDBProxyEndpoint(
+            self,
+            "DBProxyReaderEndpoint",
+            db_proxy_name=self._proxy.db_proxy_name,
+            db_proxy_endpoint_name=f"outlier-{self.environment}-db-proxy-reader-cdk",
+            target_role="READ_ONLY",
+            vpc_subnet_ids=self.vpc.select_subnets(
+                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+            ).subnet_ids,
+            vpc_security_group_ids=[self.proxy_sg.security_group_id],
+        )
+
     @property
     def cluster_endpoint(self) -> str:
         return self.db_cluster.cluster_endpoint.hostname
@@ -84,6 +320,38 @@ class DatabaseConstruct(BaseConstruct):
     def reader_endpoint(self) -> str:
         return self.db_cluster.cluster_read_endpoint.hostname
 
+    @property
+    def custom_reader_endpoint(self) -> str:
+        if hasattr(self, "_custom_reader_endpoint"):
+            return self._custom_reader_endpoint.get_response_field("Endpoint")
+        raise AttributeError(
+            "No custom reader endpoint - was create_custom_reader_endpoint=True?"
+        )
+
+    @property
+    def reader_scalable_target(self) -> appscaling.ScalableTarget:
+        if hasattr(self, "_reader_scalable_target"):
+            return self._reader_scalable_target
+        raise AttributeError(
+            "No reader scalable target - was enable_reader_autoscaling=True?"
+        )
+
+    @property
+    def proxy(self) -> rds.DatabaseProxy:
+        if hasattr(self, "_proxy"):
+            return self._proxy
+        raise AttributeError("No RDS Proxy - was enable_proxy=True?")
+
+    @property
+    def proxy_endpoint(self) -> str:
+        return self.proxy.endpoint
+
+    @property
+    def proxy_reader_endpoint(self) -> str:
+        if hasattr(self, "_proxy_reader_endpoint"):
+            return self._proxy_reader_endpoint.attr_endpoint
+        raise AttributeError("No RDS Proxy - was enable_proxy=True?")
+
     @property
     def db_port(self) -> int:
         return self.db_cluster.cluster_endpoint.port
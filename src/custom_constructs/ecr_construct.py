@@ -3,26 +3,51 @@ from constructs import Construct
 from aws_cdk import aws_ecr as ecr
 from .base_construct import BaseConstruct
 
+# Tagged images kept in each repository
+KEPT_IMAGE_COUNT = 10
+
 
 class EcrConstruct(BaseConstruct):
     def __init__(
-        self, scope: Construct, id: str, sub_environment: str = "", **kwargs
+        self,
+        scope: Construct,
+        id: str,
+        sub_environment: str = "",
+        keep_soci_indexes: bool = False,
+        **kwargs,
     ) -> None:
         super().__init__(scope, id, **kwargs)
 
+        lifecycle_rules = [
+            ecr.LifecycleRule(
+                description=f"Keep only the last {KEPT_IMAGE_COUNT} images",
+                max_image_count=KEPT_IMAGE_COUNT,
+                rule_priority=1,
+                tag_status=ecr.TagStatus.ANY,
+            )
+        ]
+
+        # SOCI indexes are pushed as untagged artifacts next to each image, so only tagged
+        # images are counted. Lifecycle rules cannot tell SOCI indexes from other untagged
+        # manifests, so untagged artifacts are not expired at all - any count or age limit
+        # could drop the index of an image that is still kept
+        if keep_soci_indexes:
+            lifecycle_rules = [
+                ecr.LifecycleRule(
+                    description=f"Keep only the last {KEPT_IMAGE_COUNT} tagged images",
+                    max_image_count=KEPT_IMAGE_COUNT,
+                    rule_priority=1,
+                    tag_status=ecr.TagStatus.TAGGED,
+                    tag_pattern_list=["*"],
+                ),
+            ]
+
         self._repository = ecr.Repository(
             self,
             "EcrRepo",
             repository_name=f"outlier-ecr-{self.environment}{sub_environment}",
             removal_policy=cdk.RemovalPolicy.DESTROY,
-            lifecycle_rules=[
-                ecr.LifecycleRule(
-                    description="Keep only the last 10 images",
-                    max_image_count=10,  # Keep only the last 10 images
-                    rule_priority=1,
-                    tag_status=ecr.TagStatus.ANY,
-                )
-            ],
+            lifecycle_rules=lifecycle_rules,
         )
 
     @property
@@ -1,16 +1,50 @@
 # src/custom_constructs/ecs_construct_new.py
+import os
+from typing import Dict, Optional
+
 import aws_cdk as cdk
 from constructs import Construct
 from aws_cdk import (
+    aws_applicationautoscaling as appscaling,
+    aws_cloudwatch as cloudwatch,
     aws_ecs as ecs,
     aws_ec2 as ec2,
     aws_iam as iam,
     aws_logs as logs,
     aws_ecr as ecr,
+    aws_s3 as s3,
+    aws_s3_assets as s3_assets,
+    aws_secretsmanager as secretsmanager,
     aws_elasticloadbalancingv2 as elbv2,
 )
 from .base_construct import BaseConstruct
 
+# Fargate CPU architectures, keyed by the stack-level `cpu_architecture` setting. CloudFormation
+# doesn't update the task definition of a CODE_DEPLOY service, so pipeline releases run on the
+# runtimePlatform of the app repo's taskdef_*.json
+CPU_ARCHITECTURES = {
+    "X86_64": ecs.CpuArchitecture.X86_64,
+    "ARM64": ecs.CpuArchitecture.ARM64,
+}
+
+# Task size - identical CPU/memory to original
+TASK_CPU = 2048  # 2 vCPU
+TASK_MEMORY_MIB = 4096  # 4GB
+
+# Shared volume the Datadog agent creates its APM and DogStatsD Unix sockets in
+DATADOG_SOCKET_VOLUME = "dd-sockets"
+DATADOG_SOCKET_PATH = "/var/run/datadog"
+
+# Log drivers for the app container - awslogs straight to CloudWatch Logs,
+# or FireLens (Fluent Bit) batching to CloudWatch Logs and S3. Pipeline releases register
+# the app repo's taskdef_*.json, which needs the same log configuration (README)
+LOG_DRIVERS = ("awslogs", "firelens")
+
+# Fluent Bit outputs the FireLens log router loads from S3 (Fargate can't use config_file_type S3)
+FIRELENS_CONFIG_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "assets", "ecs", "fluent-bit", "outputs.conf"
+)
+
 
 class EcsConstruct(BaseConstruct):
     def __init__(
@@ -25,15 +59,49 @@ class EcsConstruct(BaseConstruct):
         desired_count: int = 2,
         container_name: str = "Outlier-Service-Container-nightly",
         log_group_name: str = "/ecs/Outlier-Service-nightly",
+        use_fargate_spot: bool = False,
+        on_demand_base: int = 1,
+        on_demand_weight: int = 1,
+        spot_weight: int = 1,
+        cpu_architecture: str = "X86_64",
+        container_environment: Optional[Dict[str, str]] = None,
+        enable_datadog: bool = False,
+        datadog_service: str = "outlier-api",
+        datadog_env: Optional[str] = None,
+        datadog_site: str = "datadoghq.com",
+        datadog_api_key_secret_name: str = "DATADOG_API_KEY",
+        datadog_agent_image: str = "public.ecr.aws/datadog/agent:7",
+        datadog_cpu: int = 256,
+        datadog_memory_mib: int = 512,
+        log_driver: Optional[str] = None,
+        log_max_buffer_size_mib: int = 25,
+        log_bucket: Optional[s3.IBucket] = None,
+        firelens_image: str = "public.ecr.aws/aws-observability/aws-for-fluent-bit:init-latest",
+        firelens_cpu: int = 128,
+        firelens_memory_mib: int = 256,
         **kwargs,
     ) -> None:
         super().__init__(scope, id, **kwargs)
 
         # Store parameters
+        self.blue_target_group = blue_target_group
         self.cluster_name = cluster_name
         self.desired_count = desired_count
         self.container_name = container_name
         self.log_group_name = log_group_name
+        self.use_fargate_spot = use_fargate_spot
+        self.cpu_architecture = cpu_architecture
+        self.enable_datadog = enable_datadog
+        self.log_driver = log_driver
+
+        if self.log_driver is not None and self.log_driver not in LOG_DRIVERS:
+            raise ValueError(
+                f"Unsupported log_driver '{self.log_driver}', expected one of {list(LOG_DRIVERS)}"
+            )
+        if self.cpu_architecture not in CPU_ARCHITECTURES:
+            raise ValueError(
+                f"Unsupported cpu_architecture '{self.cpu_architecture}', expected one of {list(CPU_ARCHITECTURES)}"
+            )
 
         # ECS Logs - identical to original
         ecs_logs = logs.LogGroup(
@@ -46,9 +114,36 @@ class EcsConstruct(BaseConstruct):
 
         # ECS Cluster - identical to original
         self._cluster = ecs.Cluster(
-            self, "Cluster", vpc=vpc, cluster_name=self.cluster_name
+            self,
+            "Cluster",
+            vpc=vpc,
+            cluster_name=self.cluster_name,
+            enable_fargate_capacity_providers=self.use_fargate_spot,
         )
 
+        # Capacity Provider Strategy - on-demand baseline with Spot burst capacity.
+        # Only for a new service: CloudFormation replaces an existing service that moves from
+        # LaunchType FARGATE to a strategy (breaking its CodeDeploy deployment group), and
+        # UpdateService can't change the strategy of a CODE_DEPLOY service. CodeDeploy applies
+        # the strategy per replacement task set from the appspec instead, so the app repo's
+        # appspec_*.yaml needs the same CapacityProviderStrategy under TargetService.Properties
+        capacity_provider_strategies = None
+        if self.use_fargate_spot:
+            if on_demand_weight + spot_weight == 0:
+                raise ValueError(
+                    "At least one of on_demand_weight or spot_weight must be greater than 0"
+                )
+            capacity_provider_strategies = [
+                ecs.CapacityProviderStrategy(
+                    capacity_provider="FARGATE",
+                    base=on_demand_base,
+                    weight=on_demand_weight,
+                ),
+                ecs.CapacityProviderStrategy(
+                    capacity_provider="FARGATE_SPOT", weight=spot_weight
+                ),
+            ]
+
         # Task Execution Role - identical to original, using existing role
         task_execution_role = iam.Role.from_role_arn(
             self,
@@ -82,18 +177,90 @@ class EcsConstruct(BaseConstruct):
             "TaskDef",
             execution_role=task_execution_role,
             task_role=task_execution_role,
-            cpu=2048,  # 2 vCPU
-            memory_limit_mib=4096,  # 4GB
+            cpu=TASK_CPU,
+            memory_limit_mib=TASK_MEMORY_MIB,
+            runtime_platform=ecs.RuntimePlatform(
+                cpu_architecture=CPU_ARCHITECTURES[self.cpu_architecture],
+                operating_system_family=ecs.OperatingSystemFamily.LINUX,
+            ),
+        )
+
+        # Sidecars reserve their own CPU/memory, the app reserves whatever they don't
+        sidecar_cpu = (datadog_cpu if self.enable_datadog else 0) + (
+            firelens_cpu if self.log_driver == "firelens" else 0
         )
+        sidecar_memory_mib = (datadog_memory_mib if self.enable_datadog else 0) + (
+            firelens_memory_mib if self.log_driver == "firelens" else 0
+        )
+        if sidecar_cpu >= TASK_CPU or sidecar_memory_mib >= TASK_MEMORY_MIB:
+            raise ValueError(
+                f"The sidecars ({sidecar_cpu} CPU, {sidecar_memory_mib} MiB) must leave room for the app "
+                f"in the {TASK_CPU} CPU / {TASK_MEMORY_MIB} MiB task"
+            )
 
-        # Add container with minimal config - parameterized name
+        # Non-blocking log delivery - when the log backend slows down, the driver buffers
+        # (and past the buffer, drops) log lines instead of blocking the app's stdout/stderr writes
+        app_logging = None
+        if self.log_driver == "awslogs":
+            app_logging = ecs.LogDrivers.aws_logs(
+                stream_prefix="app",
+                log_group=ecs_logs,
+                mode=ecs.AwsLogDriverMode.NON_BLOCKING,
+                max_buffer_size=cdk.Size.mebibytes(log_max_buffer_size_mib),
+            )
+        elif self.log_driver == "firelens":
+            # Outputs come from the router's config file - only the buffer is set per container
+            app_logging = ecs.LogDrivers.firelens(
+                options={
+                    "log-driver-buffer-limit": str(
+                        int(cdk.Size.mebibytes(log_max_buffer_size_mib).to_bytes())
+                    )
+                }
+            )
+
+        # Add container with minimal config - parameterized name. Only tasks started from this task
+        # definition get container_environment: releases run the app repo's taskdef_*.json (README)
         app_container = task_definition.add_container(
             self.container_name,
             image=ecs.ContainerImage.from_ecr_repository(ecr_repository, tag="latest"),
+            environment=container_environment,
+            cpu=TASK_CPU - sidecar_cpu if sidecar_cpu else None,
+            memory_reservation_mib=(
+                TASK_MEMORY_MIB - sidecar_memory_mib if sidecar_memory_mib else None
+            ),
+            logging=app_logging,
         )
 
         app_container.add_port_mappings(ecs.PortMapping(container_port=1337))
 
+        # FireLens log router - added after the app so the app stays the task's default container
+        if self.log_driver == "firelens":
+            self.create_log_router(
+                task_definition,
+                app_container,
+                task_role=task_execution_role,
+                log_group=ecs_logs,
+                log_bucket=log_bucket,
+                image=firelens_image,
+                cpu=firelens_cpu,
+                memory_mib=firelens_memory_mib,
+                max_buffer_size_mib=log_max_buffer_size_mib,
+            )
+
+        # Datadog agent sidecar - APM traces and DogStatsD metrics over Unix sockets
+        if self.enable_datadog:
+            self.create_datadog_agent(
+                task_definition,
+                app_container,
+                service=datadog_service,
+                env=datadog_env or self.environment,
+                site=datadog_site,
+                api_key_secret_name=datadog_api_key_secret_name,
+                image=datadog_agent_image,
+                cpu=datadog_cpu,
+                memory_mib=datadog_memory_mib,
+            )
+
         # Create service - identical to original but parameterized
         self._service = ecs.FargateService(
             self,
@@ -101,6 +268,7 @@ class EcsConstruct(BaseConstruct):
             cluster=self._cluster,
             task_definition=task_definition,
             desired_count=self.desired_count,
+            capacity_provider_strategies=capacity_provider_strategies,
             security_groups=[security_group],
             vpc_subnets=ec2.SubnetSelection(
                 subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
@@ -113,6 +281,233 @@ class EcsConstruct(BaseConstruct):
         # Attach the service to the ALB Target Group
         self._service.attach_to_application_target_group(blue_target_group)
 
+    def create_datadog_agent(
+        self,
+        task_definition: ecs.FargateTaskDefinition,
+        app_container: ecs.ContainerDefinition,
+        service: str,
+        env: str,
+        site: str,
+        api_key_secret_name: str,
+        image: str,
+        cpu: int,
+        memory_mib: int,
+    ) -> ecs.ContainerDefinition:
+        """Add a Datadog agent container sharing a socket volume with the app container"""
+        api_key = secretsmanager.Secret.from_secret_name_v2(
+            self, "DatadogApiKey", api_key_secret_name
+        )
+        task_definition.add_volume(name=DATADOG_SOCKET_VOLUME)
+        socket_mount = ecs.MountPoint(
+            container_path=DATADOG_SOCKET_PATH,
+            source_volume=DATADOG_SOCKET_VOLUME,
+            read_only=False,
+        )
+
+        # Hard memory limit and CPU reservation keep the agent from starving the app
+        self._datadog_container = task_definition.add_container(
+            "DatadogAgent",
+            container_name="datadog-agent",
+            image=ecs.ContainerImage.from_registry(image),
+            cpu=cpu,
+            memory_limit_mib=memory_mib,
+            essential=False,  # The app keeps serving if the agent dies
+            secrets={"DD_API_KEY": ecs.Secret.from_secrets_manager(api_key)},
+            environment={
+                "ECS_FARGATE": "true",
+                "DD_SITE": site,
+                "DD_ENV": env,
+                "DD_SERVICE": service,
+                "DD_APM_ENABLED": "true",
+                "DD_APM_RECEIVER_SOCKET": f"{DATADOG_SOCKET_PATH}/apm.socket",
+                "DD_DOGSTATSD_SOCKET": f"{DATADOG_SOCKET_PATH}/dsd.socket",
+                "DD_DOGSTATSD_ORIGIN_DETECTION": "true",
+            },
+        )
+        self._datadog_container.add_mount_points(socket_mount)
+
+        # Trace submission settings for the app's Datadog tracer
+        app_container.add_mount_points(socket_mount)
+        app_container.add_container_dependencies(
+            ecs.ContainerDependency(
+                container=self._datadog_container,
+                condition=ecs.ContainerDependencyCondition.START,
+            )
+        )
+        for name, value in {
+            "DD_ENV": env,
+            "DD_SERVICE": service,
+            "DD_TRACE_AGENT_URL": f"unix://{DATADOG_SOCKET_PATH}/apm.socket",
+            "DD_DOGSTATSD_URL": f"unix://{DATADOG_SOCKET_PATH}/dsd.socket",
+            "DD_RUNTIME_METRICS_ENABLED": "true",
+            "DD_LOGS_INJECTION": "true",
+        }.items():
+            app_container.add_environment(name, value)
+
+        return self._datadog_container
+
+    def create_log_router(
+        self,
+        task_definition: ecs.FargateTaskDefinition,
+        app_container: ecs.ContainerDefinition,
+        task_role: iam.IRole,
+        log_group: logs.ILogGroup,
+        log_bucket: Optional[s3.IBucket],
+        image: str,
+        cpu: int,
+        memory_mib: int,
+        max_buffer_size_mib: int,
+    ) -> ecs.FirelensLogRouter:
+        """Add a FireLens (Fluent Bit) log router batching app logs to CloudWatch Logs and gzipped objects in S3"""
+        if log_bucket is None:
+            log_bucket = s3.Bucket(
+                self,
+                "ContainerLogBucket",
+                encryption=s3.BucketEncryption.S3_MANAGED,
+                bucket_key_enabled=True,
+                enforce_ssl=True,
+                block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+                object_ownership=s3.ObjectOwnership.BUCKET_OWNER_ENFORCED,
+                lifecycle_rules=[
+                    s3.LifecycleRule(
+                        id="TierContainerLogs",
+                        transitions=[
+                            s3.Transition(
+                                storage_class=s3.StorageClass.INFREQUENT_ACCESS,
+                                transition_after=cdk.Duration.days(30),
+                            )
+                        ],
+                        expiration=cdk.Duration.days(365),
+                    )
+                ],
+            )
+            cdk.Tags.of(log_bucket).add(
+                "savvas:security:s3:public-bucket:exempt", "false"
+            )
+        self._log_bucket = log_bucket
+
+        # The init image downloads the outputs config before Fluent Bit starts
+        router_config = s3_assets.Asset(self, "LogRouterConfig", path=FIRELENS_CONFIG_PATH)
+
+        # Fluent Bit runs with the task role
+        router_config.grant_read(task_role)
+        log_group.grant_write(task_role)
+        log_bucket.grant_put(task_role)
+
+        self._log_router = task_definition.add_firelens_log_router(
+            "LogRouter",
+            container_name="log-router",
+            image=ecs.ContainerImage.from_registry(image),
+            firelens_config=ecs.FirelensConfig(
+                type=ecs.FirelensLogRouterType.FLUENTBIT,
+                options=ecs.FirelensOptions(enable_ecs_log_metadata=True),
+            ),
+            cpu=cpu,
+            memory_reservation_mib=memory_mib,
+            environment={
+                "aws_fluent_bit_init_s3_1": f"arn:aws:s3:::{router_config.s3_bucket_name}/{router_config.s3_object_key}",
+                "LOG_REGION": self.region,
+                "LOG_GROUP_NAME": log_group.log_group_name,
+                "LOG_BUCKET": log_bucket.bucket_name,
+            },
+            # The router's own logs - also non-blocking
+            logging=ecs.LogDrivers.aws_logs(
+                stream_prefix="log-router",
+                log_group=log_group,
+                mode=ecs.AwsLogDriverMode.NON_BLOCKING,
+                max_buffer_size=cdk.Size.mebibytes(max_buffer_size_mib),
+            ),
+        )
+
+        app_container.add_container_dependencies(
+            ecs.ContainerDependency(
+                container=self._log_router,
+                condition=ecs.ContainerDependencyCondition.START,
+            )
+        )
+
+        return self._log_router
+
+    def add_autoscaling(
+        self,
+        min_capacity: int,
+        max_capacity: int,
+        cpu_target_percent: Optional[int] = None,
+        memory_target_percent: Optional[int] = None,
+        requests_per_target: Optional[int] = None,
+        green_target_group: Optional[elbv2.IApplicationTargetGroup] = None,
+        schedules: Optional[Dict[str, appscaling.ScalingSchedule]] = None,
+        scale_in_cooldown: cdk.Duration = cdk.Duration.minutes(5),
+        scale_out_cooldown: cdk.Duration = cdk.Duration.minutes(1),
+    ) -> ecs.ScalableTaskCount:
+        """Scale the service's desired count - CodeDeploy still owns the task sets"""
+        if min_capacity > max_capacity:
+            raise ValueError(
+                f"min_capacity ({min_capacity}) cannot exceed max_capacity ({max_capacity})"
+            )
+
+        self._scalable_target = self._service.auto_scale_task_count(
+            min_capacity=min_capacity, max_capacity=max_capacity
+        )
+
+        if cpu_target_percent is not None:
+            self._scalable_target.scale_on_cpu_utilization(
+                "CpuScaling",
+                target_utilization_percent=cpu_target_percent,
+                scale_in_cooldown=scale_in_cooldown,
+                scale_out_cooldown=scale_out_cooldown,
+            )
+
+        if memory_target_percent is not None:
+            self._scalable_target.scale_on_memory_utilization(
+                "MemoryScaling",
+                target_utilization_percent=memory_target_percent,
+                scale_in_cooldown=scale_in_cooldown,
+                scale_out_cooldown=scale_out_cooldown,
+            )
+
+        if requests_per_target is not None:
+            self._scalable_target.scale_on_request_count(
+                "RequestCountScaling",
+                requests_per_target=requests_per_target,
+                target_group=self.blue_target_group,
+                scale_in_cooldown=scale_in_cooldown,
+                scale_out_cooldown=scale_out_cooldown,
+            )
+
+            # The green target group is only attached to a listener by CodeDeploy,
+            # so track its per-target request count through the TargetGroup dimension
+            if green_target_group is not None:
+                self._scalable_target.scale_to_track_custom_metric(
+                    "GreenRequestCountScaling",
+                    metric=cloudwatch.Metric(
+                        namespace="AWS/ApplicationELB",
+                        metric_name="RequestCountPerTarget",
+                        dimensions_map={
+                            "TargetGroup": green_target_group.target_group_full_name
+                        },
+                        statistic="Sum",
+                        period=cdk.Duration.minutes(1),
+                    ),
+                    target_value=requests_per_target,
+                    scale_in_cooldown=scale_in_cooldown,
+                    scale_out_cooldown=scale_out_cooldown,
+                )
+
+        # Scheduled windows only move the min/max bounds, target tracking still decides the count
+        for name, schedule in (schedules or {}).items():
+            self._scalable_target.scale_on_schedule(
+                name,
+                schedule=schedule.schedule,
+                min_capacity=schedule.min_capacity,
+                max_capacity=schedule.max_capacity,
+                time_zone=schedule.time_zone,
+                start_time=schedule.start_time,
+                end_time=schedule.end_time,
+            )
+
+        return self._scalable_target
+
     @property
     def cluster(self) -> ecs.ICluster:
         return self._cluster
@@ -120,3 +515,27 @@ class EcsConstruct(BaseConstruct):
     @property
     def service(self) -> ecs.FargateService:
         return self._service
+
+    @property
+    def datadog_container(self) -> ecs.ContainerDefinition:
+        if hasattr(self, "_datadog_container"):
+            return self._datadog_container
+        raise AttributeError("No Datadog agent container - was enable_datadog=True?")
+
+    @property
+    def log_router(self) -> ecs.FirelensLogRouter:
+        if hasattr(self, "_log_router"):
+            return self._log_router
+        raise AttributeError("No FireLens log router - was log_driver='firelens'?")
+
+    @property
+    def log_bucket(self) -> s3.IBucket:
+        if hasattr(self, "_log_bucket"):
+            return self._log_bucket
+        raise AttributeError("No container log bucket - was log_driver='firelens'?")
+
+    @property
+    def scalable_target(self) -> ecs.ScalableTaskCount:
+        if hasattr(self, "_scalable_target"):
+            return self._scalable_target
+        raise AttributeError("No scalable target - was add_autoscaling() called?")
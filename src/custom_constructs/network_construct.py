@@ -1,9 +1,28 @@
 # src/custom_constructs/network_construct.py
-from aws_cdk import aws_ec2 as ec2
+from typing import Dict, List, Optional
+
+from aws_cdk import aws_ec2 as ec2, custom_resources as cr
 import aws_cdk as cdk
 from constructs import Construct
 from .base_construct import BaseConstruct
 
+# AWS-managed prefix list of the CloudFront origin-facing servers - its ID differs per region
+CLOUDFRONT_ORIGIN_FACING_PREFIX_LIST_NAME = "com.amazonaws.global.cloudfront.origin-facing"
+
+# Interface endpoints NetworkConstruct can create, keyed by the names used in `interface_endpoints`
+INTERFACE_ENDPOINTS = {
+    "SecretsManager": ec2.InterfaceVpcEndpointAwsService.SECRETS_MANAGER,
+    "EcrApi": ec2.InterfaceVpcEndpointAwsService.ECR,
+    "EcrDkr": ec2.InterfaceVpcEndpointAwsService.ECR_DOCKER,
+    "Logs": ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_LOGS,
+    "Sqs": ec2.InterfaceVpcEndpointAwsService.SQS,
+    "Firehose": ec2.InterfaceVpcEndpointAwsService.KINESIS_FIREHOSE,
+    "Kms": ec2.InterfaceVpcEndpointAwsService.KMS,
+    "Sts": ec2.InterfaceVpcEndpointAwsService.STS,
+    "Monitoring": ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_MONITORING,
+}
+DEFAULT_INTERFACE_ENDPOINTS = ["SecretsManager", "EcrApi", "EcrDkr", "Logs"]
+
 
 class NetworkConstruct(BaseConstruct):
     def __init__(
@@ -13,11 +32,27 @@ class NetworkConstruct(BaseConstruct):
         sub_environment: str = "",
         create_endpoints: bool = True,
         create_security_groups: bool = False,
+        restrict_alb_to_cloudfront: bool = False,
+        interface_endpoints: Optional[List[str]] = None,
+        endpoint_peers: Optional[Dict[str, List[ec2.IPeer]]] = None,
+        create_s3_gateway_endpoint: bool = False,
     ):
         super().__init__(scope, id)
 
         # Store parameters
         self.sub_environment = sub_environment
+        self.restrict_alb_to_cloudfront = restrict_alb_to_cloudfront
+        self.interface_endpoints = (
+            DEFAULT_INTERFACE_ENDPOINTS if interface_endpoints is None else interface_endpoints
+        )
+        self.endpoint_peers = endpoint_peers or {}
+        self.create_s3_gateway_endpoint = create_s3_gateway_endpoint
+
+        unknown_endpoints = set(self.interface_endpoints) - set(INTERFACE_ENDPOINTS)
+        if unknown_endpoints:
+            raise ValueError(
+                f"Unsupported interface endpoints {sorted(unknown_endpoints)}, expected {list(INTERFACE_ENDPOINTS)}"
+            )
 
         # Existing VPC
         self.vpc = ec2.Vpc.from_lookup(
@@ -53,17 +88,25 @@ class NetworkConstruct(BaseConstruct):
             allow_all_outbound=True,
         )
 
-        # Allow HTTP and HTTPS from anywhere
-        self.alb_sg.add_ingress_rule(
-            peer=ec2.Peer.any_ipv4(),
-            connection=ec2.Port.tcp(80),
-            description="Allow HTTP from anywhere",
-        )
-        self.alb_sg.add_ingress_rule(
-            peer=ec2.Peer.any_ipv4(),
-            connection=ec2.Port.tcp(443),
-            description="Allow HTTPS from anywhere",
-        )
+        if self.restrict_alb_to_cloudfront:
+            # Only CloudFront origin-facing servers, which always connect over HTTPS
+            self.alb_sg.add_ingress_rule(
+                peer=ec2.Peer.prefix_list(self.lookup_cloudfront_prefix_list_id()),
+                connection=ec2.Port.tcp(443),
+                description="Allow HTTPS from CloudFront",
+            )
+        else:
+            # Allow HTTP and HTTPS from anywhere
+            self.alb_sg.add_ingress_rule(
+                peer=ec2.Peer.any_ipv4(),
+                connection=ec2.Port.tcp(80),
+                description="Allow HTTP from anywhere",
+            )
+            self.alb_sg.add_ingress_rule(
+                peer=ec2.Peer.any_ipv4(),
+                connection=ec2.Port.tcp(443),
+                description="Allow HTTPS from anywhere",
+            )
 
         # Service Security Group
         service_name = f"outlier-service-{self.environment}{self.sub_environment}-sg-cdk"
@@ -98,45 +141,109 @@ class NetworkConstruct(BaseConstruct):
                 description="Allow PostgreSQL from nightly admin EC2",
             )
 
-    def create_vpc_endpoints(self):
-        """Create VPC Endpoints for AWS services"""
-        # Create security group for endpoints
-        secrets_name = f"secrets-manager-to-ecs-sg-{self.environment}{self.sub_environment}-v3"
-        self.secrets_sg = ec2.SecurityGroup(
+    def lookup_cloudfront_prefix_list_id(self) -> str:
+        """Look up the CloudFront origin-facing prefix list of the stack's region at deploy time"""
+        # ec2.PrefixList.from_lookup isn't available in this CDK version, so ask EC2 by name
+        describe_prefix_list = cr.AwsSdkCall(
+            service="EC2",
+            action="describeManagedPrefixLists",
+            parameters={
+                "Filters": [
+                    {
+                        "Name": "prefix-list-name",
+                        "Values": [CLOUDFRONT_ORIGIN_FACING_PREFIX_LIST_NAME],
+                    }
+                ]
+            },
+            output_paths=["PrefixLists.0.PrefixListId"],
+            physical_resource_id=cr.PhysicalResourceId.of(
+                CLOUDFRONT_ORIGIN_FACING_PREFIX_LIST_NAME
+            ),
+        )
+        prefix_list = cr.AwsCustomResource(
             self,
-            "SecretsManagerSecurityGroup",
-            vpc=self.vpc,
-            security_group_name=secrets_name,
-            description=f"Security group for Secrets Manager VPC Endpoint - {self.environment}{self.sub_environment}",
-            allow_all_outbound=True,
+            "CloudFrontPrefixList",
+            on_create=describe_prefix_list,
+            on_update=describe_prefix_list,
+            policy=cr.AwsCustomResourcePolicy.from_sdk_calls(
+                resources=cr.AwsCustomResourcePolicy.ANY_RESOURCE
+            ),
+            install_latest_aws_sdk=False,
         )
+        return prefix_list.get_response_field("PrefixLists.0.PrefixListId")
 
-        # Secrets Manager rules
-        self.secrets_sg.add_ingress_rule(
-            peer=ec2.Peer.ipv4(self.vpc.vpc_cidr_block),
-            connection=ec2.Port.tcp(443),
-            description="Allow HTTPS from VPC CIDR",
-        )
+    def create_vpc_endpoints(self):
+        """Create VPC Endpoints for AWS services"""
+        # S3 Gateway Endpoint - ECR image layers and bucket traffic skip the NAT gateway
+        if self.create_s3_gateway_endpoint:
+            self.s3_endpoint = self.vpc.add_gateway_endpoint(
+                "S3GatewayEndpoint",
+                service=ec2.GatewayVpcEndpointAwsService.S3,
+                subnets=[
+                    ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS)
+                ],
+            )
 
-        # Interface Endpoints
-        interface_endpoints = [
-            ("SecretsManager", ec2.InterfaceVpcEndpointAwsService.SECRETS_MANAGER),
-            ("EcrApi", ec2.InterfaceVpcEndpointAwsService.ECR),
-            ("EcrDkr", ec2.InterfaceVpcEndpointAwsService.ECR_DOCKER),
-            ("Logs", ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_LOGS),
-        ]
+        # Interface Endpoints - each with its own security group
+        self.endpoint_security_groups = {}
+        for name in self.interface_endpoints:
+            security_group = self.create_endpoint_security_group(name)
+            self.endpoint_security_groups[name] = security_group
 
-        for name, service in interface_endpoints:
             self.vpc.add_interface_endpoint(
                 f"{name}Endpoint",
-                service=service,
-                security_groups=[self.secrets_sg],
+                service=INTERFACE_ENDPOINTS[name],
+                security_groups=[security_group],
                 subnets=ec2.SubnetSelection(
                     subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
                 ),
                 private_dns_enabled=True,
+                # Don't let the endpoint open itself to the whole VPC when its peers are scoped
+                open=name not in self.endpoint_peers,
+            )
+
+    def create_endpoint_security_group(self, name: str) -> ec2.SecurityGroup:
+        """Create the security group of one interface endpoint, open to its peers on HTTPS"""
+        if name == "SecretsManager":
+            # Existing Secrets Manager security group - same name and rules as original
+            secrets_name = f"secrets-manager-to-ecs-sg-{self.environment}{self.sub_environment}-v3"
+            security_group = ec2.SecurityGroup(
+                self,
+                "SecretsManagerSecurityGroup",
+                vpc=self.vpc,
+                security_group_name=secrets_name,
+                description=f"Security group for Secrets Manager VPC Endpoint - {self.environment}{self.sub_environment}",
+                allow_all_outbound=True,
+            )
+            self.secrets_sg = security_group
+        else:
+            endpoint_name = f"outlier-vpce-{name.lower()}-{self.environment}{self.sub_environment}-sg-cdk"
+            security_group = ec2.SecurityGroup(
+                self,
+                f"{name}EndpointSecurityGroup",
+                vpc=self.vpc,
+                security_group_name=endpoint_name,
+                description=f"Security group for {name} VPC Endpoint - {self.environment}{self.sub_environment}",
+                allow_all_outbound=True,
+            )
+
+        # Scoped to the given peers, or the whole VPC CIDR as before
+        if name in self.endpoint_peers:
+            for peer in self.endpoint_peers[name]:
+                security_group.add_ingress_rule(
+                    peer=peer,
+                    connection=ec2.Port.tcp(443),
+                    description=f"Allow HTTPS to the {name} endpoint",
+                )
+        else:
+            security_group.add_ingress_rule(
+                peer=ec2.Peer.ipv4(self.vpc.vpc_cidr_block),
+                connection=ec2.Port.tcp(443),
+                description="Allow HTTPS from VPC CIDR",
             )
 
+        return security_group
+
     @property
     def alb_security_group(self) -> ec2.ISecurityGroup:
         if hasattr(self, 'alb_sg'):
@@ -157,4 +264,12 @@ class NetworkConstruct(BaseConstruct):
     def secrets_manager_security_group(self) -> ec2.ISecurityGroup:
         if hasattr(self, "secrets_sg"):
             return self.secrets_sg
-        raise AttributeError("No secrets_sg defined - was create_endpoints=True?")
\ No newline at end of file
+        raise AttributeError("No secrets_sg defined - was create_endpoints=True?")
+
+    @property
+    def s3_gateway_endpoint(self) -> ec2.IGatewayVpcEndpoint:
+        if hasattr(self, "s3_endpoint"):
+            return self.s3_endpoint
+        raise AttributeError(
+            "No S3 gateway endpoint - was create_s3_gateway_endpoint=True?"
+        )
\ No newline at end of file
@@ -1,4 +1,6 @@
 # src/custom_constructs/pipeline_construct_new.py
+from typing import Dict, List, Optional
+
 import aws_cdk as cdk
 from constructs import Construct
 from aws_cdk import (
@@ -6,6 +8,7 @@ from aws_cdk import (
     aws_codepipeline as codepipeline,
     aws_codepipeline_actions as codepipeline_actions,
     aws_codedeploy as codedeploy,
+    aws_cloudwatch as cloudwatch,
     aws_s3 as s3,
     aws_iam as iam,
     aws_ecs as ecs,
@@ -14,6 +17,42 @@ from aws_cdk import (
 )
 from .base_construct import BaseConstruct
 
+# soci-snapshotter releases - the tarball is checked against the checksum published with the pinned
+# release and kept under SOCI_CACHE_DIR, which the build cache persists between builds
+SOCI_RELEASES_URL = "https://github.com/awslabs/soci-snapshotter/releases/download"
+SOCI_CACHE_DIR = "/root/.cache/soci"
+
+# The SOCI build starts its own containerd next to Docker's; wait for its socket before using ctr
+CONTAINERD_SOCKET = "/run/containerd/containerd.sock"
+CONTAINERD_START_TIMEOUT = 30
+
+# soci-snapshotter release architectures, keyed by the stack-level `cpu_architecture` setting
+SOCI_ARCHITECTURES = {
+    "X86_64": "amd64",
+    "ARM64": "arm64",
+}
+
+# CodeBuild images, keyed by the stack-level `cpu_architecture` setting so images are built natively.
+# The deploy stage registers the app repo's taskdef_*.json, so ARM64 also needs
+# "runtimePlatform": {"cpuArchitecture": "ARM64"} there - otherwise x86 Fargate tasks get arm64 images
+BUILD_IMAGES = {
+    "X86_64": codebuild.LinuxBuildImage.STANDARD_7_0,
+    "ARM64": codebuild.LinuxArmBuildImage.AMAZON_LINUX_2_STANDARD_3_0,
+}
+
+# CodeDeploy traffic shifting strategies - None keeps the default all-at-once shift
+DEPLOYMENT_STRATEGIES = {
+    "canary": codedeploy.TimeBasedCanaryTrafficRouting,
+    "linear": codedeploy.TimeBasedLinearTrafficRouting,
+}
+
+# Green target group alarm thresholds that roll a deployment back, overridable per stack
+DEFAULT_ROLLBACK_ALARM_THRESHOLDS = {
+    "p99_response_time_seconds": 1.0,
+    "target_5xx_rate_percent": 1.0,
+    "unhealthy_host_count": 1,
+}
+
 
 class PipelineConstruct(BaseConstruct):
     def __init__(
@@ -35,10 +74,56 @@ class PipelineConstruct(BaseConstruct):
         appspec_filename: str,
         taskdef_filename: str,
         environment_value: str,
+        cpu_architecture: str = "X86_64",
+        build_cache: Optional[str] = None,
+        build_compute_type: Optional[codebuild.ComputeType] = None,
+        generate_soci_index: bool = False,
+        soci_version: str = "0.7.0",
+        deployment_strategy: Optional[str] = None,
+        traffic_shift_percentage: int = 10,
+        traffic_shift_interval: Duration = Duration.minutes(5),
+        enable_rollback_alarms: bool = False,
+        load_balancer: Optional[elbv2.ApplicationLoadBalancer] = None,
+        rollback_alarm_thresholds: Optional[Dict[str, float]] = None,
         **kwargs,
     ) -> None:
         super().__init__(scope, id, **kwargs)
 
+        if cpu_architecture not in BUILD_IMAGES:
+            raise ValueError(
+                f"Unsupported cpu_architecture '{cpu_architecture}', expected one of {list(BUILD_IMAGES)}"
+            )
+        if build_cache not in (None, "local", "s3"):
+            raise ValueError(
+                f"Unsupported build_cache '{build_cache}', expected None, 'local' or 's3'"
+            )
+        if deployment_strategy not in (None, *DEPLOYMENT_STRATEGIES):
+            raise ValueError(
+                f"Unsupported deployment_strategy '{deployment_strategy}', expected None, 'canary' or 'linear'"
+            )
+        if enable_rollback_alarms and load_balancer is None:
+            raise ValueError("enable_rollback_alarms=True requires the load_balancer")
+
+        # Canary or linear traffic shifting for the blue/green deployment
+        deployment_config = None
+        if deployment_strategy:
+            deployment_config = codedeploy.EcsDeploymentConfig(
+                self,
+                "DeploymentConfig",
+                traffic_routing=DEPLOYMENT_STRATEGIES[deployment_strategy](
+                    interval=traffic_shift_interval,
+                    percentage=traffic_shift_percentage,
+                ),
+            )
+
+        # Alarms on both target groups that stop and roll back a deployment
+        if enable_rollback_alarms:
+            self.create_rollback_alarms(
+                load_balancer,
+                {"Blue": blue_target_group, "Green": green_target_group},
+                {**DEFAULT_ROLLBACK_ALARM_THRESHOLDS, **(rollback_alarm_thresholds or {})},
+            )
+
         # CodeDeploy Setup
         codedeploy_app = codedeploy.EcsApplication(
             self, "CodeDeployApp", application_name=application_name
@@ -57,6 +142,17 @@ class PipelineConstruct(BaseConstruct):
                 green_target_group=green_target_group,
                 termination_wait_time=Duration.minutes(1),  # Same as original
             ),
+            deployment_config=deployment_config,
+            alarms=self._rollback_alarms if enable_rollback_alarms else None,
+            auto_rollback=(
+                codedeploy.AutoRollbackConfig(
+                    deployment_in_alarm=True,
+                    failed_deployment=True,
+                    stopped_deployment=True,
+                )
+                if enable_rollback_alarms
+                else None
+            ),
         )
 
         # Pipeline Infrastructure - identical to original
@@ -67,13 +163,28 @@ class PipelineConstruct(BaseConstruct):
             auto_delete_objects=True,
         )
 
+        # Build cache - "local" keeps Docker layers, source and buildspec cache paths on the build host,
+        # "s3" persists the buildspec cache paths in the artifact bucket between builds
+        cache = None
+        if build_cache == "local":
+            cache = codebuild.Cache.local(
+                codebuild.LocalCacheMode.DOCKER_LAYER,
+                codebuild.LocalCacheMode.SOURCE,
+                codebuild.LocalCacheMode.CUSTOM,
+            )
+        elif build_cache == "s3":
+            cache = codebuild.Cache.bucket(artifact_bucket, prefix="codebuild-cache")
+
         # Build project - with updated environment variable
         build_project = codebuild.PipelineProject(
             self,
             "BuildProject",
             environment=codebuild.BuildEnvironment(
-                build_image=codebuild.LinuxBuildImage.STANDARD_7_0, privileged=True
+                build_image=BUILD_IMAGES[cpu_architecture],
+                compute_type=build_compute_type,
+                privileged=True,
             ),
+            cache=cache,
             environment_variables={
                 "REPOSITORY_URI": codebuild.BuildEnvironmentVariable(
                     value=repository_uri
@@ -169,6 +280,22 @@ class PipelineConstruct(BaseConstruct):
             ],
         )
 
+        # Pipeline SOCI Index Stage - lets Fargate lazy-load the image before it is fully pulled
+        if generate_soci_index:
+            soci_project = self.create_soci_index_project(
+                cpu_architecture, soci_version, build_compute_type, cache
+            )
+            pipeline.add_stage(
+                stage_name="SociIndex",
+                actions=[
+                    codepipeline_actions.CodeBuildAction(
+                        action_name="SociIndex",
+                        project=soci_project,
+                        input=build_output,
+                    )
+                ],
+            )
+
         # Pipeline Deploy Stage - identical but parameterized filenames
         pipeline.add_stage(
             stage_name="Deploy",
@@ -190,6 +317,149 @@ class PipelineConstruct(BaseConstruct):
             ],
         )
 
+    def create_rollback_alarms(
+        self,
+        load_balancer: elbv2.ApplicationLoadBalancer,
+        target_groups: Dict[str, elbv2.IApplicationTargetGroup],
+        thresholds: Dict[str, float],
+    ):
+        """Create p99 latency, 5xx rate and unhealthy host alarms on every target group"""
+        unknown_keys = set(thresholds) - set(DEFAULT_ROLLBACK_ALARM_THRESHOLDS)
+        if unknown_keys:
+            raise ValueError(
+                f"Unsupported rollback alarm thresholds {sorted(unknown_keys)}, expected {list(DEFAULT_ROLLBACK_ALARM_THRESHOLDS)}"
+            )
+
+        # CodeDeploy swaps which target group is the replacement on every deployment, so both
+        # are watched. Metrics are built from dimensions, since only one of them has a listener
+        self._rollback_alarms = []
+        for name, target_group in target_groups.items():
+            dimensions = {
+                "LoadBalancer": load_balancer.load_balancer_full_name,
+                "TargetGroup": target_group.target_group_full_name,
+            }
+
+            def target_group_metric(
+                metric_name: str, statistic: str, dimensions=dimensions
+            ) -> cloudwatch.Metric:
+                return cloudwatch.Metric(
+                    namespace="AWS/ApplicationELB",
+                    metric_name=metric_name,
+                    dimensions_map=dimensions,
+                    statistic=statistic,
+                    period=Duration.minutes(1),
+                )
+
+            alarm_metrics = {
+                "ResponseTimeAlarm": (
+                    target_group_metric("TargetResponseTime", "p99"),
+                    thresholds["p99_response_time_seconds"],
+                ),
+                "Target5xxRateAlarm": (
+                    cloudwatch.MathExpression(
+                        expression="100 * FILL(errors, 0) / requests",
+                        using_metrics={
+                            "errors": target_group_metric("HTTPCode_Target_5XX_Count", "Sum"),
+                            "requests": target_group_metric("RequestCount", "Sum"),
+                        },
+                        label=f"{name} target 5xx rate (%)",
+                        period=Duration.minutes(1),
+                    ),
+                    thresholds["target_5xx_rate_percent"],
+                ),
+                "UnhealthyHostAlarm": (
+                    target_group_metric("UnHealthyHostCount", "Maximum"),
+                    thresholds["unhealthy_host_count"],
+                ),
+            }
+
+            self._rollback_alarms += [
+                cloudwatch.Alarm(
+                    self,
+                    f"{name}{alarm_id}",
+                    metric=metric,
+                    threshold=threshold,
+                    comparison_operator=cloudwatch.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD,
+                    evaluation_periods=2,
+                    datapoints_to_alarm=2,
+                    # No traffic on the idle target group between deployments
+                    treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+                )
+                for alarm_id, (metric, threshold) in alarm_metrics.items()
+            ]
+
+    def create_soci_index_project(
+        self,
+        cpu_architecture: str,
+        soci_version: str,
+        build_compute_type: Optional[codebuild.ComputeType],
+        cache: Optional[codebuild.Cache],
+    ) -> codebuild.PipelineProject:
+        """Create a CodeBuild project that pushes a SOCI index for the image in imageDetail.json"""
+        soci_project = codebuild.PipelineProject(
+            self,
+            "SociIndexProject",
+            environment=codebuild.BuildEnvironment(
+                build_image=BUILD_IMAGES[cpu_architecture],
+                compute_type=build_compute_type,
+                privileged=True,
+            ),
+            cache=cache,
+            environment_variables={
+                "SOCI_VERSION": codebuild.BuildEnvironmentVariable(value=soci_version),
+                "SOCI_ARCH": codebuild.BuildEnvironmentVariable(
+                    value=SOCI_ARCHITECTURES[cpu_architecture]
+                ),
+            },
+            build_spec=codebuild.BuildSpec.from_object(
+                {
+                    "version": "0.2",
+                    "phases": {
+                        "install": {
+                            "commands": [
+                                # The release tarball is kept in the build cache, so it is only
+                                # downloaded when the pinned version changes or the cache is cold
+                                f"mkdir -p {SOCI_CACHE_DIR} && cd {SOCI_CACHE_DIR}",
+                                "SOCI_TARBALL=soci-snapshotter-${SOCI_VERSION}-linux-${SOCI_ARCH}.tar.gz",
+                                f'[ -f "$SOCI_TARBALL" ] || curl -fsSL -o "$SOCI_TARBALL" "{SOCI_RELEASES_URL}/v$SOCI_VERSION/$SOCI_TARBALL"',
+                                f'[ -f "$SOCI_TARBALL.sha256sum" ] || curl -fsSL -o "$SOCI_TARBALL.sha256sum" "{SOCI_RELEASES_URL}/v$SOCI_VERSION/$SOCI_TARBALL.sha256sum"',
+                                'sha256sum -c "$SOCI_TARBALL.sha256sum" || { rm -f "$SOCI_TARBALL"*; exit 1; }',
+                                'tar -xzf "$SOCI_TARBALL" -C /usr/local/bin soci && cd "$CODEBUILD_SRC_DIR"',
+                                "nohup containerd > /tmp/containerd.log 2>&1 &",
+                                f"timeout {CONTAINERD_START_TIMEOUT} sh -c 'until [ -S {CONTAINERD_SOCKET} ]; do sleep 1; done' || {{ cat /tmp/containerd.log; exit 1; }}",
+                            ]
+                        },
+                        "build": {
+                            "commands": [
+                                "IMAGE_URI=$(jq -r .ImageURI imageDetail.json)",
+                                "ECR_PASSWORD=$(aws ecr get-login-password --region $AWS_DEFAULT_REGION)",
+                                'ctr image pull --user "AWS:$ECR_PASSWORD" "$IMAGE_URI"',
+                                'soci create "$IMAGE_URI"',
+                                'soci push --user "AWS:$ECR_PASSWORD" "$IMAGE_URI"',
+                                'echo "Pushed SOCI index for $IMAGE_URI"',
+                            ]
+                        },
+                    },
+                    "cache": {"paths": [f"{SOCI_CACHE_DIR}/**/*"]},
+                }
+            ),
+        )
+
+        # Pull the image and push the index artifacts back to the same repository
+        soci_project.role.add_managed_policy(
+            iam.ManagedPolicy.from_aws_managed_policy_name(
+                "AmazonEC2ContainerRegistryPowerUser"
+            )
+        )
+
+        return soci_project
+
     @property
     def deployment_group(self) -> codedeploy.IEcsDeploymentGroup:
         return self._deployment_group
+
+    @property
+    def rollback_alarms(self) -> List[cloudwatch.IAlarm]:
+        if hasattr(self, "_rollback_alarms"):
+            return self._rollback_alarms
+        raise AttributeError("No rollback alarms - was enable_rollback_alarms=True?")
@@ -1,40 +1,324 @@
 # src/custom_constructs/storage_construct.py
-from aws_cdk import aws_s3 as s3
+from typing import Any, Dict, List, Optional
+
+from aws_cdk import (
+    aws_certificatemanager as acm,
+    aws_cloudfront as cloudfront,
+    aws_cloudfront_origins as origins,
+    aws_iam as iam,
+    aws_route53 as route53,
+    aws_route53_targets as targets,
+    aws_s3 as s3,
+    Duration,
+)
 import aws_cdk as cdk
 from constructs import Construct
-from .base_construct import BaseConstruct
+from .base_construct import (
+    CERTIFICATE_ARN,
+    HOSTED_ZONE_ID,
+    HOSTED_ZONE_NAME,
+    BaseConstruct,
+)
+
+# Per-bucket performance profile - the defaults keep a plain encrypted, private bucket
+DEFAULT_BUCKET_PROFILE = {
+    "intelligent_tiering": False,  # move objects to Intelligent-Tiering on upload
+    "transfer_acceleration": False,
+    "request_metric_prefixes": [],  # CloudWatch request metrics, one filter per prefix ("" = whole bucket)
+    "inventory": False,  # daily Parquet inventory into the reporting bucket
+    "versioned": False,
+    "noncurrent_version_expiration_days": None,  # keep noncurrent versions forever
+    "noncurrent_versions_to_retain": None,
+}
 
 
 class StorageConstruct(BaseConstruct):
-    def __init__(self, scope: Construct, id: str):
+    def __init__(
+        self,
+        scope: Construct,
+        id: str,
+        bucket_profiles: Optional[Dict[str, Dict[str, Any]]] = None,
+        enable_drupal_cdn: bool = False,
+        drupal_cdn_subdomain: str = "files",
+        drupal_cdn_version_query_strings: Optional[List[str]] = None,
+        drupal_cdn_default_ttl: Duration = Duration.days(30),
+        drupal_cdn_max_ttl: Duration = Duration.days(365),
+    ):
         super().__init__(scope, id)
 
+        # Store parameters
+        self.enable_drupal_cdn = enable_drupal_cdn
+        self.drupal_cdn_subdomain = drupal_cdn_subdomain
+
+        # Profiles keyed by bucket ("drupal", "progress")
+        bucket_profiles = bucket_profiles or {}
+        unknown_buckets = set(bucket_profiles) - {"drupal", "progress"}
+        if unknown_buckets:
+            raise ValueError(
+                f"Unsupported bucket profiles {sorted(unknown_buckets)}, expected 'drupal' or 'progress'"
+            )
+        self.bucket_profiles = {
+            name: self.resolve_bucket_profile(bucket_profiles.get(name, {}))
+            for name in ("drupal", "progress")
+        }
+
+        # Reporting bucket - S3 inventory reports of the buckets that enable them
+        if any(profile["inventory"] for profile in self.bucket_profiles.values()):
+            self.inventory_bucket = s3.Bucket(
+                self,
+                "InventoryBucket",
+                bucket_name=f"outlier-s3-inventory-{self.environment}",
+                encryption=s3.BucketEncryption.S3_MANAGED,
+                bucket_key_enabled=True,
+                enforce_ssl=True,
+                block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+                object_ownership=s3.ObjectOwnership.BUCKET_OWNER_ENFORCED,
+                lifecycle_rules=[
+                    s3.LifecycleRule(id="ExpireInventoryReports", expiration=Duration.days(90))
+                ],
+            )
+            cdk.Tags.of(self.inventory_bucket).add(
+                "savvas:security:s3:public-bucket:exempt", "false"
+            )
+
         # Drupal Files Bucket
-        self.drupal_bucket = s3.Bucket(
-            self,
+        self.drupal_bucket = self.create_bucket(
             "DrupalBucket",
             bucket_name=f"outlier-alpha-drupal-files-{self.environment}",
-            encryption=s3.BucketEncryption.S3_MANAGED,
-            bucket_key_enabled=True,
-            enforce_ssl=True,
-            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
-            object_ownership=s3.ObjectOwnership.BUCKET_OWNER_ENFORCED,
-        )
-        cdk.Tags.of(self.drupal_bucket).add(
-            "savvas:security:s3:public-bucket:exempt", "false"
+            profile=self.bucket_profiles["drupal"],
         )
 
         # Student Progress Bucket
-        self.progress_bucket = s3.Bucket(
-            self,
+        self.progress_bucket = self.create_bucket(
             "ProgressBucket",
             bucket_name=f"outlier-student-progress-{self.environment}",
+            profile=self.bucket_profiles["progress"],
+        )
+
+        # CloudFront in front of the Drupal files - edge caching instead of an S3 round trip per asset
+        if self.enable_drupal_cdn:
+            self.create_drupal_distribution(
+                # Drupal versions file URLs with ?v= (aggregates) and ?itok= (image styles)
+                version_query_strings=drupal_cdn_version_query_strings or ["v", "itok"],
+                default_ttl=drupal_cdn_default_ttl,
+                max_ttl=drupal_cdn_max_ttl,
+            )
+
+    @staticmethod
+    def resolve_bucket_profile(bucket_profile: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge a bucket profile over the defaults and validate it"""
+        unknown_keys = set(bucket_profile) - set(DEFAULT_BUCKET_PROFILE)
+        if unknown_keys:
+            raise ValueError(
+                f"Unsupported bucket profile keys {sorted(unknown_keys)}, expected {list(DEFAULT_BUCKET_PROFILE)}"
+            )
+
+        profile = {**DEFAULT_BUCKET_PROFILE, **bucket_profile}
+        noncurrent_settings = (
+            profile["noncurrent_version_expiration_days"],
+            profile["noncurrent_versions_to_retain"],
+        )
+        if any(setting is not None for setting in noncurrent_settings):
+            if not profile["versioned"]:
+                raise ValueError("Noncurrent version expiration requires versioned=True")
+            if profile["noncurrent_version_expiration_days"] is None:
+                raise ValueError(
+                    "noncurrent_versions_to_retain requires noncurrent_version_expiration_days"
+                )
+
+        return profile
+
+    def create_bucket(
+        self, id: str, bucket_name: str, profile: Dict[str, Any]
+    ) -> s3.Bucket:
+        """Create a private, encrypted bucket with the performance profile applied"""
+        lifecycle_rules = []
+        if profile["intelligent_tiering"]:
+            # Objects under 128 KB are never tiered (or charged monitoring) by Intelligent-Tiering
+            lifecycle_rules.append(
+                s3.LifecycleRule(
+                    id="IntelligentTiering",
+                    transitions=[
+                        s3.Transition(
+                            storage_class=s3.StorageClass.INTELLIGENT_TIERING,
+                            transition_after=Duration.days(0),
+                        )
+                    ],
+                )
+            )
+        if profile["noncurrent_version_expiration_days"] is not None:
+            lifecycle_rules.append(
+                s3.LifecycleRule(
+                    id="ExpireNoncurrentVersions",
+                    noncurrent_version_expiration=Duration.days(
+                        profile["noncurrent_version_expiration_days"]
+                    ),
+                    noncurrent_versions_to_retain=profile["noncurrent_versions_to_retain"],
+                    expired_object_delete_marker=True,
+                )
+            )
+
+        bucket = s3.Bucket(
+            self,
+            id,
+            bucket_name=bucket_name,
             encryption=s3.BucketEncryption.S3_MANAGED,
             bucket_key_enabled=True,
             enforce_ssl=True,
             block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
             object_ownership=s3.ObjectOwnership.BUCKET_OWNER_ENFORCED,
+            versioned=profile["versioned"] or None,
+            transfer_acceleration=profile["transfer_acceleration"] or None,
+            lifecycle_rules=lifecycle_rules or None,
+            # Request metrics per prefix - 503 SlowDown throttling is per prefix, so hot prefixes show up here
+            metrics=[
+                s3.BucketMetrics(
+                    id=prefix.strip("/").replace("/", "-") or "EntireBucket",
+                    prefix=prefix or None,
+                )
+                for prefix in profile["request_metric_prefixes"]
+            ]
+            or None,
+            inventories=(
+                [
+                    s3.Inventory(
+                        inventory_id="DailyInventory",
+                        destination=s3.InventoryDestination(
+                            bucket=self.inventory_bucket, prefix=bucket_name
+                        ),
+                        format=s3.InventoryFormat.PARQUET,
+                        frequency=s3.InventoryFrequency.DAILY,
+                        include_object_versions=(
+                            s3.InventoryObjectVersion.ALL
+                            if profile["versioned"]
+                            else s3.InventoryObjectVersion.CURRENT
+                        ),
+                        optional_fields=[
+                            "Size",
+                            "LastModifiedDate",
+                            "StorageClass",
+                            "IntelligentTieringAccessTier",
+                        ],
+                    )
+                ]
+                if profile["inventory"]
+                else None
+            ),
         )
-        cdk.Tags.of(self.progress_bucket).add(
-            "savvas:security:s3:public-bucket:exempt", "false"
+        cdk.Tags.of(bucket).add("savvas:security:s3:public-bucket:exempt", "false")
+
+        return bucket
+
+    def create_drupal_distribution(
+        self,
+        version_query_strings: List[str],
+        default_ttl: Duration,
+        max_ttl: Duration,
+    ) -> cloudfront.Distribution:
+        """Create a CloudFront distribution reading the Drupal bucket through Origin Access Control"""
+        # Import the shared hosted zone and certificate
+        hosted_zone = route53.HostedZone.from_hosted_zone_attributes(
+            self,
+            "ExistingHostedZone",
+            hosted_zone_id=HOSTED_ZONE_ID,
+            zone_name=HOSTED_ZONE_NAME,
+        )
+        certificate = acm.Certificate.from_certificate_arn(
+            self,
+            "Certificate",
+            CERTIFICATE_ARN,
+        )
+
+        origin_access_control = cloudfront.CfnOriginAccessControl(
+            self,
+            "DrupalOriginAccessControl",
+            origin_access_control_config=cloudfront.CfnOriginAccessControl.OriginAccessControlConfigProperty(
+                name=f"outlier-drupal-files-{self.environment}",
+                origin_access_control_origin_type="s3",
+                signing_behavior="always",
+                signing_protocol="sigv4",
+            ),
+        )
+
+        # Long TTLs are safe because a changed file gets a new version in its URL - only the
+        # version query strings are part of the cache key
+        cache_policy = cloudfront.CachePolicy(
+            self,
+            "DrupalCachePolicy",
+            cache_policy_name=f"outlier-drupal-files-{self.environment}",
+            comment="Drupal files, keyed on the file version",
+            default_ttl=default_ttl,
+            min_ttl=Duration.seconds(0),
+            max_ttl=max_ttl,
+            query_string_behavior=cloudfront.CacheQueryStringBehavior.allow_list(
+                *version_query_strings
+            ),
+            header_behavior=cloudfront.CacheHeaderBehavior.none(),
+            cookie_behavior=cloudfront.CacheCookieBehavior.none(),
+            enable_accept_encoding_gzip=True,
+            enable_accept_encoding_brotli=True,
+        )
+
+        self._drupal_distribution = cloudfront.Distribution(
+            self,
+            "DrupalDistribution",
+            comment=f"outlier-alpha-drupal-files-{self.environment}",
+            domain_names=[f"{self.drupal_cdn_subdomain}.{hosted_zone.zone_name}"],
+            certificate=certificate,
+            http_version=cloudfront.HttpVersion.HTTP2_AND_3,
+            price_class=cloudfront.PriceClass.PRICE_CLASS_100,
+            default_behavior=cloudfront.BehaviorOptions(
+                origin=origins.HttpOrigin(self.drupal_bucket.bucket_regional_domain_name),
+                viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+                allowed_methods=cloudfront.AllowedMethods.ALLOW_GET_HEAD_OPTIONS,
+                cached_methods=cloudfront.CachedMethods.CACHE_GET_HEAD_OPTIONS,
+                cache_policy=cache_policy,
+                compress=True,
+            ),
         )
+
+        # This CDK version has no OAC origin for S3 - turn the origin into an S3 origin signed by the OAC
+        distribution_config = self._drupal_distribution.node.default_child
+        distribution_config.add_property_deletion_override(
+            "DistributionConfig.Origins.0.CustomOriginConfig"
+        )
+        distribution_config.add_property_override(
+            "DistributionConfig.Origins.0.S3OriginConfig.OriginAccessIdentity", ""
+        )
+        distribution_config.add_property_override(
+            "DistributionConfig.Origins.0.OriginAccessControlId",
+            origin_access_control.attr_id,
+        )
+
+        # Bucket policy - objects are only readable by this distribution (the bucket blocks public access)
+        self.drupal_bucket.add_to_resource_policy(
+            iam.PolicyStatement(
+                sid="AllowDrupalDistributionRead",
+                actions=["s3:GetObject"],
+                principals=[iam.ServicePrincipal("cloudfront.amazonaws.com")],
+                resources=[self.drupal_bucket.arn_for_objects("*")],
+                conditions={
+                    "StringEquals": {
+                        "AWS:SourceArn": f"arn:aws:cloudfront::{self.account}:distribution/{self._drupal_distribution.distribution_id}"
+                    }
+                },
+            )
+        )
+
+        route53.ARecord(
+            self,
+            "DrupalCdnDnsRecord",
+            zone=hosted_zone,
+            record_name=self.drupal_cdn_subdomain,
+            target=route53.RecordTarget.from_alias(
+                targets.CloudFrontTarget(self._drupal_distribution)
+            ),
+        )
+
+        return self._drupal_distribution
+
+    @property
+    def drupal_distribution(self) -> cloudfront.IDistribution:
+        if hasattr(self, "_drupal_distribution"):
+            return self._drupal_distribution
+        raise AttributeError("No Drupal files distribution - was enable_drupal_cdn=True?")
@@ -1,32 +1,152 @@
+from typing import Any, Dict, List, Optional
+
 from aws_cdk import (
     aws_wafv2 as wafv2,
+    aws_cloudfront as cloudfront,
     aws_elasticloadbalancingv2 as elbv2,
+    aws_glue as glue,
+    aws_iam as iam,
+    aws_kinesisfirehose as firehose,
     aws_logs as logs,
+    aws_s3 as s3,
+    Duration,
     RemovalPolicy,
 )
 import aws_cdk as cdk
 from constructs import Construct
 from .base_construct import BaseConstruct
 
+# AWS managed rule groups, evaluated in this order after the rate-based rules
+MANAGED_RULE_GROUPS = [
+    ("CommonRuleSet", "AWSManagedRulesCommonRuleSet"),
+    ("KnownBadInputs", "AWSManagedRulesKnownBadInputsRuleSet"),
+    ("SQLiRules", "AWSManagedRulesSQLiRuleSet"),
+    ("IPReputationList", "AWSManagedRulesAmazonIpReputationList"),
+]
+
+# Actions a rate-based rule can take once its key exceeds the limit
+RATE_LIMIT_ACTIONS = {
+    # 429 so well-behaved clients back off and retry
+    "block": wafv2.CfnWebACL.RuleActionProperty(
+        block=wafv2.CfnWebACL.BlockActionProperty(
+            custom_response=wafv2.CfnWebACL.CustomResponseProperty(response_code=429)
+        )
+    ),
+    "challenge": wafv2.CfnWebACL.RuleActionProperty(challenge={}),
+    "count": wafv2.CfnWebACL.RuleActionProperty(count={}),
+}
+
+# Where the web ACL sends its logs
+LOG_DESTINATIONS = ("cloudwatch", "firehose")
+
+# Actions a logging filter can keep (everything else is dropped)
+LOG_ACTIONS = ("ALLOW", "BLOCK", "COUNT", "CAPTCHA", "CHALLENGE", "EXCLUDED_AS_COUNT")
+
+# Terminating actions - the "action" field of a log record, and so the values of the action partition
+# (counted requests carry the action that finally terminated them, usually ALLOW)
+TERMINATING_ACTIONS = ("ALLOW", "BLOCK", "CAPTCHA", "CHALLENGE")
+
+# Glue schema the Firehose stream converts WAF log records to Parquet with
+# (keys are lower-cased by the JSON deserializer; "action" is a partition key instead)
+WAF_LOG_COLUMNS = [
+    ("timestamp", "bigint"),
+    ("formatversion", "int"),
+    ("webaclid", "string"),
+    ("terminatingruleid", "string"),
+    ("terminatingruletype", "string"),
+    ("httpsourcename", "string"),
+    ("httpsourceid", "string"),
+    ("responsecodesent", "int"),
+    (
+        "rulegrouplist",
+        "array<struct<rulegroupid:string,terminatingrule:struct<ruleid:string,action:string>>>",
+    ),
+    (
+        "ratebasedrulelist",
+        "array<struct<ratebasedruleid:string,limitkey:string,maxrateallowed:int>>",
+    ),
+    ("nonterminatingmatchingrules", "array<struct<ruleid:string,action:string>>"),
+    (
+        "httprequest",
+        "struct<clientip:string,country:string,headers:array<struct<name:string,value:string>>,"
+        "uri:string,args:string,httpversion:string,httpmethod:string,requestid:string>",
+    ),
+    ("labels", "array<struct<name:string>>"),
+    ("ja3fingerprint", "string"),
+]
+WAF_LOG_PARTITION_KEYS = ["action", "day", "hour"]
+
 
 class WafConstruct(BaseConstruct):
     def __init__(
         self,
         scope: Construct,
         id: str,
-        alb: elbv2.IApplicationLoadBalancer,
+        alb: Optional[elbv2.IApplicationLoadBalancer] = None,
+        distribution: Optional[cloudfront.Distribution] = None,
         sub_environment: str = "",
+        managed_rule_action: str = "count",
+        rate_limits: Optional[List[Dict[str, Any]]] = None,
+        enable_bot_control: bool = False,
+        bot_control_inspection_level: str = "COMMON",
+        bot_control_scope_down_paths: Optional[List[str]] = None,
+        log_destination: str = "cloudwatch",
+        log_actions: Optional[List[str]] = None,
+        log_expiration_days: int = 365,
     ):
         super().__init__(scope, id)
 
-        # Create CloudWatch Log Group for WAF with unique name
-        self._log_group = logs.LogGroup(
-            self,
-            "WafLogGroup",
-            log_group_name=f"aws-waf-logs-{self.environment}{sub_environment}",
-            retention=logs.RetentionDays.ONE_MONTH,
-            removal_policy=cdk.RemovalPolicy.DESTROY,
-        )
+        # Store parameters
+        self.managed_rule_action = managed_rule_action
+        self.rate_limits = rate_limits or []
+        self.enable_bot_control = enable_bot_control
+        self.bot_control_inspection_level = bot_control_inspection_level
+        self.bot_control_scope_down_paths = bot_control_scope_down_paths or []
+        self.log_destination = log_destination
+        self.log_actions = log_actions or []
+        self.log_expiration_days = log_expiration_days
+        self.log_name = f"aws-waf-logs-{self.environment}{sub_environment}"
+
+        # A regional web ACL protects the ALB, a global (CLOUDFRONT) one the distribution in front of it
+        if (alb is None) == (distribution is None):
+            raise ValueError("WafConstruct protects either the alb or the distribution")
+        self.web_acl_scope = "REGIONAL" if alb is not None else "CLOUDFRONT"
+        if (
+            self.web_acl_scope == "CLOUDFRONT"
+            and not cdk.Token.is_unresolved(self.region)
+            and self.region != "us-east-1"
+        ):
+            raise ValueError(
+                f"A CloudFront web ACL must be created in us-east-1, not {self.region}"
+            )
+
+        if self.managed_rule_action not in ("count", "block"):
+            raise ValueError(
+                f"Unsupported managed_rule_action '{self.managed_rule_action}', expected 'count' or 'block'"
+            )
+        if self.log_destination not in LOG_DESTINATIONS:
+            raise ValueError(
+                f"Unsupported log_destination '{self.log_destination}', expected one of {list(LOG_DESTINATIONS)}"
+            )
+        unknown_actions = set(self.log_actions) - set(LOG_ACTIONS)
+        if unknown_actions:
+            raise ValueError(
+                f"Unsupported log_actions {sorted(unknown_actions)}, expected any of {list(LOG_ACTIONS)}"
+            )
+
+        if self.log_destination == "cloudwatch":
+            # Create CloudWatch Log Group for WAF with unique name
+            self._log_group = logs.LogGroup(
+                self,
+                "WafLogGroup",
+                log_group_name=self.log_name,
+                retention=logs.RetentionDays.ONE_MONTH,
+                removal_policy=cdk.RemovalPolicy.DESTROY,
+            )
+            log_destination_arn = self._log_group.log_group_arn
+        else:
+            # Firehose to partitioned Parquet in S3 - cheaper to ingest and faster to query (Athena)
+            log_destination_arn = self.create_firehose_logging()
 
         # Create WAF ACL with unique name
         self._web_acl = wafv2.CfnWebACL(
@@ -34,103 +154,407 @@ class WafConstruct(BaseConstruct):
             "OutlierApiWaf",
             name=f"outlier-api-waf-{self.environment}{sub_environment}",
             description="WAF for Outlier API",
-            scope="REGIONAL",
+            scope=self.web_acl_scope,
             default_action=wafv2.CfnWebACL.DefaultActionProperty(allow={}),
             visibility_config=wafv2.CfnWebACL.VisibilityConfigProperty(
                 cloud_watch_metrics_enabled=True,
                 metric_name=f"outlier-api-waf-{self.environment}{sub_environment}",
                 sampled_requests_enabled=True,
             ),
-            rules=[
-                wafv2.CfnWebACL.RuleProperty(
-                    name="CommonRuleSet",
-                    priority=0,
-                    override_action=wafv2.CfnWebACL.OverrideActionProperty(count={}),
-                    statement=wafv2.CfnWebACL.StatementProperty(
-                        managed_rule_group_statement=wafv2.CfnWebACL.ManagedRuleGroupStatementProperty(
-                            vendor_name="AWS", name="AWSManagedRulesCommonRuleSet"
-                        )
-                    ),
-                    visibility_config=wafv2.CfnWebACL.VisibilityConfigProperty(
-                        sampled_requests_enabled=True,
-                        cloud_watch_metrics_enabled=True,
-                        metric_name="CommonRuleSetMetric",
-                    ),
+            rules=self.build_rules(),
+        )
+
+        # Enable logging for WAF - optionally only the requests that ended with one of log_actions
+        self._logging = wafv2.CfnLoggingConfiguration(
+            self,
+            "WafLogging",
+            log_destination_configs=[log_destination_arn],
+            resource_arn=self._web_acl.attr_arn,
+            logging_filter=(
+                {
+                    "DefaultBehavior": "DROP",
+                    "Filters": [
+                        {
+                            "Behavior": "KEEP",
+                            "Requirement": "MEETS_ANY",
+                            "Conditions": [
+                                {"ActionCondition": {"Action": action}}
+                                for action in self.log_actions
+                            ],
+                        }
+                    ],
+                }
+                if self.log_actions
+                else None
+            ),
+        )
+
+        if alb is not None:
+            # Associate with ALB
+            self._association = wafv2.CfnWebACLAssociation(
+                self,
+                "WafAlbAssociation",
+                resource_arn=alb.load_balancer_arn,
+                web_acl_arn=self._web_acl.attr_arn,
+            )
+        else:
+            # CloudFront web ACLs aren't associated - the distribution references the web ACL ARN.
+            # The rules then see the viewer's IP, where a regional web ACL behind CloudFront only
+            # sees edge servers (and X-Forwarded-For is set by the client)
+            distribution.node.default_child.add_property_override(
+                "DistributionConfig.WebACLId", self._web_acl.attr_arn
+            )
+
+    def build_rules(self) -> List[wafv2.CfnWebACL.RuleProperty]:
+        """Build the rule table - rate limits, managed groups, then Bot Control - in priority order"""
+        # (name, statement, rule action or None for an override-action rule group)
+        rule_table = [
+            (
+                rate_limit["name"],
+                self.rate_based_statement(rate_limit),
+                self.rate_limit_action(rate_limit),
+            )
+            for rate_limit in self.rate_limits
+        ]
+        rule_table += [
+            (
+                name,
+                wafv2.CfnWebACL.StatementProperty(
+                    managed_rule_group_statement=wafv2.CfnWebACL.ManagedRuleGroupStatementProperty(
+                        vendor_name="AWS", name=group_name
+                    )
                 ),
-                wafv2.CfnWebACL.RuleProperty(
-                    name="KnownBadInputs",
-                    priority=1,
-                    override_action=wafv2.CfnWebACL.OverrideActionProperty(count={}),
-                    statement=wafv2.CfnWebACL.StatementProperty(
-                        managed_rule_group_statement=wafv2.CfnWebACL.ManagedRuleGroupStatementProperty(
-                            vendor_name="AWS",
-                            name="AWSManagedRulesKnownBadInputsRuleSet",
-                        )
-                    ),
-                    visibility_config=wafv2.CfnWebACL.VisibilityConfigProperty(
-                        sampled_requests_enabled=True,
-                        cloud_watch_metrics_enabled=True,
-                        metric_name="KnownBadInputsMetric",
-                    ),
+                None,
+            )
+            for name, group_name in MANAGED_RULE_GROUPS
+        ]
+        if self.enable_bot_control:
+            rule_table.append(("BotControl", self.bot_control_statement(), None))
+
+        names = [name for name, _, _ in rule_table]
+        if len(set(names)) != len(names):
+            raise ValueError(f"WAF rule names must be unique, got {names}")
+
+        # Managed groups either only count matches, or use the group's own (block) actions
+        managed_override_action = (
+            wafv2.CfnWebACL.OverrideActionProperty(count={})
+            if self.managed_rule_action == "count"
+            else wafv2.CfnWebACL.OverrideActionProperty(none={})
+        )
+
+        return [
+            wafv2.CfnWebACL.RuleProperty(
+                name=name,
+                priority=priority,
+                statement=statement,
+                action=action,
+                override_action=managed_override_action if action is None else None,
+                visibility_config=wafv2.CfnWebACL.VisibilityConfigProperty(
+                    sampled_requests_enabled=True,
+                    cloud_watch_metrics_enabled=True,
+                    metric_name=f"{name}Metric",
                 ),
-                wafv2.CfnWebACL.RuleProperty(
-                    name="SQLiRules",
-                    priority=2,
-                    override_action=wafv2.CfnWebACL.OverrideActionProperty(count={}),
-                    statement=wafv2.CfnWebACL.StatementProperty(
-                        managed_rule_group_statement=wafv2.CfnWebACL.ManagedRuleGroupStatementProperty(
-                            vendor_name="AWS", name="AWSManagedRulesSQLiRuleSet"
+            )
+            for priority, (name, statement, action) in enumerate(rule_table)
+        ]
+
+    @staticmethod
+    def rate_limit_action(rate_limit: Dict[str, Any]) -> wafv2.CfnWebACL.RuleActionProperty:
+        action = rate_limit.get("action", "block")
+        if action not in RATE_LIMIT_ACTIONS:
+            raise ValueError(
+                f"Unsupported rate limit action '{action}', expected one of {list(RATE_LIMIT_ACTIONS)}"
+            )
+        return RATE_LIMIT_ACTIONS[action]
+
+    @staticmethod
+    def path_statement(path_prefixes: List[str]) -> wafv2.CfnWebACL.StatementProperty:
+        """Match requests whose URI path starts with any of the prefixes"""
+        statements = [
+            wafv2.CfnWebACL.StatementProperty(
+                byte_match_statement=wafv2.CfnWebACL.ByteMatchStatementProperty(
+                    field_to_match=wafv2.CfnWebACL.FieldToMatchProperty(uri_path={}),
+                    positional_constraint="STARTS_WITH",
+                    search_string=path_prefix,
+                    text_transformations=[
+                        wafv2.CfnWebACL.TextTransformationProperty(
+                            priority=0, type="LOWERCASE"
                         )
-                    ),
-                    visibility_config=wafv2.CfnWebACL.VisibilityConfigProperty(
-                        sampled_requests_enabled=True,
-                        cloud_watch_metrics_enabled=True,
-                        metric_name="SQLiRulesMetric",
-                    ),
-                ),
-                wafv2.CfnWebACL.RuleProperty(
-                    name="IPReputationList",
-                    priority=3,
-                    override_action=wafv2.CfnWebACL.OverrideActionProperty(count={}),
-                    statement=wafv2.CfnWebACL.StatementProperty(
-                        managed_rule_group_statement=wafv2.CfnWebACL.ManagedRuleGroupStatementProperty(
-                            vendor_name="AWS",
-                            name="AWSManagedRulesAmazonIpReputationList",
+                    ],
+                )
+            )
+            for path_prefix in path_prefixes
+        ]
+        if len(statements) == 1:
+            return statements[0]
+        return wafv2.CfnWebACL.StatementProperty(
+            or_statement=wafv2.CfnWebACL.OrStatementProperty(statements=statements)
+        )
+
+    def rate_based_statement(self, rate_limit: Dict[str, Any]) -> wafv2.CfnWebACL.StatementProperty:
+        """Rate-based statement keyed on the client IP ("ip") or a request header ("header:<name>")"""
+        key = rate_limit.get("key", "ip")
+        if key == "ip":
+            aggregation = {"aggregate_key_type": "IP"}
+        elif key.startswith("header:"):
+            aggregation = {
+                "aggregate_key_type": "CUSTOM_KEYS",
+                "custom_keys": [
+                    wafv2.CfnWebACL.RateBasedStatementCustomKeyProperty(
+                        header=wafv2.CfnWebACL.RateLimitHeaderProperty(
+                            name=key.split(":", 1)[1],
+                            text_transformations=[
+                                wafv2.CfnWebACL.TextTransformationProperty(
+                                    priority=0, type="NONE"
+                                )
+                            ],
                         )
-                    ),
-                    visibility_config=wafv2.CfnWebACL.VisibilityConfigProperty(
-                        sampled_requests_enabled=True,
-                        cloud_watch_metrics_enabled=True,
-                        metric_name="IPReputationListMetric",
-                    ),
+                    )
+                ],
+            }
+        else:
+            raise ValueError(
+                f"Unsupported rate limit key '{key}', expected 'ip' or 'header:<name>'"
+            )
+
+        # Per-path limits only count requests to the expensive endpoints
+        paths = rate_limit.get("paths")
+        return wafv2.CfnWebACL.StatementProperty(
+            rate_based_statement=wafv2.CfnWebACL.RateBasedStatementProperty(
+                limit=rate_limit["limit"],
+                evaluation_window_sec=rate_limit.get("window_seconds", 300),
+                scope_down_statement=self.path_statement(paths) if paths else None,
+                **aggregation,
+            )
+        )
+
+    def bot_control_statement(self) -> wafv2.CfnWebACL.StatementProperty:
+        """Bot Control, scoped down to the given paths so only those requests are inspected (and billed)"""
+        return wafv2.CfnWebACL.StatementProperty(
+            managed_rule_group_statement=wafv2.CfnWebACL.ManagedRuleGroupStatementProperty(
+                vendor_name="AWS",
+                name="AWSManagedRulesBotControlRuleSet",
+                managed_rule_group_configs=[
+                    wafv2.CfnWebACL.ManagedRuleGroupConfigProperty(
+                        aws_managed_rules_bot_control_rule_set=wafv2.CfnWebACL.AWSManagedRulesBotControlRuleSetProperty(
+                            inspection_level=self.bot_control_inspection_level
+                        )
+                    )
+                ],
+                scope_down_statement=(
+                    self.path_statement(self.bot_control_scope_down_paths)
+                    if self.bot_control_scope_down_paths
+                    else None
+                ),
+            )
+        )
+
+    def create_firehose_logging(self) -> str:
+        """Log bucket, Glue table and the Firehose stream writing Parquet partitioned by action/day/hour"""
+        # Log bucket - older logs move to cheaper storage classes, then expire
+        self._log_bucket = s3.Bucket(
+            self,
+            "WafLogBucket",
+            bucket_name=f"outlier-{self.log_name}",
+            encryption=s3.BucketEncryption.S3_MANAGED,
+            bucket_key_enabled=True,
+            enforce_ssl=True,
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            object_ownership=s3.ObjectOwnership.BUCKET_OWNER_ENFORCED,
+            lifecycle_rules=[
+                s3.LifecycleRule(
+                    id="TierWafLogs",
+                    prefix="waf-logs/",
+                    transitions=[
+                        s3.Transition(
+                            storage_class=s3.StorageClass.INFREQUENT_ACCESS,
+                            transition_after=Duration.days(30),
+                        ),
+                        s3.Transition(
+                            storage_class=s3.StorageClass.GLACIER_INSTANT_RETRIEVAL,
+                            transition_after=Duration.days(90),
+                        ),
+                    ],
+                    expiration=Duration.days(self.log_expiration_days),
+                ),
+                s3.LifecycleRule(
+                    id="ExpireWafLogErrors",
+                    prefix="waf-logs-errors/",
+                    expiration=Duration.days(30),
                 ),
             ],
         )
+        cdk.Tags.of(self._log_bucket).add(
+            "savvas:security:s3:public-bucket:exempt", "false"
+        )
 
-        # Enable logging for WAF
-        self._logging = wafv2.CfnLoggingConfiguration(
+        # Glue table - the Parquet schema for Firehose, with partition projection for Athena
+        database_name = self.log_name.replace("-", "_")
+        table_name = "waf_logs"
+        log_location = f"s3://{self._log_bucket.bucket_name}/waf-logs/"
+        glue_database = glue.CfnDatabase(
             self,
-            "WafLogging",
-            log_destination_configs=[self._log_group.log_group_arn],
-            resource_arn=self._web_acl.attr_arn,
+            "WafLogDatabase",
+            catalog_id=self.account,
+            database_input=glue.CfnDatabase.DatabaseInputProperty(name=database_name),
+        )
+        self._log_table = glue.CfnTable(
+            self,
+            "WafLogTable",
+            catalog_id=self.account,
+            database_name=database_name,
+            table_input=glue.CfnTable.TableInputProperty(
+                name=table_name,
+                table_type="EXTERNAL_TABLE",
+                parameters={
+                    "classification": "parquet",
+                    "projection.enabled": "true",
+                    "projection.action.type": "enum",
+                    "projection.action.values": ",".join(TERMINATING_ACTIONS),
+                    "projection.day.type": "date",
+                    "projection.day.format": "yyyy-MM-dd",
+                    "projection.day.range": f"NOW-{self.log_expiration_days}DAYS,NOW",
+                    "projection.hour.type": "integer",
+                    "projection.hour.range": "0,23",
+                    "projection.hour.digits": "2",
+                    "storage.location.template": f"{log_location}action=${{action}}/day=${{day}}/hour=${{hour}}/",
+                },
+                partition_keys=[
+                    glue.CfnTable.ColumnProperty(name=name, type="string")
+                    for name in WAF_LOG_PARTITION_KEYS
+                ],
+                storage_descriptor=glue.CfnTable.StorageDescriptorProperty(
+                    columns=[
+                        glue.CfnTable.ColumnProperty(name=name, type=column_type)
+                        for name, column_type in WAF_LOG_COLUMNS
+                    ],
+                    location=log_location,
+                    input_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetInputFormat",
+                    output_format="org.apache.hadoop.hive.ql.io.parquet.MapredParquetOutputFormat",
+                    serde_info=glue.CfnTable.SerdeInfoProperty(
+                        serialization_library="org.apache.hadoop.hive.ql.io.parquet.serde.ParquetHiveSerDe"
+                    ),
+                ),
+            ),
         )
+        self._log_table.add_dependency(glue_database)
 
-        # Associate with ALB
-        self._association = wafv2.CfnWebACLAssociation(
+        # Delivery role - writes to the bucket and reads the schema from Glue
+        delivery_role = iam.Role(
             self,
-            "WafAlbAssociation",
-            resource_arn=alb.load_balancer_arn,
-            web_acl_arn=self._web_acl.attr_arn,
+            "WafLogDeliveryRole",
+            assumed_by=iam.ServicePrincipal("firehose.amazonaws.com"),
+        )
+        self._log_bucket.grant_read_write(delivery_role)
+        delivery_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=["glue:GetTable", "glue:GetTableVersion", "glue:GetTableVersions"],
+                resources=[
+                    f"arn:aws:glue:{self.region}:{self.account}:catalog",
+                    f"arn:aws:glue:{self.region}:{self.account}:database/{database_name}",
+                    f"arn:aws:glue:{self.region}:{self.account}:table/{database_name}/{table_name}",
+                ],
+            )
         )
 
+        # Delivery stream - WAF requires the "aws-waf-logs-" name prefix
+        self._delivery_stream = firehose.CfnDeliveryStream(
+            self,
+            "WafLogDeliveryStream",
+            delivery_stream_name=self.log_name,
+            delivery_stream_type="DirectPut",
+            extended_s3_destination_configuration=firehose.CfnDeliveryStream.ExtendedS3DestinationConfigurationProperty(
+                bucket_arn=self._log_bucket.bucket_arn,
+                role_arn=delivery_role.role_arn,
+                prefix="waf-logs/action=!{partitionKeyFromQuery:action}/day=!{timestamp:yyyy-MM-dd}/hour=!{timestamp:HH}/",
+                error_output_prefix="waf-logs-errors/!{firehose:error-output-type}/day=!{timestamp:yyyy-MM-dd}/",
+                # Parquet conversion and dynamic partitioning both need buffers of at least 64 MiB
+                buffering_hints=firehose.CfnDeliveryStream.BufferingHintsProperty(
+                    size_in_m_bs=128, interval_in_seconds=300
+                ),
+                # Parquet files are Snappy-compressed by the serializer instead
+                compression_format="UNCOMPRESSED",
+                dynamic_partitioning_configuration=firehose.CfnDeliveryStream.DynamicPartitioningConfigurationProperty(
+                    enabled=True
+                ),
+                processing_configuration=firehose.CfnDeliveryStream.ProcessingConfigurationProperty(
+                    enabled=True,
+                    processors=[
+                        firehose.CfnDeliveryStream.ProcessorProperty(
+                            type="MetadataExtraction",
+                            parameters=[
+                                firehose.CfnDeliveryStream.ProcessorParameterProperty(
+                                    parameter_name="MetadataExtractionQuery",
+                                    parameter_value="{action: .action}",
+                                ),
+                                firehose.CfnDeliveryStream.ProcessorParameterProperty(
+                                    parameter_name="JsonParsingEngine",
+                                    parameter_value="JQ-1.6",
+                                ),
+                            ],
+                        )
+                    ],
+                ),
+                data_format_conversion_configuration=firehose.CfnDeliveryStream.DataFormatConversionConfigurationProperty(
+                    enabled=True,
+                    input_format_configuration=firehose.CfnDeliveryStream.InputFormatConfigurationProperty(
+                        deserializer=firehose.CfnDeliveryStream.DeserializerProperty(
+                            open_x_json_ser_de=firehose.CfnDeliveryStream.OpenXJsonSerDeProperty()
+                        )
+                    ),
+                    output_format_configuration=firehose.CfnDeliveryStream.OutputFormatConfigurationProperty(
+                        serializer=firehose.CfnDeliveryStream.SerializerProperty(
+                            parquet_ser_de=firehose.CfnDeliveryStream.ParquetSerDeProperty(
+                                compression="SNAPPY"
+                            )
+                        )
+                    ),
+                    schema_configuration=firehose.CfnDeliveryStream.SchemaConfigurationProperty(
+                        catalog_id=self.account,
+                        database_name=database_name,
+                        table_name=table_name,
+                        region=self.region,
+                        role_arn=delivery_role.role_arn,
+                        version_id="LATEST",
+                    ),
+                ),
+            ),
+        )
+        self._delivery_stream.node.add_dependency(delivery_role)
+        self._delivery_stream.add_dependency(self._log_table)
+
+        return self._delivery_stream.attr_arn
+
     @property
     def web_acl(self) -> wafv2.CfnWebACL:
         return self._web_acl
 
     @property
     def log_group(self) -> logs.ILogGroup:
-        return self._log_group
+        if hasattr(self, "_log_group"):
+            return self._log_group
+        raise AttributeError("No WAF log group - was log_destination='cloudwatch'?")
+
+    @property
+    def log_bucket(self) -> s3.IBucket:
+        if hasattr(self, "_log_bucket"):
+            return self._log_bucket
+        raise AttributeError("No WAF log bucket - was log_destination='firehose'?")
+
+    @property
+    def log_table(self) -> glue.CfnTable:
+        if hasattr(self, "_log_table"):
+            return self._log_table
+        raise AttributeError("No WAF log table - was log_destination='firehose'?")
+
+    @property
+    def delivery_stream(self) -> firehose.CfnDeliveryStream:
+        if hasattr(self, "_delivery_stream"):
+            return self._delivery_stream
+        raise AttributeError("No WAF log delivery stream - was log_destination='firehose'?")
 
     @property
     def association(self) -> wafv2.CfnWebACLAssociation:
-        return self._association
+        if hasattr(self, "_association"):
+            return self._association
+        raise AttributeError("No ALB association - was the web ACL created for the alb?")
@@ -1,27 +1,73 @@
 # src/stacks/base_stack.py
 import aws_cdk as cdk
+from aws_cdk import aws_rds as rds
 from constructs import Construct
 from custom_constructs.network_construct import NetworkConstruct
-
-# from custom_constructs.storage_construct import StorageConstruct
+from custom_constructs.storage_construct import StorageConstruct
 from custom_constructs.iam_construct import IamConstruct
 from custom_constructs.database_construct import DatabaseConstruct
+from custom_constructs.analytics_construct import AnalyticsConstruct
 
 
 class BaseStack(cdk.Stack):
     def __init__(self, scope: Construct, id: str, **kwargs) -> None:
         super().__init__(scope, id, **kwargs)
 
+        # Application S3 buckets (see below) - the Drupal files and student progress buckets already
+        # exist outside CloudFormation, so adopt them with `cdk import` before deploying this (README)
+        enable_storage = False
+
+        # Redshift Serverless analytics fed by Zero-ETL from Aurora (see below)
+        enable_analytics = False
+
         # Network resources
         network = NetworkConstruct(
             self,
             "NetworkConstruct",
             create_endpoints=True,
-            create_security_groups=False
+            create_security_groups=False,
+            # Keep ECR layer pulls, S3, SQS, Firehose, KMS, STS and metrics traffic off the NAT gateway
+            create_s3_gateway_endpoint=True,
+            interface_endpoints=[
+                "SecretsManager",
+                "EcrApi",
+                "EcrDkr",
+                "Logs",
+                "Sqs",
+                "Firehose",
+                "Kms",
+                "Sts",
+                "Monitoring",
+            ],
         )
 
-        # Storage resources (S3 buckets)
-        # storage = StorageConstruct(self, "StorageConstruct")
+        # Storage resources (S3 buckets) - per-bucket performance profiles
+        if enable_storage:
+            StorageConstruct(
+                self,
+                "StorageConstruct",
+                bucket_profiles={
+                    # Drupal files are written once and read for a long time
+                    "drupal": {
+                        "intelligent_tiering": True,
+                        "transfer_acceleration": True,
+                        "inventory": True,
+                        "versioned": True,
+                        "noncurrent_version_expiration_days": 90,
+                    },
+                    # Progress objects are overwritten often - request metrics show when writes get throttled
+                    # (503 SlowDown); add a filter per suspected hot prefix next to the whole-bucket one ("")
+                    "progress": {
+                        "request_metric_prefixes": [""],
+                        "inventory": True,
+                        "versioned": True,
+                        "noncurrent_version_expiration_days": 30,
+                        "noncurrent_versions_to_retain": 3,
+                    },
+                },
+                # Serve the Drupal files through CloudFront at files.nightly.savvasoutlier.com
+                enable_drupal_cdn=True,
+            )
 
         # IAM resources
         iam = IamConstruct(self, "IamConstruct")
@@ -32,4 +78,33 @@ class BaseStack(cdk.Stack):
         #     "DatabaseConstruct",
         #     vpc=network.vpc,
         #     security_group=network.rds_security_group,
+        #     enable_proxy=True,
+        #     proxy_secret_name="<existing DB credentials secret>",
+        #     proxy_client_security_group_ids=[<ECS service security group IDs>],
+        #     min_capacity=0.5,
+        #     max_capacity=8,
+        #     reader_count=1,
+        #     enable_reader_autoscaling=True,
+        #     max_reader_count=3,
+        #     reader_autoscaling_metric="cpu",
+        #     reader_autoscaling_target=60,
+        #     create_custom_reader_endpoint=True,
+        #     enable_performance_insights=True,
+        #     performance_insights_retention=rds.PerformanceInsightRetention.MONTHS_1,
         # )
+
+        # Redshift Serverless with a Zero-ETL integration from the Aurora cluster, for reporting queries.
+        # Off until the database construct above is enabled: it bills RPUs from the first query and
+        # needs a cluster with logical replication, which outlier-nightly-db-cluster-cdk (not managed
+        # here) isn't guaranteed to have. Switch db_cluster to database.db_cluster when enabling it
+        if enable_analytics:
+            AnalyticsConstruct(
+                self,
+                "AnalyticsConstruct",
+                vpc=network.vpc,
+                db_cluster=rds.DatabaseCluster.from_database_cluster_attributes(
+                    self, "DatabaseCluster", cluster_identifier="outlier-nightly-db-cluster-cdk"
+                ),
+                base_capacity=8,
+                max_capacity=32,
+            )
@@ -1,6 +1,9 @@
 import aws_cdk as cdk
 from constructs import Construct
 from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_cloudfront as cloudfront
+from aws_cdk import aws_codebuild as codebuild
+from aws_cdk import aws_rds as rds
 
 from custom_constructs.network_construct import NetworkConstruct
 from custom_constructs.ecr_construct import EcrConstruct
@@ -8,6 +11,9 @@ from custom_constructs.alb_construct import AlbConstruct
 from custom_constructs.ecs_construct import EcsConstruct
 from custom_constructs.pipeline_construct import PipelineConstruct
 from custom_constructs.waf_construct import WafConstruct
+from custom_constructs.cache_construct import CacheConstruct
+from custom_constructs.dashboard_construct import DashboardConstruct
+from bin.template_analyzer import nested_scope
 
 
 class DevApplicationStack(cdk.Stack):
@@ -17,6 +23,67 @@ class DevApplicationStack(cdk.Stack):
         sub_environment = "dev"
         self.sub_environment = sub_environment
 
+        # Opt in to the ElastiCache (Valkey) cache for the ECS service
+        enable_cache = True
+
+        # Route the API record to CloudFront ("cloudfront") or directly to the ALB ("alb")
+        api_dns_target = "cloudfront"
+
+        # Push a SOCI index next to each image so Fargate can lazy-load it on task start
+        enable_soci_index = True
+
+        # Fargate Spot capacity for the ECS service - off until the service is migrated (see EcsConstruct):
+        # moving the existing CODE_DEPLOY service from LaunchType FARGATE to a capacity provider
+        # strategy replaces it, and CodeDeploy only takes the strategy from the appspec
+        use_fargate_spot = False
+
+        # CPU architecture for the ECS tasks and the CodeBuild image that builds them. Stays on X86_64
+        # until taskdef_nightly_dev.json in the app repo declares the matching runtimePlatform -
+        # every pipeline release registers that task definition, not the CDK one
+        cpu_architecture = "X86_64"
+
+        # Run the Datadog agent next to the app for APM traces and DogStatsD metrics
+        enable_datadog = False
+
+        # App container logs - non-blocking awslogs ("awslogs") or a FireLens Fluent Bit
+        # sidecar batching to CloudWatch Logs and S3 ("firelens")
+        container_log_driver = "firelens"
+
+        # WAF: managed rule groups only count ("count") or enforce their own actions ("block")
+        waf_managed_rule_action = "block"
+
+        # WAF rate limits (requests per 5 minutes), keyed per client IP or per API token
+        # (when the API is served through CloudFront the web ACL moves to the distribution,
+        # where the client IP is the viewer's rather than an edge server's)
+        waf_rate_limits = [
+            {"name": "RateLimitPerIp", "limit": 500, "key": "ip"},
+            {"name": "RateLimitPerToken", "limit": 300, "key": "header:authorization"},
+            {
+                "name": "RateLimitLogin",
+                "limit": 100,
+                "key": "ip",
+                "paths": ["/user/login", "/user/password"],
+                "action": "block",
+            },
+        ]
+
+        # WAF Bot Control, only inspecting (and billing) the login and registration paths
+        enable_waf_bot_control = False
+
+        # WAF logs to CloudWatch Logs ("cloudwatch") or to Parquet in S3 through Firehose ("firehose"),
+        # keeping only the requests that were blocked or counted by a rule
+        waf_log_destination = "cloudwatch"
+        waf_log_actions = ["BLOCK", "COUNT"]
+
+        # Constructs deployed as nested stacks - only change on purpose: moving a construct into or
+        # out of a nested stack replaces its resources, and the named ones (web ACL, pipeline,
+        # CodeDeploy application) then collide with the old ones during the deploy
+        nest_waf = False
+        nest_pipeline = False
+
+        # Aurora cluster the service talks to (DatabaseConstruct.db_cluster), charted on the dashboard
+        db_cluster_identifier = "outlier-nightly-db-cluster-cdk"
+
         # Tag all resources in the stack
         cdk.Tags.of(self).add("SubEnvironment", self.sub_environment)
 
@@ -26,13 +93,15 @@ class DevApplicationStack(cdk.Stack):
             "Network",
             sub_environment=f"-{self.sub_environment}",
             create_endpoints=False,
-            create_security_groups=True
+            create_security_groups=True,
+            restrict_alb_to_cloudfront=api_dns_target == "cloudfront",
         )
 
         # ECR Repository
         ecr = EcrConstruct(
             self,
             "ECR",
+            keep_soci_indexes=enable_soci_index,
             sub_environment=f"-{self.sub_environment}",
         )
 
@@ -44,16 +113,63 @@ class DevApplicationStack(cdk.Stack):
             security_group=network.alb_security_group,
             load_balancer_name=f"outlier-{self.sub_environment}",
             subdomain=f"api-{self.sub_environment}",
+            enable_cloudfront=True,
+            dns_target=api_dns_target,
+            cache_behaviors={
+                "/courses*": cloudfront.CachePolicyProps(
+                    default_ttl=cdk.Duration.minutes(5),
+                    min_ttl=cdk.Duration.seconds(0),
+                    max_ttl=cdk.Duration.hours(1),
+                    header_behavior=cloudfront.CacheHeaderBehavior.allow_list(
+                        "Authorization"
+                    ),
+                    query_string_behavior=cloudfront.CacheQueryStringBehavior.all(),
+                ),
+            },
+            # Ramp traffic onto new tasks over 30s, drain quickly and detect unhealthy tasks within ~30s
+            tuning_profile={
+                "load_balancing_algorithm": "round_robin",
+                "slow_start": cdk.Duration.seconds(30),
+                "deregistration_delay": cdk.Duration.seconds(10),
+                "health_check_interval": cdk.Duration.seconds(10),
+                "health_check_timeout": cdk.Duration.seconds(5),
+                "healthy_threshold_count": 2,
+                "unhealthy_threshold_count": 3,
+                "idle_timeout": cdk.Duration.seconds(60),
+                "http2_enabled": True,
+                "desync_mitigation_mode": "defensive",
+            },
         )
 
-        # Create and associate WAF
+        # WAF on the API entry point (the ALB, or the distribution in front of it)
         waf = WafConstruct(
-            self,
+            nested_scope(self, "WAF", nested=nest_waf),
             f"WAF-{self.sub_environment}",
-            alb=alb.alb,
+            alb=alb.alb if api_dns_target == "alb" else None,
+            distribution=alb.distribution if api_dns_target == "cloudfront" else None,
             sub_environment=f"-{self.sub_environment}",
+            managed_rule_action=waf_managed_rule_action,
+            rate_limits=waf_rate_limits,
+            enable_bot_control=enable_waf_bot_control,
+            bot_control_scope_down_paths=["/user/login", "/user/register"],
+            log_destination=waf_log_destination,
+            log_actions=waf_log_actions,
         )
 
+        # ElastiCache (Valkey) for course and progress reads
+        cache = None
+        if enable_cache:
+            cache = CacheConstruct(
+                self,
+                f"Cache-{self.sub_environment}",
+                vpc=network.vpc,
+                service_security_group=network.service_security_group,
+                sub_environment=f"-{self.sub_environment}",
+                serverless=False,
+                node_type="cache.t4g.micro",
+                num_cache_clusters=1,
+            )
+
         # ECS Cluster, Service and Task Definition
         ecs = EcsConstruct(
             self,
@@ -63,14 +179,32 @@ class DevApplicationStack(cdk.Stack):
             ecr_repository=ecr.repository,
             blue_target_group=alb.blue_target_group,
             desired_count=1,
+            use_fargate_spot=use_fargate_spot,
+            on_demand_base=0,
+            on_demand_weight=0,
+            spot_weight=1,
+            cpu_architecture=cpu_architecture,
+            container_environment=cache.container_environment if cache else None,
+            enable_datadog=enable_datadog,
+            log_driver=container_log_driver,
+            datadog_env=f"nightly-{self.sub_environment}",
             cluster_name=f"outlier-service-nightly-{self.sub_environment}",
             container_name=f"Outlier-Service-Container-nightly-{self.sub_environment}",
             log_group_name=f"/ecs/Outlier-Service-nightly-{self.sub_environment}",
         )
 
+        # ECS Service Auto Scaling
+        ecs.add_autoscaling(
+            min_capacity=1,
+            max_capacity=2,
+            cpu_target_percent=70,
+            requests_per_target=500,
+            green_target_group=alb.green_target_group,
+        )
+
         # CI/CD Pipeline
         pipeline = PipelineConstruct(
-            self,
+            nested_scope(self, "Pipeline", nested=nest_pipeline),
             f"Pipeline-{self.sub_environment}",
             service=ecs.service,
             https_listener=alb.https_listener,
@@ -86,8 +220,44 @@ class DevApplicationStack(cdk.Stack):
             buildspec_filename="buildspec_nightly.yml",
             appspec_filename=f"appspec_nightly_{self.sub_environment}.yaml",
             taskdef_filename=f"taskdef_nightly_{self.sub_environment}.json",
+            cpu_architecture=cpu_architecture,
+            build_cache="local",
+            build_compute_type=codebuild.ComputeType.LARGE,
+            generate_soci_index=enable_soci_index,
+            # Shift 25% of traffic every minute unless the green target group alarms
+            deployment_strategy="linear",
+            traffic_shift_percentage=25,
+            traffic_shift_interval=cdk.Duration.minutes(1),
+            enable_rollback_alarms=True,
+            load_balancer=alb.alb,
+            rollback_alarm_thresholds={
+                "p99_response_time_seconds": 3.0,
+                "target_5xx_rate_percent": 5.0,
+                "unhealthy_host_count": 1,
+            },
             environment_value=self.sub_environment.upper(),
         )
 
+        # Performance dashboard - ALB, ECS, Aurora and WAF on a shared time axis
+        DashboardConstruct(
+            self,
+            f"Dashboard-{self.sub_environment}",
+            alb=alb.alb,
+            target_groups=[alb.blue_target_group, alb.green_target_group],
+            service=ecs.service,
+            web_acl=waf.web_acl,
+            db_cluster=rds.DatabaseCluster.from_database_cluster_attributes(
+                self, "DatabaseCluster", cluster_identifier=db_cluster_identifier
+            ),
+            sub_environment=self.sub_environment,
+        )
+
         # Outputs
+        # Cache endpoint for the CACHE_* variables of the app repo's taskdef_*.json
+        if cache:
+            cdk.CfnOutput(
+                self,
+                "CacheEndpoint",
+                value=f"{cache.endpoint_address}:{cache.endpoint_port}",
+            )
         # cdk.CfnOutput(self, "ALBDnsName-Dev", value=alb.alb.load_balancer_dns_name)
@@ -1,6 +1,10 @@
 import aws_cdk as cdk
 from constructs import Construct
 from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_applicationautoscaling as appscaling
+from aws_cdk import aws_cloudfront as cloudfront
+from aws_cdk import aws_codebuild as codebuild
+from aws_cdk import aws_rds as rds
 
 from custom_constructs.network_construct import NetworkConstruct
 from custom_constructs.ecr_construct import EcrConstruct
@@ -8,23 +12,88 @@ from custom_constructs.alb_construct import AlbConstruct
 from custom_constructs.ecs_construct import EcsConstruct
 from custom_constructs.pipeline_construct import PipelineConstruct
 from custom_constructs.waf_construct import WafConstruct
+from custom_constructs.cache_construct import CacheConstruct
+from custom_constructs.dashboard_construct import DashboardConstruct
+from bin.template_analyzer import nested_scope
 
 
 class NightlyApplicationStack(cdk.Stack):
     def __init__(self, scope: Construct, id: str, **kwargs) -> None:
         super().__init__(scope, id, **kwargs)
 
+        # Opt in to the ElastiCache (Valkey) cache for the ECS service
+        enable_cache = True
+
+        # Route the API record to CloudFront ("cloudfront") or directly to the ALB ("alb")
+        api_dns_target = "alb"
+
+        # Push a SOCI index next to each image so Fargate can lazy-load it on task start
+        enable_soci_index = True
+
+        # Fargate Spot capacity for the ECS service - off until the service is migrated (see EcsConstruct):
+        # moving the existing CODE_DEPLOY service from LaunchType FARGATE to a capacity provider
+        # strategy replaces it, and CodeDeploy only takes the strategy from the appspec
+        use_fargate_spot = False
+
+        # CPU architecture for the ECS tasks and the CodeBuild image that builds them
+        cpu_architecture = "X86_64"
+
+        # Run the Datadog agent next to the app for APM traces and DogStatsD metrics
+        enable_datadog = True
+
+        # App container logs - non-blocking awslogs ("awslogs") or a FireLens Fluent Bit
+        # sidecar batching to CloudWatch Logs and S3 ("firelens")
+        container_log_driver = "awslogs"
+
+        # WAF: managed rule groups only count ("count") or enforce their own actions ("block")
+        waf_managed_rule_action = "count"
+
+        # WAF rate limits (requests per 5 minutes), keyed per client IP or per API token
+        # (when the API is served through CloudFront the web ACL moves to the distribution,
+        # where the client IP is the viewer's rather than an edge server's)
+        waf_rate_limits = [
+            {"name": "RateLimitPerIp", "limit": 2000, "key": "ip"},
+            {"name": "RateLimitPerToken", "limit": 1000, "key": "header:authorization"},
+            {
+                "name": "RateLimitLogin",
+                "limit": 300,
+                "key": "ip",
+                "paths": ["/user/login", "/user/password"],
+                "action": "block",
+            },
+        ]
+
+        # WAF Bot Control, only inspecting (and billing) the login and registration paths
+        enable_waf_bot_control = True
+
+        # WAF logs to CloudWatch Logs ("cloudwatch") or to Parquet in S3 through Firehose ("firehose"),
+        # keeping only the requests that were blocked or counted by a rule
+        waf_log_destination = "firehose"
+        waf_log_actions = ["BLOCK", "COUNT"]
+
+        # Constructs deployed as nested stacks - only change on purpose: moving a construct into or
+        # out of a nested stack replaces its resources, and the named ones (web ACL, pipeline,
+        # CodeDeploy application) then collide with the old ones during the deploy
+        nest_waf = False
+        nest_pipeline = False
+
+        # Aurora cluster the service talks to (DatabaseConstruct.db_cluster), charted on the dashboard
+        db_cluster_identifier = "outlier-nightly-db-cluster-cdk"
+
         # Network resources
         network = NetworkConstruct(
             self,
             "Network",
             create_endpoints=False,
-            create_security_groups=True        )
+            create_security_groups=True,
+            restrict_alb_to_cloudfront=api_dns_target == "cloudfront",
+        )
 
         # ECR Repository
         ecr = EcrConstruct(
             self,
             "ECR",
+            keep_soci_indexes=enable_soci_index,
         )
 
         # Load Balancer and DNS
@@ -35,15 +104,60 @@ class NightlyApplicationStack(cdk.Stack):
             security_group=network.alb_security_group,
             load_balancer_name="outlier-nightly",
             subdomain="api",
+            enable_cloudfront=True,
+            dns_target=api_dns_target,
+            cache_behaviors={
+                "/courses*": cloudfront.CachePolicyProps(
+                    default_ttl=cdk.Duration.minutes(5),
+                    min_ttl=cdk.Duration.seconds(0),
+                    max_ttl=cdk.Duration.hours(1),
+                    header_behavior=cloudfront.CacheHeaderBehavior.allow_list(
+                        "Authorization"
+                    ),
+                    query_string_behavior=cloudfront.CacheQueryStringBehavior.all(),
+                ),
+            },
+            # Route to the least busy task, drain quickly and detect unhealthy tasks within ~30s
+            tuning_profile={
+                "load_balancing_algorithm": "least_outstanding_requests",
+                "deregistration_delay": cdk.Duration.seconds(30),
+                "health_check_interval": cdk.Duration.seconds(10),
+                "health_check_timeout": cdk.Duration.seconds(5),
+                "healthy_threshold_count": 2,
+                "unhealthy_threshold_count": 3,
+                "idle_timeout": cdk.Duration.seconds(60),
+                "http2_enabled": True,
+                "desync_mitigation_mode": "defensive",
+            },
         )
 
-        # Create and associate WAF
+        # WAF on the API entry point (the ALB, or the distribution in front of it)
         waf = WafConstruct(
-            self,
+            nested_scope(self, "WAF", nested=nest_waf),
             "WAF",
-            alb=alb.alb,
+            alb=alb.alb if api_dns_target == "alb" else None,
+            distribution=alb.distribution if api_dns_target == "cloudfront" else None,
+            managed_rule_action=waf_managed_rule_action,
+            rate_limits=waf_rate_limits,
+            enable_bot_control=enable_waf_bot_control,
+            bot_control_scope_down_paths=["/user/login", "/user/register"],
+            log_destination=waf_log_destination,
+            log_actions=waf_log_actions,
         )
 
+        # ElastiCache (Valkey) for course and progress reads
+        cache = None
+        if enable_cache:
+            cache = CacheConstruct(
+                self,
+                "Cache",
+                vpc=network.vpc,
+                service_security_group=network.service_security_group,
+                serverless=True,
+                max_data_storage_gb=5,
+                max_ecpu_per_second=5000,
+            )
+
         # ECS Cluster, Service and Task Definition
         ecs = EcsConstruct(
             self,
@@ -53,14 +167,46 @@ class NightlyApplicationStack(cdk.Stack):
             ecr_repository=ecr.repository,
             blue_target_group=alb.blue_target_group,
             desired_count=2,
+            use_fargate_spot=use_fargate_spot,
+            on_demand_base=2,
+            on_demand_weight=1,
+            spot_weight=2,
+            cpu_architecture=cpu_architecture,
+            container_environment=cache.container_environment if cache else None,
+            enable_datadog=enable_datadog,
+            log_driver=container_log_driver,
             cluster_name="outlier-service-nightly",
             container_name="Outlier-Service-Container-nightly",
             log_group_name="/ecs/Outlier-Service-nightly",
         )
 
+        # ECS Service Auto Scaling - scale in to a single task overnight
+        ecs.add_autoscaling(
+            min_capacity=2,
+            max_capacity=6,
+            cpu_target_percent=60,
+            memory_target_percent=75,
+            requests_per_target=500,
+            green_target_group=alb.green_target_group,
+            schedules={
+                "BusinessHours": appscaling.ScalingSchedule(
+                    schedule=appscaling.Schedule.cron(hour="7", minute="0"),
+                    time_zone=cdk.TimeZone.AMERICA_NEW_YORK,
+                    min_capacity=2,
+                    max_capacity=6,
+                ),
+                "OffHours": appscaling.ScalingSchedule(
+                    schedule=appscaling.Schedule.cron(hour="22", minute="0"),
+                    time_zone=cdk.TimeZone.AMERICA_NEW_YORK,
+                    min_capacity=1,
+                    max_capacity=3,
+                ),
+            },
+        )
+
         # CI/CD Pipeline
         pipeline = PipelineConstruct(
-            self,
+            nested_scope(self, "Pipeline", nested=nest_pipeline),
             "Pipeline",
             service=ecs.service,
             https_listener=alb.https_listener,
@@ -76,8 +222,43 @@ class NightlyApplicationStack(cdk.Stack):
             buildspec_filename="buildspec_nightly.yml",
             appspec_filename="appspec_nightly.yaml",
             taskdef_filename="taskdef_nightly.json",
+            cpu_architecture=cpu_architecture,
+            build_cache="s3",
+            build_compute_type=codebuild.ComputeType.MEDIUM,
+            generate_soci_index=enable_soci_index,
+            # Shift 10% of traffic, then the rest after 5 minutes unless the green target group alarms
+            deployment_strategy="canary",
+            traffic_shift_percentage=10,
+            traffic_shift_interval=cdk.Duration.minutes(5),
+            enable_rollback_alarms=True,
+            load_balancer=alb.alb,
+            rollback_alarm_thresholds={
+                "p99_response_time_seconds": 1.5,
+                "target_5xx_rate_percent": 2.0,
+                "unhealthy_host_count": 1,
+            },
             environment_value="NIGHTLY",
         )
 
+        # Performance dashboard - ALB, ECS, Aurora and WAF on a shared time axis
+        DashboardConstruct(
+            self,
+            "Dashboard",
+            alb=alb.alb,
+            target_groups=[alb.blue_target_group, alb.green_target_group],
+            service=ecs.service,
+            web_acl=waf.web_acl,
+            db_cluster=rds.DatabaseCluster.from_database_cluster_attributes(
+                self, "DatabaseCluster", cluster_identifier=db_cluster_identifier
+            ),
+        )
+
         # Outputs
+        # Cache endpoint for the CACHE_* variables of the app repo's taskdef_*.json
+        if cache:
+            cdk.CfnOutput(
+                self,
+                "CacheEndpoint",
+                value=f"{cache.endpoint_address}:{cache.endpoint_port}",
+            )
         # cdk.CfnOutput(self, "ALBDnsName-Dev", value=alb.alb.load_balancer_dns_name)
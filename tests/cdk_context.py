@@ -0,0 +1,50 @@
+"""CDK context shared by the tests and the synth benchmark"""
+
+ACCOUNT = "528757783796"
+REGION = "us-east-1"
+VPC_ID = "vpc-00059e30c80aa84f2"
+
+
+def vpc_lookup_context(account: str = ACCOUNT, region: str = REGION) -> dict:
+    """Stubbed `Vpc.from_lookup` context so stacks synthesize without AWS credentials"""
+    azs = [f"{region}a", f"{region}b", f"{region}c"]
+    key = (
+        f"vpc-provider:account={account}:filter.vpc-id={VPC_ID}"
+        f":region={region}:returnAsymmetricSubnets=true"
+    )
+    return {
+        key: {
+            "vpcId": VPC_ID,
+            "vpcCidrBlock": "10.0.0.0/16",
+            "ownerAccountId": account,
+            "availabilityZones": [],
+            "subnetGroups": [
+                {
+                    "name": "Public",
+                    "type": "Public",
+                    "subnets": [
+                        {
+                            "subnetId": f"subnet-0000000000000000{index}",
+                            "cidr": f"10.0.{index}.0/24",
+                            "availabilityZone": az,
+                            "routeTableId": f"rtb-0000000000000000{index}",
+                        }
+                        for index, az in enumerate(azs)
+                    ],
+                },
+                {
+                    "name": "Private",
+                    "type": "Private",
+                    "subnets": [
+                        {
+                            "subnetId": f"subnet-1000000000000000{index}",
+                            "cidr": f"10.0.{index + 10}.0/24",
+                            "availabilityZone": az,
+                            "routeTableId": f"rtb-1000000000000000{index}",
+                        }
+                        for index, az in enumerate(azs)
+                    ],
+                },
+            ],
+        }
+    }
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import aws_cdk as cdk
+import pytest
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk.assertions import Template
+
+from .cdk_context import ACCOUNT, REGION, VPC_ID, vpc_lookup_context
+
+# The CDK app is executed as `python src/app.py`, so the stacks and constructs
+# import each other as top-level packages (`stacks`, `custom_constructs`, `bin`)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+@pytest.fixture(scope="session")
+def aws_environment() -> cdk.Environment:
+    return cdk.Environment(account=ACCOUNT, region=REGION)
+
+
+@pytest.fixture
+def app() -> cdk.App:
+    return cdk.App(context=vpc_lookup_context())
+
+
+@pytest.fixture
+def stack(app, aws_environment) -> cdk.Stack:
+    """Empty stack for a construct under test"""
+    return cdk.Stack(app, "TestStack", env=aws_environment)
+
+
+@pytest.fixture
+def vpc(stack) -> ec2.IVpc:
+    return ec2.Vpc.from_lookup(stack, "Vpc", vpc_id=VPC_ID)
+
+
+@pytest.fixture(scope="session")
+def nightly_template(aws_environment) -> Template:
+    from stacks.nightly_application_stack import NightlyApplicationStack
+
+    app = cdk.App(context=vpc_lookup_context())
+    stack = NightlyApplicationStack(
+        app, "NightlyApplicationStack-test", env=aws_environment
+    )
+    return Template.from_stack(stack)
+
+
+@pytest.fixture(scope="session")
+def dev_template(aws_environment) -> Template:
+    from stacks.dev_application_stack import DevApplicationStack
+
+    app = cdk.App(context=vpc_lookup_context())
+    stack = DevApplicationStack(app, "DevApplicationStack-test", env=aws_environment)
+    return Template.from_stack(stack)
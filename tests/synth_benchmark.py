@@ -0,0 +1,86 @@
+"""Offline synth benchmark for a single stack in the stack registry.
+
+Each stack is synthesized in its own interpreter (and jsii kernel), so the peak
+memory of one stack is not inflated by the ones synthesized before it:
+
+    python tests/synth_benchmark.py NightlyApplicationStack
+    python tests/synth_benchmark.py --all
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BUDGETS_FILE = os.path.join(TESTS_DIR, "synth_budgets.json")
+METRICS = ["synth_seconds", "peak_memory_mb", "template_bytes", "resource_count"]
+
+# Synth time and peak memory depend on the machine, so they only fail past budget * tolerance
+# (template size and resource count are deterministic and have none)
+TOLERANCES = {"synth_seconds": 2.0, "peak_memory_mb": 1.25}
+
+
+def synth_stack(stack_name: str) -> dict:
+    """Instantiate and synthesize one stack in this process, with stubbed lookups"""
+    sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+
+    import aws_cdk as cdk
+    import bin.git_helper
+
+    from bin.stack_registry import instantiate_stacks
+    from cdk_context import ACCOUNT, REGION, vpc_lookup_context
+
+    # GitHubOIDCStack reads the git remote, which doesn't exist in every checkout
+    bin.git_helper.get_git_repo_details = lambda: ("outlier-org", "outlier-aws-infrastructure")
+
+    started = time.perf_counter()
+    app = cdk.App(context=vpc_lookup_context())
+    stacks = instantiate_stacks(
+        app, "benchmark", cdk.Environment(account=ACCOUNT, region=REGION), [stack_name]
+    )
+    assembly = app.synth()
+    synth_seconds = time.perf_counter() - started
+
+    artifact = assembly.get_stack_artifact(stacks[stack_name].artifact_id)
+    return {
+        "synth_seconds": round(synth_seconds, 2),
+        "template_bytes": os.path.getsize(
+            os.path.join(assembly.directory, artifact.template_file)
+        ),
+        "resource_count": len(artifact.template.get("Resources", {})),
+    }
+
+
+def measure_stack(stack_name: str) -> dict:
+    """Synthesize a stack in a child process and add the peak RSS of its process tree"""
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), stack_name],
+        stdout=subprocess.PIPE,
+        env={**os.environ, "JSII_SILENCE_WARNING_DEPRECATED_NODE_VERSION": "1"},
+    )
+    output = process.stdout.read()
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"Synth of {stack_name} failed with exit code {process.returncode}")
+
+    metrics = json.loads(output.decode().strip().splitlines()[-1])
+    # ru_maxrss is in KiB on Linux and covers the jsii node process the child waited for
+    metrics["peak_memory_mb"] = round(rusage.ru_maxrss / 1024, 1)
+    return metrics
+
+
+def load_budgets() -> dict:
+    with open(BUDGETS_FILE) as budgets_file:
+        return json.load(budgets_file)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--all"]:
+        sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), "src"))
+        from bin.stack_registry import STACK_REGISTRY
+
+        print(json.dumps({name: measure_stack(name) for name in STACK_REGISTRY}, indent=2))
+    else:
+        print(json.dumps(synth_stack(sys.argv[1])))
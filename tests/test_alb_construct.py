@@ -0,0 +1,173 @@
+import aws_cdk as cdk
+import pytest
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk.assertions import Match
+
+from custom_constructs.alb_construct import AlbConstruct
+
+
+def test_dns_target_requires_cloudfront(stack, vpc):
+    with pytest.raises(ValueError):
+        AlbConstruct(
+            stack,
+            "LoadBalancer",
+            vpc=vpc,
+            security_group=ec2.SecurityGroup(stack, "AlbSg", vpc=vpc),
+            load_balancer_name="outlier-test",
+            subdomain="api-test",
+            dns_target="cloudfront",
+        )
+
+
+def test_distribution_cache_behaviors(dev_template):
+    dev_template.has_resource_properties(
+        "AWS::CloudFront::CachePolicy",
+        {
+            "CachePolicyConfig": Match.object_like(
+                {
+                    "DefaultTTL": 300,
+                    "MaxTTL": 3600,
+                    "ParametersInCacheKeyAndForwardedToOrigin": Match.object_like(
+                        {
+                            "EnableAcceptEncodingBrotli": True,
+                            "EnableAcceptEncodingGzip": True,
+                            "HeadersConfig": {
+                                "HeaderBehavior": "whitelist",
+                                "Headers": ["Authorization"],
+                            },
+                            "QueryStringsConfig": {"QueryStringBehavior": "all"},
+                        }
+                    ),
+                }
+            )
+        },
+    )
+    dev_template.has_resource_properties(
+        "AWS::CloudFront::Distribution",
+        {
+            "DistributionConfig": Match.object_like(
+                {
+                    "Aliases": ["api-dev.nightly.savvasoutlier.com"],
+                    "HttpVersion": "http2and3",
+                    "CacheBehaviors": [
+                        Match.object_like(
+                            {
+                                "PathPattern": "/courses*",
+                                "Compress": True,
+                                # Only the cache key is forwarded to the ALB
+                                "OriginRequestPolicyId": Match.absent(),
+                            }
+                        )
+                    ],
+                    "DefaultCacheBehavior": Match.object_like(
+                        {
+                            # Managed CachingDisabled cache policy
+                            "CachePolicyId": "4135ea2d-6df8-44a3-9df3-4b5a84be39ad",
+                            "OriginRequestPolicyId": "216adef6-5c7f-47e4-b989-5492eafa07d3",
+                        }
+                    ),
+                }
+            )
+        },
+    )
+
+
+def test_dev_dns_targets_distribution(dev_template):
+    dev_template.has_resource_properties(
+        "AWS::Route53::RecordSet",
+        {
+            "Name": "api-dev.nightly.savvasoutlier.com.",
+            "AliasTarget": Match.object_like(
+                {"DNSName": {"Fn::GetAtt": [Match.any_value(), "DomainName"]}}
+            ),
+        },
+    )
+    dev_template.has_resource_properties(
+        "AWS::EC2::SecurityGroupIngress",
+        {
+            "SourcePrefixListId": {
+                "Fn::GetAtt": [Match.any_value(), "PrefixLists.0.PrefixListId"]
+            },
+            "FromPort": 443,
+            "ToPort": 443,
+        },
+    )
+    dev_template.has_resource_properties(
+        "AWS::EC2::SecurityGroup",
+        {
+            "GroupName": "outlier-alb-nightly-dev-sg-cdk",
+            "SecurityGroupIngress": Match.absent(),
+        },
+    )
+
+
+def test_nightly_dns_still_targets_alb(nightly_template):
+    nightly_template.resource_count_is("AWS::CloudFront::Distribution", 1)
+    nightly_template.has_resource_properties(
+        "AWS::Route53::RecordSet",
+        {
+            "Name": "api.nightly.savvasoutlier.com.",
+            "AliasTarget": Match.object_like(
+                {
+                    "HostedZoneId": {
+                        "Fn::GetAtt": [
+                            Match.string_like_regexp("LoadBalancerALB"),
+                            "CanonicalHostedZoneID",
+                        ]
+                    }
+                }
+            ),
+        },
+    )
+
+
+def test_tuning_profile_rejects_slow_start_with_least_outstanding_requests():
+    with pytest.raises(ValueError):
+        AlbConstruct.resolve_tuning_profile(
+            {
+                "load_balancing_algorithm": "least_outstanding_requests",
+                "slow_start": cdk.Duration.seconds(30),
+            }
+        )
+    with pytest.raises(ValueError):
+        AlbConstruct.resolve_tuning_profile({"slow_start_seconds": 30})
+
+
+def test_target_groups_share_tuning_profile(nightly_template):
+    target_groups = nightly_template.find_resources(
+        "AWS::ElasticLoadBalancingV2::TargetGroup"
+    )
+    assert len(target_groups) == 2
+    for target_group in target_groups.values():
+        properties = target_group["Properties"]
+        attributes = {
+            attribute["Key"]: attribute["Value"]
+            for attribute in properties["TargetGroupAttributes"]
+        }
+        assert attributes["load_balancing.algorithm.type"] == "least_outstanding_requests"
+        assert attributes["deregistration_delay.timeout_seconds"] == "30"
+        assert properties["HealthCheckIntervalSeconds"] == 10
+        assert properties["HealthyThresholdCount"] == 2
+        assert properties["UnhealthyThresholdCount"] == 3
+
+
+def test_dev_target_groups_slow_start(dev_template):
+    dev_template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::TargetGroup",
+        {
+            "TargetGroupAttributes": Match.array_with(
+                [{"Key": "slow_start.duration_seconds", "Value": "30"}]
+            )
+        },
+    )
+    dev_template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::LoadBalancer",
+        {
+            "LoadBalancerAttributes": Match.array_with(
+                [
+                    {"Key": "idle_timeout.timeout_seconds", "Value": "60"},
+                    {"Key": "routing.http.desync_mitigation_mode", "Value": "defensive"},
+                ]
+            )
+        },
+    )
@@ -0,0 +1,77 @@
+import pytest
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_rds as rds
+from aws_cdk.assertions import Match, Template
+
+from custom_constructs.analytics_construct import AnalyticsConstruct
+
+
+def build_analytics(stack, vpc, **kwargs) -> AnalyticsConstruct:
+    db_cluster = rds.DatabaseCluster.from_database_cluster_attributes(
+        stack, "Cluster", cluster_identifier="outlier-nightly-db-cluster-cdk"
+    )
+    return AnalyticsConstruct(stack, "Analytics", vpc=vpc, db_cluster=db_cluster, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "capacity", [{"base_capacity": 12}, {"max_capacity": 4}, {"base_capacity": 64}]
+)
+def test_rpu_limits_are_validated(stack, vpc, capacity):
+    with pytest.raises(ValueError):
+        build_analytics(stack, vpc, **capacity)
+
+
+def test_workgroup_subnets_span_three_availability_zones(stack):
+    vpc = ec2.Vpc(stack, "TwoAzVpc", max_azs=2)
+    with pytest.raises(ValueError):
+        build_analytics(stack, vpc)
+
+
+def test_workgroup_and_zero_etl_integration(stack, vpc):
+    build_analytics(
+        stack,
+        vpc,
+        base_capacity=8,
+        max_capacity=64,
+        client_security_group_ids=["sg-0123456789abcdef0"],
+    )
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::RedshiftServerless::Workgroup",
+        {
+            "WorkgroupName": "outlier-nightly-analytics",
+            "BaseCapacity": 8,
+            "MaxCapacity": 64,
+            "PubliclyAccessible": False,
+            "ConfigParameters": [
+                {
+                    "ParameterKey": "enable_case_sensitive_identifier",
+                    "ParameterValue": "true",
+                }
+            ],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::RDS::Integration",
+        {
+            "SourceArn": Match.any_value(),
+            "TargetArn": {
+                "Fn::GetAtt": [Match.string_like_regexp("Namespace"), "Namespace.NamespaceArn"]
+            },
+        },
+    )
+    template.has_resource(
+        "AWS::RDS::Integration",
+        {"DependsOn": Match.array_with([Match.string_like_regexp("NamespaceResourcePolicy")])},
+    )
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroup",
+        {
+            "SecurityGroupIngress": [
+                Match.object_like(
+                    {"SourceSecurityGroupId": "sg-0123456789abcdef0", "FromPort": 5439}
+                )
+            ]
+        },
+    )
@@ -0,0 +1,88 @@
+from aws_cdk.assertions import Match
+
+
+def test_nightly_serverless_cache(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::ElastiCache::ServerlessCache",
+        {
+            "Engine": "valkey",
+            "MajorEngineVersion": "7",
+            "CacheUsageLimits": {
+                "DataStorage": {"Maximum": 5, "Unit": "GB"},
+                "ECPUPerSecond": {"Maximum": 5000},
+            },
+        },
+    )
+
+
+def test_cache_only_reachable_from_service(nightly_template):
+    service_sg = nightly_template.find_resources(
+        "AWS::EC2::SecurityGroup",
+        {"Properties": {"GroupName": "outlier-service-nightly-sg-cdk"}},
+    )
+    nightly_template.has_resource_properties(
+        "AWS::EC2::SecurityGroup",
+        {
+            "GroupName": "outlier-cache-nightly-sg-cdk",
+            "SecurityGroupIngress": [
+                Match.object_like(
+                    {
+                        "FromPort": 6379,
+                        "ToPort": 6380,
+                        "SourceSecurityGroupId": {
+                            "Fn::GetAtt": [list(service_sg)[0], "GroupId"]
+                        },
+                    }
+                )
+            ],
+        },
+    )
+
+
+def test_cache_endpoint_injected_into_container(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": Match.array_with(
+                [
+                    Match.object_like(
+                        {
+                            "Name": "Outlier-Service-Container-nightly",
+                            "Environment": Match.array_with(
+                                [
+                                    {
+                                        "Name": "CACHE_HOST",
+                                        "Value": {
+                                            "Fn::GetAtt": [
+                                                Match.string_like_regexp("ServerlessCache"),
+                                                "Endpoint.Address",
+                                            ]
+                                        },
+                                    }
+                                ]
+                            ),
+                        }
+                    )
+                ]
+            )
+        },
+    )
+
+
+def test_dev_node_based_cache(dev_template):
+    dev_template.has_resource_properties(
+        "AWS::ElastiCache::ReplicationGroup",
+        {
+            "Engine": "valkey",
+            "CacheNodeType": "cache.t4g.micro",
+            "NumCacheClusters": 1,
+            "AutomaticFailoverEnabled": False,
+            "TransitEncryptionEnabled": True,
+        },
+    )
+    dev_template.resource_count_is("AWS::ElastiCache::ServerlessCache", 0)
+
+
+def test_cache_endpoint_output_for_the_task_definition(nightly_template, dev_template):
+    for template in (nightly_template, dev_template):
+        template.has_output("CacheEndpoint", {"Value": Match.any_value()})
@@ -0,0 +1,38 @@
+import json
+
+
+def dashboard_body(template) -> str:
+    """Flatten the Fn::Join dashboard body so its literal parts can be searched"""
+    dashboard = next(iter(template.find_resources("AWS::CloudWatch::Dashboard").values()))
+    return json.dumps(dashboard["Properties"]["DashboardBody"])
+
+
+def test_dashboard_per_sub_environment(nightly_template, dev_template):
+    nightly_template.has_resource_properties(
+        "AWS::CloudWatch::Dashboard",
+        {"DashboardName": "outlier-nightly-performance"},
+    )
+    dev_template.has_resource_properties(
+        "AWS::CloudWatch::Dashboard",
+        {"DashboardName": "outlier-nightly-dev-performance"},
+    )
+
+
+def test_dashboard_charts_every_tier(dev_template):
+    body = dashboard_body(dev_template)
+
+    for metric_name in [
+        "RequestCount",
+        "TargetResponseTime",
+        "CPUUtilization",
+        "MemoryUtilization",
+        "ACUUtilization",
+        "DatabaseConnections",
+        "BlockedRequests",
+    ]:
+        assert metric_name in body
+    for statistic in ["p50", "p90", "p99"]:
+        assert f'\\"stat\\":\\"{statistic}\\"' in body
+    assert "outlier-nightly-db-cluster-cdk" in body
+    assert '\\"start\\":\\"-PT3H\\"' in body
+    assert '\\"periodOverride\\":\\"inherit\\"' in body
@@ -0,0 +1,174 @@
+import json
+
+import pytest
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_rds as rds
+from aws_cdk.assertions import Match, Template
+
+from custom_constructs.database_construct import DatabaseConstruct
+
+
+def build_database(stack, vpc, **kwargs) -> DatabaseConstruct:
+    return DatabaseConstruct(
+        stack,
+        "Database",
+        vpc=vpc,
+        security_group=ec2.SecurityGroup.from_security_group_id(
+            stack, "RdsSg", "sg-05fcdaf33c1d2a016"
+        ),
+        **kwargs,
+    )
+
+
+def test_proxy_is_optional(stack, vpc):
+    database = build_database(stack, vpc)
+    Template.from_stack(stack).resource_count_is(
+        "AWS::RDS::DBProxy", 0
+    )
+    with pytest.raises(AttributeError):
+        database.proxy_endpoint
+
+
+def test_proxy_requires_secret(stack, vpc):
+    with pytest.raises(ValueError):
+        build_database(stack, vpc, enable_proxy=True)
+
+
+def test_proxy_endpoints_and_security_groups(stack, vpc):
+    build_database(
+        stack,
+        vpc,
+        enable_proxy=True,
+        proxy_secret_name="outlier-nightly-db-credentials",
+        proxy_client_security_group_ids=["sg-0123456789abcdef0"],
+        proxy_max_connections_percent=80,
+    )
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::RDS::DBProxy",
+        {
+            "EngineFamily": "POSTGRESQL",
+            "RequireTLS": True,
+            "Auth": [Match.object_like({"IAMAuth": "REQUIRED"})],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBProxyTargetGroup",
+        {
+            "ConnectionPoolConfigurationInfo": Match.object_like(
+                {"MaxConnectionsPercent": 80, "MaxIdleConnectionsPercent": 50}
+            )
+        },
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBProxyEndpoint", {"TargetRole": "READ_ONLY"}
+    )
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroup",
+        {
+            "SecurityGroupIngress": [
+                Match.object_like(
+                    {
+                        "FromPort": 5432,
+                        "ToPort": 5432,
+                        "SourceSecurityGroupId": "sg-0123456789abcdef0",
+                    }
+                )
+            ]
+        },
+    )
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroupIngress",
+        {"GroupId": "sg-05fcdaf33c1d2a016", "FromPort": 5432, "ToPort": 5432},
+    )
+
+
+def test_readers_performance_insights_and_capacity(stack, vpc):
+    build_database(
+        stack,
+        vpc,
+        reader_count=2,
+        min_capacity=1,
+        max_capacity=8,
+        enable_performance_insights=True,
+        performance_insights_retention=rds.PerformanceInsightRetention.MONTHS_1,
+    )
+    template = Template.from_stack(stack)
+
+    template.resource_count_is("AWS::RDS::DBInstance", 3)
+    template.all_resources_properties(
+        "AWS::RDS::DBInstance",
+        {"EnablePerformanceInsights": True, "PerformanceInsightsRetentionPeriod": 31},
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {"ServerlessV2ScalingConfiguration": {"MinCapacity": 1, "MaxCapacity": 8}},
+    )
+
+
+def test_reader_autoscaling_and_custom_endpoint(stack, vpc):
+    database = build_database(
+        stack,
+        vpc,
+        enable_reader_autoscaling=True,
+        max_reader_count=4,
+        reader_autoscaling_metric="connections",
+        reader_autoscaling_target=200,
+        create_custom_reader_endpoint=True,
+    )
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "ScalableDimension": "rds:cluster:ReadReplicaCount",
+            "ServiceNamespace": "rds",
+            "MinCapacity": 1,
+            "MaxCapacity": 4,
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingScalingPolicyConfiguration": Match.object_like(
+                {
+                    "PredefinedMetricSpecification": {
+                        "PredefinedMetricType": "RDSReaderAverageDatabaseConnections"
+                    },
+                    "TargetValue": 200,
+                }
+            )
+        },
+    )
+    template.has_resource_properties(
+        "Custom::AWS",
+        {
+            "Delete": Match.serialized_json(
+                Match.object_like({"action": "deleteDBClusterEndpoint"})
+            )
+        },
+    )
+    assert database.custom_reader_endpoint
+
+    # Static readers are excluded on create and update, so only autoscaled readers are members
+    custom_endpoint = json.dumps(next(iter(template.find_resources("Custom::AWS").values())))
+    assert "modifyDBClusterEndpoint" in custom_endpoint
+    assert custom_endpoint.count('\\"ExcludedMembers\\":[') == 2
+    reader_logical_id = next(
+        logical_id
+        for logical_id in template.find_resources("AWS::RDS::DBInstance")
+        if "reader1" in logical_id
+    )
+    assert custom_endpoint.count(f'{{"Ref": "{reader_logical_id}"}}') == 2
+
+
+def test_reader_autoscaling_bounds(stack, vpc):
+    with pytest.raises(ValueError):
+        build_database(
+            stack,
+            vpc,
+            reader_count=2,
+            enable_reader_autoscaling=True,
+            max_reader_count=1,
+        )
@@ -0,0 +1,13 @@
+import json
+
+from custom_constructs.ecr_construct import KEPT_IMAGE_COUNT
+
+
+def test_ecr_lifecycle_keeps_soci_indexes(nightly_template):
+    repository = next(iter(nightly_template.find_resources("AWS::ECR::Repository").values()))
+    rules = json.loads(repository["Properties"]["LifecyclePolicy"]["LifecyclePolicyText"])[
+        "rules"
+    ]
+    # Only tagged images expire - untagged SOCI index artifacts are never counted out
+    assert [rule["selection"]["tagStatus"] for rule in rules] == ["tagged"]
+    assert rules[0]["selection"]["countNumber"] == KEPT_IMAGE_COUNT
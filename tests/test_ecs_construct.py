@@ -0,0 +1,324 @@
+import pytest
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_ecr as ecr
+from aws_cdk import aws_elasticloadbalancingv2 as elbv2
+from aws_cdk.assertions import Match, Template
+
+from custom_constructs.ecs_construct import EcsConstruct
+
+
+def build_ecs_construct(stack, vpc, **kwargs) -> EcsConstruct:
+    alb = elbv2.ApplicationLoadBalancer(stack, "Alb", vpc=vpc)
+    target_group = elbv2.ApplicationTargetGroup(
+        stack,
+        "TargetGroup",
+        vpc=vpc,
+        port=1337,
+        protocol=elbv2.ApplicationProtocol.HTTP,
+        target_type=elbv2.TargetType.IP,
+    )
+    alb.add_listener("Listener", port=80, default_target_groups=[target_group])
+    return EcsConstruct(
+        stack,
+        "ECS",
+        vpc=vpc,
+        security_group=ec2.SecurityGroup(stack, "ServiceSg", vpc=vpc),
+        ecr_repository=ecr.Repository(stack, "Repo"),
+        blue_target_group=target_group,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def ecs_construct(stack, vpc):
+    return build_ecs_construct(stack, vpc)
+
+
+def test_autoscaling_rejects_inverted_bounds(ecs_construct):
+    with pytest.raises(ValueError):
+        ecs_construct.add_autoscaling(min_capacity=4, max_capacity=2)
+
+
+def test_scalable_target_requires_autoscaling(ecs_construct):
+    with pytest.raises(AttributeError):
+        ecs_construct.scalable_target
+
+
+def test_nightly_scalable_target(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "MinCapacity": 2,
+            "MaxCapacity": 6,
+            "ScalableDimension": "ecs:service:DesiredCount",
+            "ScheduledActions": Match.array_with(
+                [
+                    Match.object_like(
+                        {
+                            "ScheduledActionName": "OffHours",
+                            "ScalableTargetAction": {"MinCapacity": 1, "MaxCapacity": 3},
+                            "Timezone": "America/New_York",
+                        }
+                    )
+                ]
+            ),
+        },
+    )
+
+
+def test_nightly_target_tracking_policies(nightly_template):
+    for metric_type, target in [
+        ("ECSServiceAverageCPUUtilization", 60),
+        ("ECSServiceAverageMemoryUtilization", 75),
+    ]:
+        nightly_template.has_resource_properties(
+            "AWS::ApplicationAutoScaling::ScalingPolicy",
+            {
+                "PolicyType": "TargetTrackingScaling",
+                "TargetTrackingScalingPolicyConfiguration": Match.object_like(
+                    {
+                        "PredefinedMetricSpecification": {
+                            "PredefinedMetricType": metric_type
+                        },
+                        "TargetValue": target,
+                    }
+                ),
+            },
+        )
+
+
+def test_request_count_tracks_blue_and_green(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingScalingPolicyConfiguration": Match.object_like(
+                {
+                    "PredefinedMetricSpecification": Match.object_like(
+                        {"PredefinedMetricType": "ALBRequestCountPerTarget"}
+                    ),
+                    "TargetValue": 500,
+                }
+            )
+        },
+    )
+    nightly_template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingScalingPolicyConfiguration": Match.object_like(
+                {
+                    "CustomizedMetricSpecification": Match.object_like(
+                        {"MetricName": "RequestCountPerTarget", "Statistic": "Sum"}
+                    ),
+                    "TargetValue": 500,
+                }
+            )
+        },
+    )
+
+
+def test_dev_scalable_target(dev_template):
+    dev_template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {"MinCapacity": 1, "MaxCapacity": 2},
+    )
+    dev_template.resource_count_is("AWS::ApplicationAutoScaling::ScalingPolicy", 3)
+
+
+def test_existing_services_keep_the_fargate_launch_type(nightly_template, dev_template):
+    # Switching a CODE_DEPLOY service to a capacity provider strategy replaces it
+    for template in (nightly_template, dev_template):
+        template.has_resource_properties(
+            "AWS::ECS::Service",
+            {
+                "DeploymentController": {"Type": "CODE_DEPLOY"},
+                "LaunchType": "FARGATE",
+                "CapacityProviderStrategy": Match.absent(),
+            },
+        )
+
+
+def test_capacity_provider_strategy(stack, vpc):
+    build_ecs_construct(
+        stack, vpc, use_fargate_spot=True, on_demand_base=2, on_demand_weight=1, spot_weight=2
+    )
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ECS::ClusterCapacityProviderAssociations",
+        {"CapacityProviders": Match.array_with(["FARGATE", "FARGATE_SPOT"])},
+    )
+    template.has_resource_properties(
+        "AWS::ECS::Service",
+        {
+            "CapacityProviderStrategy": [
+                {"CapacityProvider": "FARGATE", "Base": 2, "Weight": 1},
+                {"CapacityProvider": "FARGATE_SPOT", "Weight": 2},
+            ],
+            "LaunchType": Match.absent(),
+        },
+    )
+
+
+def test_arm64_runtime_platform(stack, vpc):
+    build_ecs_construct(stack, vpc, cpu_architecture="ARM64")
+    Template.from_stack(stack).has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {"RuntimePlatform": {"CpuArchitecture": "ARM64", "OperatingSystemFamily": "LINUX"}},
+    )
+
+
+def test_rejects_unknown_cpu_architecture(stack, vpc):
+    with pytest.raises(ValueError):
+        build_ecs_construct(stack, vpc, cpu_architecture="RISCV")
+
+
+def test_datadog_container_requires_enable_datadog(ecs_construct):
+    with pytest.raises(AttributeError):
+        ecs_construct.datadog_container
+
+
+def test_datadog_agent_must_leave_room_for_app(stack, vpc):
+    with pytest.raises(ValueError):
+        build_ecs_construct(stack, vpc, enable_datadog=True, datadog_cpu=2048)
+
+
+def test_nightly_datadog_sidecar(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "Volumes": [{"Name": "dd-sockets"}],
+            "ContainerDefinitions": Match.array_with(
+                [
+                    Match.object_like(
+                        {
+                            "Name": "Outlier-Service-Container-nightly",
+                            "Cpu": 1792,
+                            "MemoryReservation": 3584,
+                            "DependsOn": [
+                                {"ContainerName": "datadog-agent", "Condition": "START"}
+                            ],
+                            "MountPoints": [
+                                {
+                                    "ContainerPath": "/var/run/datadog",
+                                    "SourceVolume": "dd-sockets",
+                                    "ReadOnly": False,
+                                }
+                            ],
+                            "Environment": Match.array_with(
+                                [
+                                    {
+                                        "Name": "DD_TRACE_AGENT_URL",
+                                        "Value": "unix:///var/run/datadog/apm.socket",
+                                    }
+                                ]
+                            ),
+                        }
+                    ),
+                    Match.object_like(
+                        {
+                            "Name": "datadog-agent",
+                            "Cpu": 256,
+                            "Memory": 512,
+                            "Essential": False,
+                            "Secrets": [
+                                Match.object_like(
+                                    {
+                                        "Name": "DD_API_KEY",
+                                        "ValueFrom": Match.any_value(),
+                                    }
+                                )
+                            ],
+                            "Environment": Match.array_with(
+                                [
+                                    {"Name": "DD_APM_ENABLED", "Value": "true"},
+                                    {
+                                        "Name": "DD_DOGSTATSD_SOCKET",
+                                        "Value": "/var/run/datadog/dsd.socket",
+                                    },
+                                ]
+                            ),
+                        }
+                    ),
+                ]
+            ),
+        },
+    )
+
+
+def test_dev_has_no_datadog_sidecar(dev_template):
+    task_definition = next(iter(dev_template.find_resources("AWS::ECS::TaskDefinition").values()))
+    container_names = [
+        container["Name"] for container in task_definition["Properties"]["ContainerDefinitions"]
+    ]
+    assert "datadog-agent" not in container_names
+
+
+def test_rejects_unknown_log_driver(stack, vpc):
+    with pytest.raises(ValueError):
+        build_ecs_construct(stack, vpc, log_driver="splunk")
+
+
+def test_nightly_awslogs_non_blocking(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": Match.array_with(
+                [
+                    Match.object_like(
+                        {
+                            "Name": "Outlier-Service-Container-nightly",
+                            "LogConfiguration": {
+                                "LogDriver": "awslogs",
+                                "Options": Match.object_like(
+                                    {"mode": "non-blocking", "max-buffer-size": "26214400b"}
+                                ),
+                            },
+                        }
+                    )
+                ]
+            )
+        },
+    )
+
+
+def test_dev_routes_logs_through_firelens(dev_template):
+    dev_template.has_resource_properties(
+        "AWS::ECS::TaskDefinition",
+        {
+            "ContainerDefinitions": Match.array_with(
+                [
+                    Match.object_like(
+                        {
+                            "Name": "Outlier-Service-Container-nightly-dev",
+                            "LogConfiguration": {
+                                "LogDriver": "awsfirelens",
+                                "Options": {"log-driver-buffer-limit": "26214400"},
+                            },
+                            "DependsOn": [{"Condition": "START", "ContainerName": "log-router"}],
+                        }
+                    ),
+                    Match.object_like(
+                        {
+                            "Name": "log-router",
+                            "FirelensConfiguration": Match.object_like({"Type": "fluentbit"}),
+                            "Environment": Match.array_with(
+                                [Match.object_like({"Name": "aws_fluent_bit_init_s3_1"})]
+                            ),
+                        }
+                    ),
+                ]
+            )
+        },
+    )
+
+
+def test_log_router_requires_firelens(ecs_construct):
+    with pytest.raises(AttributeError):
+        ecs_construct.log_router
+
+
+def test_firelens_log_router_and_bucket(stack, vpc):
+    ecs_construct = build_ecs_construct(stack, vpc, log_driver="firelens")
+
+    assert ecs_construct.log_router.container_name == "log-router"
+    assert ecs_construct.log_bucket is not None
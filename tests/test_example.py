@@ -1,17 +1,47 @@
 import pytest
 from aws_cdk import App
-from aws_cdk.assertions import Template
+from aws_cdk.assertions import Match, Template
 
-from aws_cdk_python_starterkit.main import MyStack
+from stacks.base_stack import BaseStack
+
+from .cdk_context import vpc_lookup_context
 
 
 @pytest.fixture(scope="module")
-def template():
-    app = App()
-    stack = MyStack(app, "my-stack-test")
+def template(aws_environment):
+    app = App(context=vpc_lookup_context())
+    stack = BaseStack(app, "my-stack-test", env=aws_environment)
     template = Template.from_stack(stack)
     yield template
 
 
-def test_no_buckets_found(template):
+def test_storage_is_off_until_the_buckets_are_imported(template):
     template.resource_count_is("AWS::S3::Bucket", 0)
+
+
+def test_s3_gateway_endpoint(template):
+    template.has_resource_properties(
+        "AWS::EC2::VPCEndpoint",
+        {
+            "VpcEndpointType": "Gateway",
+            "ServiceName": Match.object_like({"Fn::Join": Match.any_value()}),
+            "RouteTableIds": Match.any_value(),
+        },
+    )
+
+
+def test_interface_endpoints_have_own_security_groups(template):
+    endpoints = template.find_resources(
+        "AWS::EC2::VPCEndpoint", {"Properties": {"VpcEndpointType": "Interface"}}
+    )
+    security_groups = [
+        endpoint["Properties"]["SecurityGroupIds"][0]["Fn::GetAtt"][0]
+        for endpoint in endpoints.values()
+    ]
+    assert len(endpoints) == 9
+    assert len(set(security_groups)) == 9
+
+
+def test_analytics_is_off_by_default(template):
+    template.resource_count_is("AWS::RedshiftServerless::Workgroup", 0)
+    template.resource_count_is("AWS::RDS::Integration", 0)
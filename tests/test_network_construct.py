@@ -0,0 +1,72 @@
+import pytest
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk.assertions import Match, Template
+
+from custom_constructs.network_construct import NetworkConstruct
+
+
+def test_unknown_interface_endpoint_is_rejected(stack):
+    with pytest.raises(ValueError):
+        NetworkConstruct(stack, "Network", interface_endpoints=["DynamoDb"])
+
+
+def test_endpoint_security_group_scoped_to_peers(stack):
+    network = NetworkConstruct(
+        stack,
+        "Network",
+        interface_endpoints=["Sqs"],
+        endpoint_peers={"Sqs": [ec2.Peer.security_group_id("sg-0123456789abcdef0")]},
+    )
+    template = Template.from_stack(stack)
+
+    template.resource_count_is("AWS::EC2::VPCEndpoint", 1)
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroup",
+        {
+            "GroupName": "outlier-vpce-sqs-nightly-sg-cdk",
+            "SecurityGroupIngress": [
+                {
+                    "SourceSecurityGroupId": "sg-0123456789abcdef0",
+                    "FromPort": 443,
+                    "ToPort": 443,
+                    "IpProtocol": "tcp",
+                    "Description": "Allow HTTPS to the Sqs endpoint",
+                }
+            ],
+        },
+    )
+    with pytest.raises(AttributeError):
+        network.s3_gateway_endpoint
+
+
+def test_cloudfront_prefix_list_is_looked_up_by_name(stack):
+    NetworkConstruct(
+        stack,
+        "Network",
+        create_endpoints=False,
+        create_security_groups=True,
+        restrict_alb_to_cloudfront=True,
+    )
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "Custom::AWS",
+        {
+            "Create": Match.serialized_json(
+                Match.object_like(
+                    {
+                        "service": "EC2",
+                        "action": "describeManagedPrefixLists",
+                        "parameters": {
+                            "Filters": [
+                                {
+                                    "Name": "prefix-list-name",
+                                    "Values": ["com.amazonaws.global.cloudfront.origin-facing"],
+                                }
+                            ]
+                        },
+                    }
+                )
+            )
+        },
+    )
@@ -0,0 +1,193 @@
+import json
+
+from aws_cdk.assertions import Match
+
+from custom_constructs.pipeline_construct import BUILD_IMAGES
+
+
+def test_builds_on_x86(nightly_template, dev_template):
+    # ARM64 needs runtimePlatform in the app repo's taskdef_*.json first (see PipelineConstruct)
+    for template in (nightly_template, dev_template):
+        template.has_resource_properties(
+            "AWS::ECS::TaskDefinition",
+            {
+                "RuntimePlatform": {
+                    "CpuArchitecture": "X86_64",
+                    "OperatingSystemFamily": "LINUX",
+                }
+            },
+        )
+        template.has_resource_properties(
+            "AWS::CodeBuild::Project",
+            {
+                "Environment": Match.object_like(
+                    {
+                        "Type": "LINUX_CONTAINER",
+                        "Image": "aws/codebuild/standard:7.0",
+                        "PrivilegedMode": True,
+                    }
+                )
+            },
+        )
+
+
+def test_arm64_builds_natively():
+    assert BUILD_IMAGES["ARM64"].image_id == "aws/codebuild/amazonlinux2-aarch64-standard:3.0"
+
+
+def test_nightly_s3_build_cache(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::CodeBuild::Project",
+        {
+            "Environment": Match.object_like({"ComputeType": "BUILD_GENERAL1_MEDIUM"}),
+            "Cache": {
+                "Type": "S3",
+                "Location": {
+                    "Fn::Join": [
+                        "/",
+                        [
+                            {"Ref": Match.string_like_regexp("PipelineArtifactBucket")},
+                            "codebuild-cache",
+                        ],
+                    ]
+                },
+            },
+        },
+    )
+
+
+def test_dev_local_build_cache(dev_template):
+    dev_template.has_resource_properties(
+        "AWS::CodeBuild::Project",
+        {
+            "Environment": Match.object_like({"ComputeType": "BUILD_GENERAL1_LARGE"}),
+            "Cache": {
+                "Type": "LOCAL",
+                "Modes": [
+                    "LOCAL_DOCKER_LAYER_CACHE",
+                    "LOCAL_SOURCE_CACHE",
+                    "LOCAL_CUSTOM_CACHE",
+                ],
+            },
+        },
+    )
+
+
+def test_soci_index_stage_runs_before_deploy(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::CodePipeline::Pipeline",
+        {
+            "Stages": [
+                Match.object_like({"Name": "Source"}),
+                Match.object_like({"Name": "Build"}),
+                Match.object_like({"Name": "SociIndex"}),
+                Match.object_like({"Name": "Deploy"}),
+            ]
+        },
+    )
+    nightly_template.has_resource_properties(
+        "AWS::CodeBuild::Project",
+        {
+            "Source": Match.object_like(
+                {"BuildSpec": Match.string_like_regexp("soci push")}
+            ),
+            "Cache": Match.object_like({"Type": "S3"}),
+            "Environment": Match.object_like(
+                {
+                    "EnvironmentVariables": Match.array_with(
+                        [{"Name": "SOCI_ARCH", "Type": "PLAINTEXT", "Value": "amd64"}]
+                    )
+                }
+            ),
+        },
+    )
+
+
+def test_soci_install_is_verified_and_waits_for_containerd(nightly_template):
+    projects = nightly_template.find_resources(
+        "AWS::CodeBuild::Project",
+        {"Properties": {"Source": {"BuildSpec": Match.string_like_regexp("soci push")}}},
+    )
+    buildspec = json.loads(next(iter(projects.values()))["Properties"]["Source"]["BuildSpec"])
+    install = "\n".join(buildspec["phases"]["install"]["commands"])
+    assert "sha256sum -c" in install
+    assert "containerd.sock" in install
+    assert "sleep 5" not in install
+    assert buildspec["cache"]["paths"] == ["/root/.cache/soci/**/*"]
+
+
+def test_nightly_canary_deployment_config(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentConfig",
+        {
+            "ComputePlatform": "ECS",
+            "TrafficRoutingConfig": {
+                "Type": "TimeBasedCanary",
+                "TimeBasedCanary": {"CanaryInterval": 5, "CanaryPercentage": 10},
+            },
+        },
+    )
+
+
+def test_dev_linear_deployment_config(dev_template):
+    dev_template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentConfig",
+        {
+            "TrafficRoutingConfig": {
+                "Type": "TimeBasedLinear",
+                "TimeBasedLinear": {"LinearInterval": 1, "LinearPercentage": 25},
+            },
+        },
+    )
+
+
+def test_nightly_rolls_back_on_alarms_of_both_target_groups(nightly_template):
+    deployment_group = next(
+        iter(nightly_template.find_resources("AWS::CodeDeploy::DeploymentGroup").values())
+    )
+    assert len(deployment_group["Properties"]["AlarmConfiguration"]["Alarms"]) == 6
+    watched_target_groups = {
+        json.dumps(dimension["Value"])
+        for alarm in nightly_template.find_resources(
+            "AWS::CloudWatch::Alarm", {"Properties": {"MetricName": "UnHealthyHostCount"}}
+        ).values()
+        for dimension in alarm["Properties"]["Dimensions"]
+        if dimension["Name"] == "TargetGroup"
+    }
+    assert len(watched_target_groups) == 2
+
+    nightly_template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentGroup",
+        {
+            "AlarmConfiguration": {
+                "Enabled": True,
+                "Alarms": Match.array_with([Match.object_like({"Name": Match.any_value()})]),
+            },
+            "AutoRollbackConfiguration": {
+                "Enabled": True,
+                "Events": Match.array_with(["DEPLOYMENT_STOP_ON_ALARM"]),
+            },
+        },
+    )
+    nightly_template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "MetricName": "TargetResponseTime",
+            "ExtendedStatistic": "p99",
+            "Threshold": 1.5,
+            "TreatMissingData": "notBreaching",
+        },
+    )
+    nightly_template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "Threshold": 2,
+            "Metrics": Match.array_with(
+                [Match.object_like({"Expression": "100 * FILL(errors, 0) / requests"})]
+            ),
+        },
+    )
+    nightly_template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {"MetricName": "UnHealthyHostCount", "Statistic": "Maximum", "Threshold": 1},
+    )
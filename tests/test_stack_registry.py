@@ -0,0 +1,57 @@
+import pytest
+
+from bin.stack_registry import STACK_REGISTRY, instantiate_stacks, resolve_stack_names
+
+
+def test_all_stacks_by_default():
+    assert resolve_stack_names(None) == [
+        "GitHubOIDCStack",
+        "BaseStack",
+        "NightlyApplicationStack",
+        "DevApplicationStack",
+    ]
+
+
+def test_application_stacks_are_independent():
+    assert resolve_stack_names("DevApplicationStack-nightly") == ["DevApplicationStack"]
+
+
+def test_selection_includes_dependencies(monkeypatch):
+    monkeypatch.setitem(
+        STACK_REGISTRY,
+        "DevApplicationStack",
+        {**STACK_REGISTRY["DevApplicationStack"], "dependencies": ["BaseStack"]},
+    )
+
+    assert resolve_stack_names("DevApplicationStack") == [
+        "BaseStack",
+        "DevApplicationStack",
+    ]
+
+
+def test_unknown_stack_is_rejected():
+    with pytest.raises(ValueError):
+        resolve_stack_names("MissingStack")
+
+
+def test_instantiates_only_selected_stacks(app, aws_environment):
+    instantiate_stacks(
+        app, "nightly", aws_environment, resolve_stack_names("DevApplicationStack")
+    )
+
+    assert [child.node.id for child in app.node.children] == [
+        "DevApplicationStack-nightly"
+    ]
+
+
+def test_wires_stack_dependencies(app, aws_environment, monkeypatch):
+    monkeypatch.setitem(
+        STACK_REGISTRY,
+        "DevApplicationStack",
+        {**STACK_REGISTRY["DevApplicationStack"], "dependencies": ["BaseStack"]},
+    )
+    stacks = instantiate_stacks(
+        app, "nightly", aws_environment, resolve_stack_names("DevApplicationStack")
+    )
+
+    assert stacks["BaseStack"] in stacks["DevApplicationStack"].dependencies
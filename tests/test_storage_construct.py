@@ -0,0 +1,185 @@
+import pytest
+from aws_cdk.assertions import Match, Template
+
+from custom_constructs.storage_construct import StorageConstruct
+
+
+def storage_template(stack, **kwargs) -> Template:
+    StorageConstruct(stack, "Storage", **kwargs)
+    return Template.from_stack(stack)
+
+
+def test_defaults_keep_plain_buckets(stack):
+    template = storage_template(stack)
+
+    template.resource_count_is("AWS::S3::Bucket", 2)
+    for bucket in template.find_resources("AWS::S3::Bucket").values():
+        for key in (
+            "AccelerateConfiguration",
+            "LifecycleConfiguration",
+            "MetricsConfigurations",
+            "InventoryConfigurations",
+            "VersioningConfiguration",
+        ):
+            assert key not in bucket["Properties"]
+
+
+def test_bucket_profile_applied(stack):
+    template = storage_template(
+        stack,
+        bucket_profiles={
+            "progress": {
+                "intelligent_tiering": True,
+                "transfer_acceleration": True,
+                "request_metric_prefixes": ["", "courses/"],
+                "inventory": True,
+                "versioned": True,
+                "noncurrent_version_expiration_days": 30,
+                "noncurrent_versions_to_retain": 3,
+            }
+        },
+    )
+
+    template.has_resource_properties(
+        "AWS::S3::Bucket",
+        {
+            "BucketName": "outlier-student-progress-nightly",
+            "AccelerateConfiguration": {"AccelerationStatus": "Enabled"},
+            "MetricsConfigurations": [
+                {"Id": "EntireBucket"},
+                {"Id": "courses", "Prefix": "courses/"},
+            ],
+            "InventoryConfigurations": [
+                Match.object_like(
+                    {
+                        "Id": "DailyInventory",
+                        "IncludedObjectVersions": "All",
+                        "ScheduleFrequency": "Daily",
+                        "Destination": Match.object_like(
+                            {"Format": "Parquet", "Prefix": "outlier-student-progress-nightly"}
+                        ),
+                    }
+                )
+            ],
+            "LifecycleConfiguration": {
+                "Rules": [
+                    Match.object_like(
+                        {
+                            "Id": "IntelligentTiering",
+                            "Transitions": [
+                                {"StorageClass": "INTELLIGENT_TIERING", "TransitionInDays": 0}
+                            ],
+                        }
+                    ),
+                    Match.object_like(
+                        {
+                            "Id": "ExpireNoncurrentVersions",
+                            "NoncurrentVersionExpiration": {
+                                "NoncurrentDays": 30,
+                                "NewerNoncurrentVersions": 3,
+                            },
+                        }
+                    ),
+                ]
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::S3::Bucket", {"BucketName": "outlier-s3-inventory-nightly"}
+    )
+
+
+@pytest.mark.parametrize(
+    "bucket_profiles",
+    [
+        {"uploads": {}},
+        {"drupal": {"transfer_accelerated": True}},
+        {"drupal": {"noncurrent_version_expiration_days": 30}},
+        {"drupal": {"versioned": True, "noncurrent_versions_to_retain": 3}},
+    ],
+)
+def test_invalid_bucket_profiles_are_rejected(stack, bucket_profiles):
+    with pytest.raises(ValueError):
+        storage_template(stack, bucket_profiles=bucket_profiles)
+
+
+def test_drupal_cdn_reads_through_origin_access_control(stack):
+    template = storage_template(stack, enable_drupal_cdn=True)
+
+    template.resource_count_is("AWS::CloudFront::CloudFrontOriginAccessIdentity", 0)
+    template.has_resource_properties(
+        "AWS::CloudFront::OriginAccessControl",
+        {
+            "OriginAccessControlConfig": Match.object_like(
+                {"OriginAccessControlOriginType": "s3", "SigningBehavior": "always"}
+            )
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CloudFront::Distribution",
+        {
+            "DistributionConfig": Match.object_like(
+                {
+                    "Aliases": ["files.nightly.savvasoutlier.com"],
+                    "HttpVersion": "http2and3",
+                    "DefaultCacheBehavior": Match.object_like({"Compress": True}),
+                    "Origins": [
+                        {
+                            "DomainName": Match.any_value(),
+                            "Id": Match.any_value(),
+                            "OriginAccessControlId": Match.any_value(),
+                            "S3OriginConfig": {"OriginAccessIdentity": ""},
+                        }
+                    ],
+                }
+            )
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CloudFront::CachePolicy",
+        {
+            "CachePolicyConfig": Match.object_like(
+                {
+                    "DefaultTTL": 2592000,
+                    "ParametersInCacheKeyAndForwardedToOrigin": Match.object_like(
+                        {
+                            "EnableAcceptEncodingBrotli": True,
+                            "EnableAcceptEncodingGzip": True,
+                            "QueryStringsConfig": {
+                                "QueryStringBehavior": "whitelist",
+                                "QueryStrings": ["v", "itok"],
+                            },
+                        }
+                    ),
+                }
+            )
+        },
+    )
+    template.has_resource_properties(
+        "AWS::S3::BucketPolicy",
+        {
+            "PolicyDocument": {
+                "Statement": Match.array_with(
+                    [
+                        Match.object_like(
+                            {
+                                "Sid": "AllowDrupalDistributionRead",
+                                "Principal": {"Service": "cloudfront.amazonaws.com"},
+                                "Condition": {"StringEquals": {"AWS:SourceArn": Match.any_value()}},
+                            }
+                        )
+                    ]
+                )
+            }
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Route53::RecordSet",
+        {"Name": "files.nightly.savvasoutlier.com.", "Type": "A"},
+    )
+
+
+def test_drupal_distribution_requires_enable_drupal_cdn(stack):
+    storage = StorageConstruct(stack, "Storage")
+    with pytest.raises(AttributeError):
+        storage.drupal_distribution
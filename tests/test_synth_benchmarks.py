@@ -0,0 +1,25 @@
+import pytest
+
+from bin.stack_registry import STACK_REGISTRY
+
+from .synth_benchmark import METRICS, TOLERANCES, load_budgets, measure_stack
+
+
+def test_every_stack_has_a_budget():
+    assert sorted(load_budgets()) == sorted(STACK_REGISTRY)
+
+
+@pytest.mark.parametrize("stack_name", list(STACK_REGISTRY))
+def test_synth_within_budget(stack_name):
+    budget = load_budgets()[stack_name]
+    metrics = measure_stack(stack_name)
+
+    regressions = [
+        f"{metric}: {metrics[metric]} > {budget[metric]} x {TOLERANCES.get(metric, 1)}"
+        for metric in METRICS
+        if metrics[metric] > budget[metric] * TOLERANCES.get(metric, 1)
+    ]
+    assert not regressions, (
+        f"{stack_name} exceeded its synth budget in tests/synth_budgets.json "
+        f"({', '.join(regressions)})"
+    )
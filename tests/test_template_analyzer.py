@@ -0,0 +1,57 @@
+import aws_cdk as cdk
+from aws_cdk.assertions import Annotations, Match, Template
+from constructs import Construct
+
+from bin.template_analyzer import (
+    THRESHOLD_CONTEXT_KEY,
+    construct_report,
+    nested_scope,
+    warn_on_stack_size,
+)
+
+from .cdk_context import vpc_lookup_context
+
+
+def test_application_stacks_are_flat(nightly_template, dev_template):
+    for template in (nightly_template, dev_template):
+        template.resource_count_is("AWS::CloudFormation::Stack", 0)
+        template.resource_count_is("AWS::CodePipeline::Pipeline", 1)
+
+
+def test_nested_scope_only_nests_on_request(app):
+    stack = cdk.Stack(app, "Stack")
+    for index in range(300):
+        cdk.CfnResource(stack, f"Topic{index}", type="AWS::SNS::Topic")
+
+    assert nested_scope(stack, "Pipeline") is stack
+    assert isinstance(nested_scope(stack, "Pipeline", nested=True), cdk.NestedStack)
+
+
+def test_warns_about_stacks_above_threshold():
+    app = cdk.App(context={**vpc_lookup_context(), THRESHOLD_CONTEXT_KEY: 2})
+    small_stack = cdk.Stack(app, "SmallStack")
+    cdk.CfnResource(small_stack, "Topic", type="AWS::SNS::Topic")
+    large_stack = cdk.Stack(app, "LargeStack")
+    for index in range(2):
+        cdk.CfnResource(large_stack, f"Topic{index}", type="AWS::SNS::Topic")
+
+    warn_on_stack_size(app)
+
+    Annotations.from_stack(large_stack).has_warning(
+        "*", Match.string_like_regexp("2 resources")
+    )
+    Annotations.from_stack(small_stack).has_no_warning("*", Match.any_value())
+
+
+def test_construct_report_counts_resources_per_construct(app):
+    stack = cdk.Stack(app, "Stack")
+    parent = Construct(stack, "Topics")
+    cdk.CfnResource(parent, "First", type="AWS::SNS::Topic")
+    cdk.CfnResource(parent, "Second", type="AWS::SNS::Topic")
+    cdk.CfnResource(stack, "Queue", type="AWS::SQS::Queue")
+
+    report = construct_report(stack, Template.from_stack(stack).to_json())
+
+    assert report["Topics"]["resources"] == 2
+    assert report["Queue"]["resources"] == 1
+    assert report["Topics"]["bytes"] > report["Queue"]["bytes"]
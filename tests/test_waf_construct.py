@@ -0,0 +1,248 @@
+import json
+
+import pytest
+from aws_cdk import aws_elasticloadbalancingv2 as elbv2
+from aws_cdk.assertions import Match, Template
+
+from custom_constructs.waf_construct import WafConstruct
+
+
+def web_acl_rules(template) -> list:
+    web_acl = next(iter(template.find_resources("AWS::WAFv2::WebACL").values()))
+    return web_acl["Properties"]["Rules"]
+
+
+def build_waf(stack, vpc, **kwargs) -> WafConstruct:
+    alb = elbv2.ApplicationLoadBalancer(stack, "Alb", vpc=vpc)
+    return WafConstruct(stack, "WAF", **{"alb": alb, **kwargs})
+
+
+def test_rule_priorities_and_metrics_follow_rule_table(nightly_template):
+    rules = web_acl_rules(nightly_template)
+
+    assert [rule["Priority"] for rule in rules] == list(range(len(rules)))
+    assert [rule["Name"] for rule in rules] == [
+        "RateLimitPerIp",
+        "RateLimitPerToken",
+        "RateLimitLogin",
+        "CommonRuleSet",
+        "KnownBadInputs",
+        "SQLiRules",
+        "IPReputationList",
+        "BotControl",
+    ]
+    for rule in rules:
+        assert rule["VisibilityConfig"]["MetricName"] == f"{rule['Name']}Metric"
+
+
+def test_rate_limits_per_key_and_path(nightly_template):
+    rules = {rule["Name"]: rule for rule in web_acl_rules(nightly_template)}
+
+    assert rules["RateLimitPerIp"]["Statement"]["RateBasedStatement"] == {
+        "AggregateKeyType": "IP",
+        "EvaluationWindowSec": 300,
+        "Limit": 2000,
+    }
+    assert rules["RateLimitPerIp"]["Action"] == {
+        "Block": {"CustomResponse": {"ResponseCode": 429}}
+    }
+    assert rules["RateLimitPerToken"]["Statement"]["RateBasedStatement"]["CustomKeys"] == [
+        {"Header": {"Name": "authorization", "TextTransformations": [{"Priority": 0, "Type": "NONE"}]}}
+    ]
+    login = rules["RateLimitLogin"]
+    assert login["Action"] == {"Block": {"CustomResponse": {"ResponseCode": 429}}}
+    assert len(login["Statement"]["RateBasedStatement"]["ScopeDownStatement"]["OrStatement"]["Statements"]) == 2
+
+
+def test_dev_web_acl_protects_the_distribution(dev_template):
+    web_acl = next(iter(dev_template.find_resources("AWS::WAFv2::WebACL").values()))
+    rules = {rule["Name"]: rule for rule in web_acl["Properties"]["Rules"]}
+
+    # The client IP at CloudFront is the viewer's - a regional web ACL behind it only sees edge
+    # servers, and X-Forwarded-For starts with whatever the client sent
+    assert web_acl["Properties"]["Scope"] == "CLOUDFRONT"
+    for name in ("RateLimitPerIp", "RateLimitLogin"):
+        assert rules[name]["Statement"]["RateBasedStatement"]["AggregateKeyType"] == "IP"
+    dev_template.resource_count_is("AWS::WAFv2::WebACLAssociation", 0)
+    distribution = next(
+        iter(dev_template.find_resources("AWS::CloudFront::Distribution").values())
+    )
+    assert "WebACLId" in distribution["Properties"]["DistributionConfig"]
+
+
+def test_nightly_web_acl_is_associated_with_the_alb(nightly_template):
+    nightly_template.has_resource_properties("AWS::WAFv2::WebACL", {"Scope": "REGIONAL"})
+    nightly_template.resource_count_is("AWS::WAFv2::WebACLAssociation", 1)
+
+
+def test_managed_rule_action_per_environment(nightly_template, dev_template):
+    nightly_rules = {rule["Name"]: rule for rule in web_acl_rules(nightly_template)}
+    dev_rules = {rule["Name"]: rule for rule in web_acl_rules(dev_template)}
+
+    assert nightly_rules["CommonRuleSet"]["OverrideAction"] == {"Count": {}}
+    assert dev_rules["CommonRuleSet"]["OverrideAction"] == {"None": {}}
+    assert "BotControl" not in dev_rules
+
+
+def test_bot_control_scoped_down(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::WAFv2::WebACL",
+        {
+            "Rules": Match.array_with(
+                [
+                    Match.object_like(
+                        {
+                            "Name": "BotControl",
+                            "Statement": {
+                                "ManagedRuleGroupStatement": Match.object_like(
+                                    {
+                                        "Name": "AWSManagedRulesBotControlRuleSet",
+                                        "ManagedRuleGroupConfigs": [
+                                            {
+                                                "AWSManagedRulesBotControlRuleSet": {
+                                                    "InspectionLevel": "COMMON"
+                                                }
+                                            }
+                                        ],
+                                        "ScopeDownStatement": {"OrStatement": Match.any_value()},
+                                    }
+                                )
+                            },
+                        }
+                    )
+                ]
+            )
+        },
+    )
+
+
+def test_defaults_keep_managed_groups_only(stack, vpc):
+    build_waf(stack, vpc)
+    rules = web_acl_rules(Template.from_stack(stack))
+
+    assert [rule["Name"] for rule in rules] == [
+        "CommonRuleSet",
+        "KnownBadInputs",
+        "SQLiRules",
+        "IPReputationList",
+    ]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"managed_rule_action": "allow"},
+        {"rate_limits": [{"name": "RateLimit", "limit": 100, "key": "cookie:session"}]},
+        {"rate_limits": [{"name": "RateLimit", "limit": 100, "key": "forwarded_ip"}]},
+        {"alb": None},
+        {"rate_limits": [{"name": "RateLimit", "limit": 100, "action": "captcha"}]},
+        {"rate_limits": [{"name": "CommonRuleSet", "limit": 100}]},
+        {"log_destination": "s3"},
+        {"log_actions": ["DROP"]},
+        {"log_actions": ["EXCHALLENGE"]},
+    ],
+)
+def test_invalid_rules_are_rejected(stack, vpc, kwargs):
+    with pytest.raises(ValueError):
+        build_waf(stack, vpc, **kwargs)
+
+
+def test_logs_only_blocked_and_counted_requests(nightly_template, dev_template):
+    for template in (nightly_template, dev_template):
+        template.has_resource_properties(
+            "AWS::WAFv2::LoggingConfiguration",
+            {
+                "LoggingFilter": {
+                    "DefaultBehavior": "DROP",
+                    "Filters": [
+                        {
+                            "Behavior": "KEEP",
+                            "Requirement": "MEETS_ANY",
+                            "Conditions": [
+                                {"ActionCondition": {"Action": "BLOCK"}},
+                                {"ActionCondition": {"Action": "COUNT"}},
+                            ],
+                        }
+                    ],
+                }
+            },
+        )
+
+
+def test_firehose_logs_to_partitioned_parquet(nightly_template):
+    nightly_template.has_resource_properties(
+        "AWS::KinesisFirehose::DeliveryStream",
+        {
+            "DeliveryStreamName": "aws-waf-logs-nightly",
+            "ExtendedS3DestinationConfiguration": Match.object_like(
+                {
+                    "Prefix": "waf-logs/action=!{partitionKeyFromQuery:action}/day=!{timestamp:yyyy-MM-dd}/hour=!{timestamp:HH}/",
+                    "DynamicPartitioningConfiguration": {"Enabled": True},
+                    "DataFormatConversionConfiguration": Match.object_like(
+                        {
+                            "Enabled": True,
+                            "OutputFormatConfiguration": {
+                                "Serializer": {"ParquetSerDe": {"Compression": "SNAPPY"}}
+                            },
+                            "SchemaConfiguration": Match.object_like(
+                                {"DatabaseName": "aws_waf_logs_nightly", "TableName": "waf_logs"}
+                            ),
+                        }
+                    ),
+                }
+            ),
+        },
+    )
+    nightly_template.has_resource_properties(
+        "AWS::Glue::Table",
+        {
+            "TableInput": Match.object_like(
+                {
+                    "Name": "waf_logs",
+                    "Parameters": Match.object_like(
+                        {"projection.action.values": "ALLOW,BLOCK,CAPTCHA,CHALLENGE"}
+                    ),
+                    "PartitionKeys": [
+                        {"Name": "action", "Type": "string"},
+                        {"Name": "day", "Type": "string"},
+                        {"Name": "hour", "Type": "string"},
+                    ],
+                }
+            )
+        },
+    )
+    nightly_template.has_resource_properties(
+        "AWS::S3::Bucket",
+        {
+            "BucketName": "outlier-aws-waf-logs-nightly",
+            "LifecycleConfiguration": {
+                "Rules": Match.array_with(
+                    [
+                        Match.object_like(
+                            {
+                                "Id": "TierWafLogs",
+                                "ExpirationInDays": 365,
+                                "Transitions": [
+                                    {"StorageClass": "STANDARD_IA", "TransitionInDays": 30},
+                                    {"StorageClass": "GLACIER_IR", "TransitionInDays": 90},
+                                ],
+                            }
+                        )
+                    ]
+                )
+            },
+        },
+    )
+
+
+def test_cloudwatch_logging_is_the_default(stack, vpc):
+    build_waf(stack, vpc)
+    template = Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Logs::LogGroup", {"LogGroupName": "aws-waf-logs-nightly"}
+    )
+    template.resource_count_is("AWS::KinesisFirehose::DeliveryStream", 0)
+    assert "LoggingFilter" not in json.dumps(
+        template.find_resources("AWS::WAFv2::LoggingConfiguration")
+    )